@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmark the train_models.py pipeline on synthetic feature stores of increasing size.
+
+For each size (default 1k, 10k, 100k, 1M records) a feature store is generated with
+generate_synthetic_features.one_record (cached in --data-dir, so later runs reuse it) and these
+stages are timed: load_features, add_lag_features, each prepare_*_features, each trainer,
+export_to_onnx, the ONNX parity check and save_native_model per model, and build_improvement_report. Every stage records wall time, CPU time,
+peak RSS and throughput (rows/sec) in a JSON results file, plus a per-stage scaling exponent
+(slope of log wall time vs log rows across sizes: ~1.0 means linear scaling).
+
+Results files carry the git commit and library versions, so runs from different commits can be
+compared with --baseline (prints the wall-time ratio per stage and size).
+
+Run from repo root:
+  python3 src/plugins/plugin-vince/scripts/benchmark_train_models.py --output bench.json
+  python3 src/plugins/plugin-vince/scripts/benchmark_train_models.py --sizes 1000,10000 --baseline bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+try:
+    import numpy as np
+    import pandas as pd
+    import xgboost as xgb
+except ImportError:
+    print("Need numpy, pandas and xgboost. pip3 install -r requirements.txt", file=sys.stderr)
+    sys.exit(1)
+
+try:
+    import train_models as tm
+    from generate_synthetic_features import one_record
+except ImportError as e:
+    print(f"Could not import train_models / generate_synthetic_features: {e}", file=sys.stderr)
+    sys.exit(1)
+
+logger = logging.getLogger("benchmark_train_models")
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+# Bump when stages or the results layout change; --baseline only compares files with the same version.
+RESULTS_VERSION = 1
+
+PREPARE_FUNCTIONS = {
+    "signal_quality": tm.prepare_signal_quality_features,
+    "position_sizing": tm.prepare_position_sizing_features,
+    "tp_optimizer": tm.prepare_tp_features,
+    "sl_optimizer": tm.prepare_sl_features,
+}
+
+
+def feature_store(data_dir: Path, count: int, seed: int, win_rate: float = 0.52, sentiment_fraction: float = 0.2) -> Path:
+    """Synthetic JSONL with `count` records (same record stream as generate_synthetic_features.py), reused if present."""
+    path = data_dir / f"synthetic_{count}_seed{seed}.jsonl"
+    if path.is_file():
+        return path
+    rng_state = random.getstate()
+    random.seed(seed)
+    base_ts = 1738000000000  # ms
+    partial = path.with_suffix(".jsonl.partial")
+    try:
+        with open(partial, "w") as f:
+            for i in range(count):
+                win = random.random() < win_rate
+                include_sentiment = random.random() < sentiment_fraction
+                f.write(json.dumps(one_record(base_ts + i * 3600000, win=win, include_sentiment_sources=include_sentiment)) + "\n")
+        partial.replace(path)
+    finally:
+        random.setstate(rng_state)
+        partial.unlink(missing_ok=True)
+    return path
+
+
+def _record(profiler: tm.StageProfiler, stage: str, rows: int | None) -> Dict[str, Any]:
+    result = dict(profiler.stages[stage])
+    del result["calls"]
+    result["rows"] = rows
+    if rows:
+        result["rows_per_sec"] = round(rows / result["wall_sec"], 1) if result["wall_sec"] > 0 else None
+    return result
+
+
+def run_size(path: Path, count: int, workers: int, export: bool, tmp_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Time every pipeline stage on one feature store. Returns {stage: metrics}."""
+    profiler = tm.StageProfiler()
+    results: Dict[str, Dict[str, Any]] = {}
+
+    with profiler.stage("load_features"):
+        df = tm.load_features(str(path), use_cache=False, workers=workers)
+    results["load_features"] = _record(profiler, "load_features", len(df))
+
+    with profiler.stage("add_lag_features"):
+        df = tm.add_lag_features(df)
+    results["add_lag_features"] = _record(profiler, "add_lag_features", len(df))
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    for name, prepare in PREPARE_FUNCTIONS.items():
+        stage = f"prepare.{name}"
+        with profiler.stage(stage):
+            X, y = prepare(df)
+        results[stage] = _record(profiler, stage, len(df))
+        if X.empty:
+            logger.info("%s: no labeled rows at %d records; skipping training", name, count)
+            continue
+        X = tm._contiguous_float32(X)
+
+        stage = f"train.{name}"
+        with profiler.stage(stage):
+            model = tm.MODEL_TRAINERS[name](X, y)
+        results[stage] = _record(profiler, stage, len(X))
+        entries[name] = {
+            "feature_importances": dict(zip(X.columns.tolist(), [float(v) for v in model.feature_importances_])),
+            "feature_names": X.columns.tolist(),
+        }
+
+        if export:
+            stage = f"export_onnx.{name}"
+            with profiler.stage(stage):
+                tm.export_to_onnx(model, X.iloc[:1], str(tmp_dir / f"{name}.onnx"), name)
+            results[stage] = _record(profiler, stage, None)
+
+            plan = tm.FoldEvaluator.fold_plan(len(X))
+            holdout = (X.iloc[plan[-1][2]:] if plan else X).iloc[-tm.ONNX_PARITY_ROWS:]
+            stage = f"onnx_parity.{name}"
+            with profiler.stage(stage):
+                tm.check_onnx_parity(str(tmp_dir / f"{name}.onnx"), model, holdout, name)
+            results[stage] = _record(profiler, stage, len(holdout))
+
+            stage = f"native_export.{name}"
+            with profiler.stage(stage):
+                tm.save_native_model(model, tmp_dir, name, holdout=holdout)
+            results[stage] = _record(profiler, stage, len(holdout))
+
+    with profiler.stage("build_improvement_report"):
+        tm.build_improvement_report(df, entries)
+    results["build_improvement_report"] = _record(profiler, "build_improvement_report", len(df))
+    return results
+
+
+def scaling(results: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Per stage: wall microseconds per row at each size and the log-log slope of wall time vs rows."""
+    out: Dict[str, Dict[str, Any]] = {}
+    stages = {stage for by_stage in results.values() for stage in by_stage}
+    for stage in sorted(stages):
+        points = [
+            (by_stage[stage]["rows"], by_stage[stage]["wall_sec"])
+            for by_stage in results.values()
+            if stage in by_stage and by_stage[stage]["rows"] and by_stage[stage]["wall_sec"] > 0
+        ]
+        if not points:
+            continue
+        entry: Dict[str, Any] = {"us_per_row": {str(rows): round(1e6 * wall / rows, 3) for rows, wall in points}}
+        if len({rows for rows, _ in points}) >= 2:
+            rows, wall = np.log([p[0] for p in points]), np.log([p[1] for p in points])
+            entry["exponent"] = round(float(np.polyfit(rows, wall, 1)[0]), 3)
+        out[stage] = entry
+    return out
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=SCRIPT_DIR, capture_output=True, text=True, check=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "xgboost": xgb.__version__,
+        "json_backend": tm.JSON_BACKEND,
+        "onnx_available": tm.ONNX_AVAILABLE,
+        "onnxmltools_available": tm.ONNXMLTOOLS_AVAILABLE,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Lines with the wall-time ratio (this run / baseline) per stage and size; > 1 means slower."""
+    if baseline.get("version") != RESULTS_VERSION:
+        return [f"Baseline results version {baseline.get('version')} != {RESULTS_VERSION}; not comparable"]
+    lines = [f"Wall-time ratio vs baseline {baseline.get('git_commit') or '?'} (> 1 = slower):"]
+    for size, by_stage in results["results"].items():
+        old_by_stage = baseline.get("results", {}).get(size)
+        if not old_by_stage:
+            continue
+        for stage, metrics in by_stage.items():
+            old = old_by_stage.get(stage)
+            if old and old["wall_sec"] > 0:
+                lines.append(f"  {size:>8} {stage:<32} {metrics['wall_sec'] / old['wall_sec']:6.2f}x")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark train_models.py stages on scaled synthetic feature stores")
+    parser.add_argument("--sizes", type=str, default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated record counts (default 1000,10000,100000,1000000)")
+    parser.add_argument("--output", type=str, default="benchmark_results.json", help="Results JSON path (default benchmark_results.json)")
+    parser.add_argument("--data-dir", type=str, default=None,
+                        help="Where generated feature stores are kept and reused (default <tmp>/vince-benchmark)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic records (default 42)")
+    parser.add_argument("--load-workers", type=int, default=0, help="Processes for JSONL parsing (0 = all cores, as in train_models.py)")
+    parser.add_argument("--no-export", dest="export", action="store_false", help="Skip the export_to_onnx, parity and native export stages")
+    parser.add_argument("--baseline", type=str, default=None, help="Earlier results JSON to compare wall times against")
+    args = parser.parse_args()
+    try:
+        sizes = sorted({int(s) for s in args.sizes.split(",") if s.strip()})
+    except ValueError:
+        parser.error("--sizes must be comma-separated integers")
+    if not sizes or sizes[0] <= 0:
+        parser.error("--sizes must be positive")
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    data_dir = Path(args.data_dir) if args.data_dir else Path(tempfile.gettempdir()) / "vince-benchmark"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    workers = tm._resolve_jobs(args.load_workers)
+    tm.set_json_backend()  # same default decoder as train_models.py main()
+    # Per-fit log lines would dominate the output at small sizes
+    tm.logger.setLevel(logging.WARNING)
+
+    results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for count in sizes:
+        logger.info("Generating / reusing %d-record feature store in %s", count, data_dir)
+        path = feature_store(data_dir, count, args.seed)
+        logger.info("Benchmarking %d records", count)
+        with tempfile.TemporaryDirectory(prefix="vince-bench-onnx-") as tmp:
+            results[str(count)] = run_size(path, count, workers, args.export, Path(tmp))
+        for stage, metrics in results[str(count)].items():
+            logger.info("  %-32s %8.3fs  %s rows/s  peak %.0f MB", stage, metrics["wall_sec"],
+                        metrics.get("rows_per_sec", "-"), metrics["peak_rss_mb"])
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "environment": environment(),
+        "sizes": sizes,
+        "results": results,
+        "scaling": scaling(results),
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info("Wrote %s", output)
+    for stage, entry in report["scaling"].items():
+        if "exponent" in entry:
+            logger.info("  scaling %-32s exponent %.2f", stage, entry["exponent"])
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            for line in compare(report, json.load(f)):
+                logger.info(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,6 +10,8 @@ the same shape as the feature store so you can:
 
 Output: one JSONL file that train_models.py can load with --data <path>.
 Records include outcome.maxAdverseExcursion so the SL optimizer can train.
+--vectorized (needs numpy) draws whole columns per chunk and streams them out, for 100k+ record stores;
+with --workers N it writes N shards synthetic_000.jsonl, ... into --output as a directory.
 
 Synthetic data is for testing only. For production models, train on real
 trades and use train_models.py --real-only to exclude synthetic files.
@@ -18,6 +20,7 @@ Usage:
   python3 generate_synthetic_features.py --count 150 --output .elizadb/vince-paper-bot/features/synthetic_90plus.jsonl
   python3 generate_synthetic_features.py --count 400 --output .elizadb/vince-paper-bot/features/synthetic_400.jsonl  # stress-test / CI
   python3 generate_synthetic_features.py --count 200 --output features.jsonl --append
+  python3 generate_synthetic_features.py --count 1000000 --vectorized --workers 4 --output .elizadb/vince-paper-bot/features  # synthetic_000..003.jsonl
   python3 train_models.py --data .elizadb/vince-paper-bot/features --output .elizadb/vince-paper-bot/models --min-samples 90
 
 Optional train_models flags you can use with this data: --recency-decay, --balance-assets,
@@ -30,7 +33,14 @@ import json
 import logging
 import random
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # only needed for --vectorized
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
@@ -41,6 +51,18 @@ REGIMES_VOL = ["low", "normal", "high"]
 REGIMES_MKT = ["bullish", "bearish", "neutral", "volatile"]
 SESSIONS = ["asia", "europe", "us", "eu_us_overlap", "off_hours"]
 EXIT_REASONS = ["take_profit", "stop_loss", "trailing_stop", "max_age", "partial_tp"]
+SOURCE_POOL = [
+    "CoinGlass",
+    "BinanceTakerFlow",
+    "MarketRegime",
+    "BinanceFundingExtreme",
+    "HyperliquidFundingExtreme",
+    "HyperliquidOICap",
+    "HyperliquidBias",
+    "HyperliquidCrowding",
+    "BinanceOIFlush",
+    "BinanceLongShort",
+]
 
 
 def one_record(
@@ -64,18 +86,6 @@ def one_record(
     # SL optimizer needs outcome.maxAdverseExcursion (train_models maps it to label_maxAdverseExcursion)
     mae_abs = abs(mae)
 
-    SOURCE_POOL = [
-        "CoinGlass",
-        "BinanceTakerFlow",
-        "MarketRegime",
-        "BinanceFundingExtreme",
-        "HyperliquidFundingExtreme",
-        "HyperliquidOICap",
-        "HyperliquidBias",
-        "HyperliquidCrowding",
-        "BinanceOIFlush",
-        "BinanceLongShort",
-    ]
     n_sources = random.randint(2, 6)
     chosen = random.sample(SOURCE_POOL, min(n_sources, len(SOURCE_POOL)))
     sources = chosen if not include_sentiment_sources else [
@@ -183,19 +193,184 @@ def one_record(
     }
 
 
+# ==========================================
+# Vectorized generation (--vectorized)
+# ==========================================
+
+# Records per chunk in --vectorized mode; each chunk draws its columns from its own seeded generator, so the
+# output does not depend on --workers.
+VECTORIZED_CHUNK_SIZE = 50_000
+
+
+def _json_choices(values: list) -> "np.ndarray":
+    """JSON literals for a fixed vocabulary, indexable by drawn category codes."""
+    return np.array([json.dumps(v) for v in values], dtype=object)
+
+
+def _json_bools(mask: "np.ndarray") -> list:
+    return np.where(mask, "true", "false").tolist()
+
+
+# One record with the same key order, nesting and separators as json.dumps(one_record(...)), filled from the
+# per-chunk columns below. Floats use 12 significant digits: repr's shortest round-trip form costs ~3x more and
+# dominated generation time.
+_VECTORIZED_TEMPLATE = (
+    '{"id": "%s", "timestamp": %d, "asset": %s, '
+    '"market": {"price": %.12g, "priceChange1h": %.12g, "priceChange24h": %.12g, "volume24h": %.12g, "volumeRatio": %.12g, '
+    '"fundingRate": %.12g, "fundingPercentile": %.12g, "openInterest": %.12g, "oiChange24h": %.12g, "longShortRatio": %.12g, '
+    '"fearGreedIndex": %.12g, "atrPct": %.12g, "rsi14": %.12g}, '
+    '"session": {"session": %s, "utcHour": %d, "dayOfWeek": %d, "isWeekend": false, "isOpenWindow": %s, '
+    '"minutesSinceSessionStart": %d}, '
+    '"signal": {"direction": %s, "strength": %d, "confidence": %d, "sourceCount": %d, "sources": %s, '
+    '"strategyName": "momentum", "openWindowBoost": %.12g, "conflictingCount": %d, "hasCascadeSignal": false, '
+    '"hasFundingExtreme": %s, "hasWhaleSignal": false, "hasOICap": %s, "highestWeightSource": %s}, '
+    '"regime": {"volatilityRegime": %s, "marketRegime": %s, "fundingTrend": "neutral", "volumeSpike": %s, '
+    '"oiCapRisk": "low", "sentiment": "neutral"}, '
+    '"news": {"sentimentScore": %.12g, "sentimentDirection": %s, "hasActiveRiskEvents": %s, "nasdaqChange": %.12g, '
+    '"macroRiskEnvironment": %s}, '
+    '"decisionDrivers": ["Funding neutral", "Session overlap", "Strength > 50"], '
+    '"execution": {"executed": true, "entryPrice": %.12g, "leverage": %d, "positionSizeUsd": %.12g, '
+    '"positionSizePct": %.12g, "stopLossPrice": %.12g, "stopLossDistancePct": 2.0, "takeProfitPrices": [%.12g, %.12g], '
+    '"takeProfitDistancesPct": [1.5, 3.0], "entryAtrPct": 2.5, "streakMultiplier": %.12g}, '
+    '"outcome": {"exitPrice": %.12g, "realizedPnl": %.12g, "realizedPnlPct": %.12g, "holdingPeriodMinutes": %d, '
+    '"exitReason": %s, "maxFavorableExcursion": %.12g, "maxAdverseExcursion": %.12g, "partialProfitsTaken": %d, '
+    '"trailingStopActivated": false, "trailingStopPrice": null}, '
+    '"labels": {"profitable": %s, "winAmount": %.12g, "lossAmount": %.12g, "rMultiple": %.12g, "optimalTpLevel": %d, '
+    '"betterEntryAvailable": false, "stopTooTight": %s}}'
+)
+
+
+def _vectorized_sources(rng: "np.random.Generator", n: int, sentiment: "np.ndarray") -> Tuple[list, ...]:
+    """2-6 distinct sources per record (JSON, with per-source sentiment where `sentiment`), plus the
+    source count, funding-extreme / OI-cap flags and the first source."""
+    pool = len(SOURCE_POOL)
+    order = np.argsort(rng.random((n, pool)), axis=1)  # a random permutation per row; the first k are sampled
+    k = rng.integers(2, 7, size=n)
+    chosen = np.arange(pool) < k[:, None]
+    picked = lambda name: ((order == SOURCE_POOL.index(name)) & chosen).any(axis=1)
+    has_funding = picked("BinanceFundingExtreme") | picked("HyperliquidFundingExtreme")
+    has_oi_cap = picked("HyperliquidOICap")
+    names = _json_choices(SOURCE_POOL)
+    scores = rng.uniform(-0.3, 0.3, size=(n, pool)).tolist()
+    sources = []
+    for row, (codes, count, with_sentiment) in enumerate(zip(order.tolist(), k.tolist(), sentiment.tolist())):
+        if with_sentiment:
+            sources.append("[" + ", ".join(
+                '{"name": %s, "sentiment": %.12g}' % (names[c], scores[row][j]) for j, c in enumerate(codes[:count])
+            ) + "]")
+        else:
+            sources.append("[" + ", ".join(names[c] for c in codes[:count]) + "]")
+    return sources, k.tolist(), _json_bools(has_funding), _json_bools(has_oi_cap), names[order[:, 0]].tolist()
+
+
+def vectorized_lines(
+    rng: "np.random.Generator", n: int, first_ts: int, win_rate: float, sentiment_fraction: float,
+) -> Tuple[List[str], int]:
+    """n JSONL lines drawn column-wise with NumPy (same schema and value ranges as one_record). Returns (lines, wins)."""
+    u = lambda low, high: rng.uniform(low, high, size=n)
+    pick = lambda values: _json_choices(values)[rng.integers(0, len(values), size=n)].tolist()
+    win = rng.random(n) < win_rate
+    asset = rng.integers(0, len(ASSETS), size=n)
+    long = rng.integers(0, len(DIRECTIONS), size=n) == DIRECTIONS.index("long")
+    entry = np.where(asset == ASSETS.index("BTC"), 50000 + u(-10000, 10000), 3000 + u(-500, 500))
+    exit_pct = np.where(win, u(0.5, 3.0), u(-2.5, -0.3))
+    exit_price = np.where(long, entry * (1 + exit_pct / 100), entry * (1 - exit_pct / 100))
+    pnl_pct = np.where(long, (exit_price - entry) / entry * 100, (entry - exit_price) / entry * 100)
+    pnl_usd = 1000 * (pnl_pct / 100) * u(3, 10)
+    mfe = np.where(win, np.maximum(0, pnl_pct + u(0, 1)), u(-3, 0))
+    mae = np.where(win, u(0, 2), np.minimum(0, pnl_pct - u(0, 1)))
+    sources, source_count, has_funding, has_oi_cap, first_source = _vectorized_sources(
+        rng, n, rng.random(n) < sentiment_fraction,
+    )
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # uuid4 version / variant bits
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    hex_ids = raw.tobytes().hex()
+    ids = [f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}" for h in (hex_ids[i:i + 32] for i in range(0, 32 * n, 32))]
+    win_list, pnl_list = win.tolist(), pnl_usd.tolist()
+    entry_list = entry.tolist()
+    columns = (
+        ids, (first_ts + np.arange(n, dtype=np.int64) * 3600000).tolist(), _json_choices(ASSETS)[asset].tolist(),
+        entry_list, u(-2, 2).tolist(), u(-5, 5).tolist(), (1e9 * u(0.5, 2)).tolist(), u(0.7, 1.5).tolist(),
+        u(-0.0003, 0.0003).tolist(), u(20, 80).tolist(), (1e9 * u(0.5, 2)).tolist(), u(-5, 5).tolist(),
+        u(0.8, 1.4).tolist(), u(25, 75).tolist(), u(1.5, 4).tolist(), u(30, 70).tolist(),
+        pick(SESSIONS), rng.integers(0, 24, size=n).tolist(), rng.integers(0, 7, size=n).tolist(),
+        _json_bools(rng.random(n) < 0.2), rng.integers(0, 481, size=n).tolist(),
+        np.where(long, '"long"', '"short"').tolist(), rng.integers(40, 96, size=n).tolist(),
+        rng.integers(35, 91, size=n).tolist(), source_count, sources,
+        u(0, 10).tolist(), rng.integers(0, 3, size=n).tolist(), has_funding, has_oi_cap, first_source,
+        pick(REGIMES_VOL), pick(REGIMES_MKT), _json_bools(rng.random(n) < 0.1),
+        u(-30, 30).tolist(), pick(["bullish", "bearish", "neutral"]), _json_bools(rng.random(n) < 0.2),
+        u(-3, 3).tolist(), pick(["risk_on", "risk_off", "neutral"]),
+        entry_list, np.array([3, 5, 10])[rng.integers(0, 3, size=n)].tolist(), (5000 * u(0.5, 2)).tolist(),
+        u(3, 10).tolist(), (entry * np.where(long, 0.98, 1.02)).tolist(), (entry * 1.015).tolist(),
+        (entry * 1.03).tolist(), u(0.9, 1.2).tolist(),
+        exit_price.tolist(), pnl_list, pnl_pct.tolist(), rng.integers(30, 1441, size=n).tolist(),
+        pick(EXIT_REASONS), mfe.tolist(), np.minimum(5.0, np.abs(mae)).tolist(),
+        (win & (rng.random(n) < 0.5)).astype(int).tolist(),
+        _json_bools(win), [p if w else 0 for p, w in zip(pnl_list, win_list)],
+        [-p if not w else 0 for p, w in zip(pnl_list, win_list)], (pnl_usd / 100).tolist(),
+        rng.integers(0, 4, size=n).tolist(), _json_bools(~win & (rng.random(n) < 0.2)),
+    )
+    return [_VECTORIZED_TEMPLATE % row for row in zip(*columns)], int(win.sum())
+
+
+def write_vectorized(
+    path: Path, start: int, stop: int, base_ts: int, seed: int, win_rate: float, sentiment_fraction: float,
+    chunk_size: int = VECTORIZED_CHUNK_SIZE, mode: str = "w",
+) -> Tuple[int, int]:
+    """Stream records [start, stop) of the vectorized sequence to path, one chunk in memory at a time.
+
+    Chunk c always holds records [c * chunk_size, (c + 1) * chunk_size) drawn from default_rng([seed, c]),
+    so shards written by different workers concatenate to the same records as one single-file run.
+    start must be a multiple of chunk_size. Returns (records written, wins).
+    """
+    written = wins = 0
+    with open(path, mode) as f:
+        for chunk_start in range(start, stop, chunk_size):
+            n = min(chunk_size, stop - chunk_start)
+            rng = np.random.default_rng([seed, chunk_start // chunk_size])
+            lines, chunk_wins = vectorized_lines(rng, n, base_ts + chunk_start * 3600000, win_rate, sentiment_fraction)
+            f.write("\n".join(lines) + "\n")
+            written += n
+            wins += chunk_wins
+    return written, wins
+
+
+def _write_shard(args: Tuple[Any, ...]) -> Tuple[int, int]:
+    """Process-pool entry point for one --workers shard."""
+    return write_vectorized(*args)
+
+
 def main():
     p = argparse.ArgumentParser(description="Generate synthetic feature-store JSONL for ML testing")
     p.add_argument("--count", type=int, default=150, help="Number of records to generate (default 150, use >=90 for train_models --min-samples 90)")
-    p.add_argument("--output", type=str, default="synthetic_features.jsonl", help="Output JSONL path")
+    p.add_argument("--output", type=str, default="synthetic_features.jsonl", help="Output JSONL path (directory for shards when --workers > 1)")
     p.add_argument("--append", action="store_true", help="Append to existing file (timestamps continue after last record)")
     p.add_argument("--win-rate", type=float, default=0.52, help="Target win rate 0–1 (default 0.52)")
     p.add_argument("--seed", type=int, default=42, help="Random seed")
     p.add_argument("--sentiment-fraction", type=float, default=0.2, help="Fraction of records with signal.sources as list of dicts (sentiment) for signal_avg_sentiment column (default 0.2)")
+    p.add_argument("--vectorized", action="store_true",
+                   help="Draw whole columns with NumPy and stream JSONL in chunks (much faster for 100k+ records; different record stream than the default mode for the same seed)")
+    p.add_argument("--chunk-size", type=int, default=VECTORIZED_CHUNK_SIZE, help=f"Records per chunk with --vectorized (default {VECTORIZED_CHUNK_SIZE})")
+    p.add_argument("--workers", type=int, default=1,
+                   help="With --vectorized: write this many shards (synthetic_000.jsonl, ...) in parallel into --output as a directory (default 1 = single file)")
     args = p.parse_args()
+    if args.workers < 1 or args.chunk_size < 1:
+        p.error("--workers and --chunk-size must be >= 1")
+    if args.workers > 1 and not args.vectorized:
+        p.error("--workers requires --vectorized")
+    if args.workers > 1 and args.append:
+        p.error("--append writes a single file; use --workers 1")
+    if args.vectorized and np is None:
+        p.error("--vectorized needs numpy (pip3 install -r requirements.txt)")
 
     random.seed(args.seed)
     out = Path(args.output)
-    out.parent.mkdir(parents=True, exist_ok=True)
+    if args.workers > 1:
+        out.mkdir(parents=True, exist_ok=True)
+    else:
+        out.parent.mkdir(parents=True, exist_ok=True)
 
     base_ts = 1738000000000  # ms
     if args.append and out.exists() and out.stat().st_size > 0:
@@ -212,22 +387,40 @@ def main():
             except json.JSONDecodeError:
                 pass
 
-    records = []
-    for i in range(args.count):
-        win = random.random() < args.win_rate
-        ts = base_ts + i * 3600000
-        include_sentiment = random.random() < args.sentiment_fraction
-        records.append(one_record(ts, win=win, include_sentiment_sources=include_sentiment))
-
     mode = "a" if args.append else "w"
-    with open(out, mode) as f:
-        for r in records:
-            f.write(json.dumps(r) + "\n")
+    if args.workers > 1:
+        # Contiguous, chunk-aligned record ranges per shard, so shards sort by name in timestamp order
+        chunks = -(-args.count // args.chunk_size)
+        workers = max(1, min(args.workers, chunks))
+        bounds = [min(args.count, (k * chunks // workers) * args.chunk_size) for k in range(workers + 1)]
+        shards = [
+            (out / f"synthetic_{k:03d}.jsonl", bounds[k], bounds[k + 1], base_ts, args.seed,
+             args.win_rate, args.sentiment_fraction, args.chunk_size)
+            for k in range(workers)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(_write_shard, shards))
+        written, wins = sum(c[0] for c in counts), sum(c[1] for c in counts)
+        out_desc = f"{len(shards)} shards in {out}"
+    elif args.vectorized:
+        written, wins = write_vectorized(out, 0, args.count, base_ts, args.seed, args.win_rate,
+                                         args.sentiment_fraction, args.chunk_size, mode)
+        out_desc = str(out)
+    else:
+        written = wins = 0
+        with open(out, mode) as f:
+            for i in range(args.count):
+                win = random.random() < args.win_rate
+                ts = base_ts + i * 3600000
+                include_sentiment = random.random() < args.sentiment_fraction
+                f.write(json.dumps(one_record(ts, win=win, include_sentiment_sources=include_sentiment)) + "\n")
+                written += 1
+                wins += win
+        out_desc = str(out)
 
-    wins = sum(1 for r in records if r["labels"]["profitable"])
     action = "Appended" if args.append else "Wrote"
     logger.info("%s %d synthetic records to %s (%.1f%% wins). Next (from repo root): python3 src/plugins/plugin-vince/scripts/train_models.py --data %s --output .elizadb/vince-paper-bot/models --min-samples 90",
-                action, len(records), out, 100 * wins / len(records), out)
+                action, written, out_desc, 100 * wins / max(written, 1), out)
     return 0
 
 
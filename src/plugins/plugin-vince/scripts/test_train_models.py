@@ -191,7 +191,9 @@ def run_train_models(
     )
 
 
-def run_generate_synthetic_features(output_path: str, count: int = 150) -> subprocess.CompletedProcess:
+def run_generate_synthetic_features(
+    output_path: str, count: int = 150, extra_args: list | None = None,
+) -> subprocess.CompletedProcess:
     """Run generate_synthetic_features.py and return the completed process."""
     gen_script = SCRIPT_DIR / "generate_synthetic_features.py"
     cmd = [
@@ -202,6 +204,8 @@ def run_generate_synthetic_features(output_path: str, count: int = 150) -> subpr
         "--output",
         output_path,
     ]
+    if extra_args:
+        cmd.extend(extra_args)
     return subprocess.run(
         cmd,
         capture_output=True,
@@ -211,6 +215,74 @@ def run_generate_synthetic_features(output_path: str, count: int = 150) -> subpr
     )
 
 
+def _flatten_record(r: object) -> dict | None:
+    """Reference per-record flattener for _FlattenPlan: one FeatureStore record into market_*/session_*/...
+    columns, or None if unusable. Kept deliberately simple; the plan must reproduce it exactly."""
+    if not isinstance(r, dict):
+        return None
+    id_ = r.get('id')
+    ts = r.get('timestamp')
+    asset = r.get('asset')
+    if id_ is None or ts is None:
+        return None
+    flat = {'id': id_, 'timestamp': ts, 'asset': asset or ''}
+
+    for k, v in r.get('market', {}).items():
+        flat[f'market_{k}'] = v
+    for k, v in r.get('session', {}).items():
+        flat[f'session_{k}'] = v
+    signal = r.get('signal', {})
+    for k, v in signal.items():
+        if k != 'sources' and k != 'factors':
+            flat[f'signal_{k}'] = v
+    sources = signal.get('sources', [])
+    drivers = r.get('decisionDrivers') or signal.get('factors') or []
+    flat['decision_drivers'] = drivers if isinstance(drivers, list) else []
+    flat['signal_source_count'] = len(sources)
+    if sources and isinstance(sources[0], dict):
+        sents = [s.get('sentiment', 0) for s in sources if isinstance(s.get('sentiment'), (int, float))]
+        flat['signal_avg_sentiment'] = sum(sents) / len(sents) if sents else 0.0
+    elif signal.get('avgSentiment') is not None:
+        flat['signal_avg_sentiment'] = float(signal['avgSentiment'])
+    for k, v in r.get('regime', {}).items():
+        flat[f'regime_{k}'] = v
+    news = r.get('news', {})
+    if isinstance(news, dict):
+        for k, v in news.items():
+            if not isinstance(v, list):
+                flat[f'news_{k}'] = v
+    elif isinstance(news, list) and news:
+        sents = [n.get('sentiment', 0) for n in news if isinstance(n, dict) and isinstance(n.get('sentiment'), (int, float))]
+        flat['news_avg_sentiment'] = sum(sents) / len(sents) if sents else 0.0
+    execution = r.get('execution') or {}
+    if execution:
+        for k, v in execution.items():
+            if not isinstance(v, list):
+                flat[f'exec_{k}'] = v
+    outcome = r.get('outcome') or {}
+    if outcome:
+        for k, v in outcome.items():
+            flat[f'outcome_{k}'] = v
+    labels = r.get('labels') or {}
+    if labels:
+        for k, v in labels.items():
+            flat[f'label_{k}'] = v
+    flat['label_profitable'] = labels.get('profitable') if labels else outcome.get('profitable')
+    if 'label_maxAdverseExcursion' not in flat and outcome:
+        exc = outcome.get('maxAdverseExcursion')
+        if exc is not None:
+            flat['label_maxAdverseExcursion'] = float(exc)
+    wtt = r.get('wtt')
+    if wtt:
+        flat['wtt_primary'] = 1 if wtt.get('primary') else 0
+        flat['wtt_alignment'] = wtt.get('alignment', 0)
+        flat['wtt_edge'] = wtt.get('edge', 0)
+        flat['wtt_payoffShape'] = wtt.get('payoffShape', 0)
+        flat['wtt_timingForgiveness'] = wtt.get('timingForgiveness', 0)
+        flat['wtt_invalidateHit'] = 1 if wtt.get('invalidateHit') else 0
+    return flat
+
+
 class TestTrainModels(unittest.TestCase):
     """Tests that train_models.py learns and improves paper trading algo parameters/weights."""
 
@@ -386,6 +458,39 @@ class TestTrainModels(unittest.TestCase):
             if "signal_quality_input_dim" in metadata:
                 self.assertGreaterEqual(metadata["signal_quality_input_dim"], 16)
 
+    def test_vectorized_generator_matches_schema_and_shards(self):
+        """--vectorized output loads with the same columns/dtypes as the default generator; --workers shards
+        (synthetic_000.jsonl, ...) hold the same records as one single-file run."""
+        from train_models import load_features
+
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy_path = os.path.join(tmp, "legacy.jsonl")
+            vectorized_path = os.path.join(tmp, "vectorized.jsonl")
+            shard_dir = os.path.join(tmp, "shards")
+            vectorized_args = ["--vectorized", "--chunk-size", "40", "--sentiment-fraction", "0.3"]
+            for path, extra in (
+                (legacy_path, ["--sentiment-fraction", "0.3"]),
+                (vectorized_path, vectorized_args),
+                (shard_dir, vectorized_args + ["--workers", "3"]),
+            ):
+                result = run_generate_synthetic_features(path, count=150, extra_args=extra)
+                self.assertEqual(result.returncode, 0, f"generator failed: stderr={result.stderr!r}")
+
+            self.assertEqual(sorted(os.listdir(shard_dir)), ["synthetic_000.jsonl", "synthetic_001.jsonl", "synthetic_002.jsonl"])
+            sharded = "".join(Path(shard_dir, name).read_text() for name in sorted(os.listdir(shard_dir)))
+            self.assertEqual(sharded, Path(vectorized_path).read_text())
+
+            legacy = load_features(legacy_path, real_only=False, use_cache=False)
+            vectorized = load_features(vectorized_path, real_only=False, use_cache=False)
+            self.assertEqual(len(vectorized), 150)
+            self.assertEqual(sorted(vectorized.columns), sorted(legacy.columns))
+            for col in legacy.columns:
+                self.assertEqual(vectorized[col].dtype, legacy[col].dtype, col)
+            mae = vectorized["label_maxAdverseExcursion"]
+            self.assertTrue(((mae >= 0) & (mae <= 5)).all())
+            self.assertTrue(vectorized["signal_avg_sentiment"].notna().any(), "Sentiment-source variant should be present")
+            self.assertTrue(vectorized["timestamp"].is_monotonic_increasing)
+
     def test_multi_asset_uses_asset_dummies(self):
         """When multiple assets are present, prepare_signal_quality_features includes asset_* dummy columns."""
         try:
@@ -450,7 +555,7 @@ class TestTrainModels(unittest.TestCase):
                     data_path,
                     output_dir,
                     min_samples=50,
-                    extra_args=["--tune-hyperparams"],
+                    extra_args=["--tune-hyperparams", "--optuna-trials", "6", "--tune-timeout", "60"],
                     timeout_sec=180,
                 )
                 self.assertEqual(result.returncode, 0, (
@@ -463,6 +568,14 @@ class TestTrainModels(unittest.TestCase):
                     metadata = json.load(f)
                 models_fit = metadata.get("models_fit", metadata.get("models_trained", []))
                 self.assertGreaterEqual(len(models_fit), 1, "At least one model should be fit after hyperparameter tuning")
+                self.assertTrue(os.path.isfile(os.path.join(output_dir, "optuna_studies.db")), "Optuna studies should persist next to the models")
+                tuning = metadata.get("tuning", {})
+                self.assertEqual(set(tuning), set(models_fit), "Every tuned model should report tuning stats")
+                for stats in tuning.values():
+                    self.assertGreater(stats["trials_run"], 0)
+                    self.assertLessEqual(stats["trials_run"], 6, "--optuna-trials caps trials for every model")
+                    self.assertIn("trials_per_sec", stats)
+                    self.assertIn("sec_per_trial", stats)
         finally:
             if prev is None:
                 os.environ.pop("VINCE_TRAIN_NJOBS", None)
@@ -492,6 +605,9 @@ class TestTrainModels(unittest.TestCase):
                 self.assertIn("features", manifest)
                 self.assertGreater(len(manifest["features"]), 0, f"Empty feature list in {manifest_path}")
                 self.assertEqual(manifest["n_features"], len(manifest["features"]))
+                for feature, bounds in manifest.get("clip_bounds", {}).items():
+                    self.assertIn(feature, manifest["features"])
+                    self.assertEqual(set(bounds), {"mean", "std", "cap", "z"})
 
             # ONNX hashes
             onnx_hashes = metadata.get("onnx_hashes", {})
@@ -563,6 +679,972 @@ class TestTrainModels(unittest.TestCase):
             non_wtt = df[~df["wtt_primary"].fillna(0).astype(bool)]
             self.assertEqual(len(non_wtt), 12, "Records without wtt block should have wtt_primary 0 or NaN")
 
+    def test_load_features_chunked_matches_single_chunk(self):
+        """load_features() streams in chunks; small chunks (and mixed wtt/non-wtt files) give the same frame as one chunk."""
+        import pandas as pd
+        from train_models import load_features
+
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_synthetic_jsonl(os.path.join(tmp, "features_a.jsonl"), num_records=60, assets=["BTC", "ETH"], include_sl_label=True)
+            generate_synthetic_jsonl_with_wtt(os.path.join(tmp, "features_b.jsonl"), num_records=30, num_wtt=5)
+            full = load_features(tmp, chunk_size=1_000_000)
+            chunked = load_features(tmp, chunk_size=7)
+            pd.testing.assert_frame_equal(full, chunked)
+
+            subset = load_features(tmp, chunk_size=7, columns=["label_profitable", "signal_strength"])
+            self.assertEqual(list(subset.columns), ["label_profitable", "signal_strength", "timestamp"])
+            self.assertEqual(len(subset), len(full))
+
+    def test_concat_chunks_infers_dtypes_like_one_frame(self):
+        """Columns typed differently per chunk (or missing from one) concatenate to the dtypes of one frame."""
+        import pandas as pd
+        from train_models import _concat_chunks
+
+        records = [
+            {"i": 1, "b": True, "n": None, "s": "a", "ib": 1, "none": None, "obj": [1]},
+            {"i": 2, "b": False, "n": None, "s": "b", "ib": 2, "none": None, "obj": [2]},
+            {"i": None, "b": None, "n": 0.5, "ib": True, "none": None},
+            {"i": 4, "b": True, "n": 1.5, "ib": False, "none": None},
+            {"i": 5, "b": True, "n": None, "s": "c", "ib": 3, "none": None, "obj": "x"},
+        ]
+        chunks = [pd.DataFrame(records[:2]), pd.DataFrame(records[2:4]), pd.DataFrame(records[4:])]
+        self.assertTrue(any(len({c[col].dtype for c in chunks if col in c}) > 1 for col in records[0]))
+        pd.testing.assert_frame_equal(_concat_chunks(chunks), pd.DataFrame(records))
+
+    def test_feature_cache_reuses_unchanged_files(self):
+        """With use_cache=True, a second load reads cached columns and matches a fresh parse; changed files are re-parsed."""
+        import pandas as pd
+        import train_models
+        from train_models import load_features
+
+        if not train_models.PYARROW_AVAILABLE:
+            self.skipTest("pyarrow not installed")
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_synthetic_jsonl(os.path.join(tmp, "features_a.jsonl"), num_records=40, include_sl_label=True)
+            generate_synthetic_jsonl_with_wtt(os.path.join(tmp, "features_b.jsonl"), num_records=20, num_wtt=5)
+            fresh = load_features(tmp)
+            pd.testing.assert_frame_equal(fresh, load_features(tmp, use_cache=True))
+            cache = train_models.FeatureCache(Path(tmp) / train_models.FEATURE_CACHE_DIRNAME)
+            self.assertEqual(len(cache.entries), 2)
+            pd.testing.assert_frame_equal(fresh, load_features(tmp, use_cache=True))
+
+            generate_synthetic_jsonl(os.path.join(tmp, "features_a.jsonl"), num_records=45, include_sl_label=True)
+            reloaded = load_features(tmp, use_cache=True)
+            self.assertEqual(len(reloaded), 65)
+            pd.testing.assert_frame_equal(load_features(tmp), reloaded)
+
+    def test_parallel_parse_matches_serial(self):
+        """Process-pool parsing (file-level and byte-range splits) returns the same frames as serial parsing."""
+        import pandas as pd
+        from train_models import _jsonl_paths, _parse_files
+
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_synthetic_jsonl(os.path.join(tmp, "features_a.jsonl"), num_records=80, assets=["BTC", "ETH"])
+            generate_synthetic_jsonl_with_wtt(os.path.join(tmp, "features_b.jsonl"), num_records=30, num_wtt=5)
+            paths = _jsonl_paths(tmp)
+            serial = _parse_files(paths, chunk_size=16, columns=None, workers=1)
+            try:
+                parallel = _parse_files(paths, chunk_size=16, columns=None, workers=2, split_bytes=8_000)
+            except (OSError, PermissionError) as e:
+                self.skipTest(f"process pool unavailable in this sandbox: {e}")
+            for (expected, n_expected), (got, n_got) in zip(serial, parallel):
+                self.assertEqual(n_expected, n_got)
+                pd.testing.assert_frame_equal(expected, got)
+
+    def test_flatten_plan_matches_per_record_flatten(self):
+        """Column-wise flattening equals _flatten_record on mixed layouts, and every JSON backend loads the same frame."""
+        import pandas as pd
+        from train_models import _FlattenPlan, _json_backends, _parse_files, load_features, set_json_backend
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "features_mixed.jsonl")
+            generate_synthetic_jsonl_with_wtt(data_path, num_records=40, num_wtt=6)
+            with open(data_path) as f:
+                records = [json.loads(line) for line in f]
+            # Heterogeneous sections: missing keys, list-valued news/execution fields, news as a list.
+            records[3]["market"].pop("funding_8h", None)
+            records[5]["execution"] = {"fills": [1, 2], "slippage": 0.1}
+            records[6]["execution"] = {"fills": 3, "slippage": 0.2}
+            records[7]["news"] = [{"sentiment": 0.5}, {"sentiment": -0.1}]
+            records[8]["labels"] = {}
+            expected = pd.DataFrame([_flatten_record(r) for r in records])
+            pd.testing.assert_frame_equal(_FlattenPlan().to_frame(records), expected)
+
+            frames = []
+            env_before = os.environ.get("VINCE_JSON_BACKEND")
+            try:
+                for name in _json_backends():
+                    set_json_backend(name)
+                    frames.append(load_features(data_path))
+                    # Parse workers get the selected backend explicitly, not through the environment
+                    serial = _parse_files([data_path], chunk_size=16, columns=None, workers=1)[0][0]
+                    parallel = _parse_files([data_path], chunk_size=16, columns=None, workers=2, split_bytes=4_000)[0][0]
+                    pd.testing.assert_frame_equal(parallel, serial)
+            finally:
+                set_json_backend("auto")
+            self.assertEqual(os.environ.get("VINCE_JSON_BACKEND"), env_before)
+            for frame in frames[1:]:
+                pd.testing.assert_frame_equal(frames[0], frame)
+
+    def test_incremental_training_warm_starts_on_new_rows(self):
+        """--incremental: first run is a full build; a later run loads only appended rows and warm-starts the models."""
+        try:
+            import joblib
+        except ImportError as e:
+            self.skipTest(f"ML deps not installed: {e}")
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = os.path.join(tmp, "features")
+            os.makedirs(data_dir)
+            output_dir = os.path.join(tmp, "models")
+            generate_synthetic_jsonl(os.path.join(data_dir, "features_a.jsonl"), num_records=120, assets=["BTC", "ETH"])
+
+            result = run_train_models(data_dir, output_dir, min_samples=30, extra_args=["--incremental"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                metadata = json.load(f)
+            self.assertEqual(metadata["incremental"]["mode"], "full")
+
+            with open(os.path.join(data_dir, "features_b.jsonl"), "w") as f:
+                for i in range(120, 150):
+                    rec = _synthetic_record(i, i % 3 != 1, 0.4, i % 4, asset=["BTC", "ETH"][i % 2])
+                    f.write(json.dumps(rec) + "\n")
+            result = run_train_models(data_dir, output_dir, min_samples=30, extra_args=["--incremental", "--warm-start-min-rows", "20"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                metadata = json.load(f)
+            incremental = metadata["incremental"]
+            self.assertEqual(incremental["mode"], "delta")
+            self.assertEqual(incremental["new_records"], 30)
+            self.assertEqual(metadata["total_records"], 150)
+            self.assertGreaterEqual(len(incremental["warm_started"]), 1)
+            self.assertEqual(len(incremental["high_water_mark"]), 2)
+            # The delta run appended a segment holding only its own rows
+            segments = joblib.load(os.path.join(output_dir, "incremental_state.joblib"))["segments"]
+            self.assertEqual(sorted(os.listdir(os.path.join(output_dir, "incremental_state"))), sorted(segments))
+            self.assertEqual(len(segments), 2)
+            last = joblib.load(os.path.join(output_dir, "incremental_state", segments[-1]))
+            self.assertEqual(len(last["frame"]), 30)
+            self.assertTrue(all(len(X) <= 30 for X, _, _ in last["prepared"].values()))
+            checks = incremental["warm_start_checks"]
+            self.assertEqual(incremental["warm_started"], sorted(n for n, c in checks.items() if c["accepted"]))
+            for name, check in checks.items():
+                # The shipped booster is scored on new rows it was not trained on
+                self.assertGreater(check["check_rows"], 0, name)
+                self.assertLess(check["check_rows"], check["new_rows"], name)
+                self.assertEqual(check["rounds"], check["previous_rounds"] + 50, name)
+                self.assertIn(check["metric"], check["warm_started"])
+                self.assertIn(check["metric"], check["previous"])
+
+            # Too few new rows, or an ensemble already at the round cap: full retrain, never a warm start
+            with open(os.path.join(data_dir, "features_b.jsonl"), "a") as f:
+                for i in range(150, 160):
+                    rec = _synthetic_record(i, i % 3 != 1, 0.4, i % 4, asset=["BTC", "ETH"][i % 2])
+                    f.write(json.dumps(rec) + "\n")
+            result = run_train_models(data_dir, output_dir, min_samples=30, extra_args=["--incremental", "--warm-start-min-rows", "20"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                incremental = json.load(f)["incremental"]
+            self.assertEqual(incremental["mode"], "delta")
+            self.assertEqual(incremental["warm_started"], [])
+            self.assertTrue(all("new rows <" in c["reason"] for c in incremental["warm_start_checks"].values()))
+            with open(os.path.join(data_dir, "features_b.jsonl"), "a") as f:
+                for i in range(160, 190):
+                    rec = _synthetic_record(i, i % 3 != 1, 0.4, i % 4, asset=["BTC", "ETH"][i % 2])
+                    f.write(json.dumps(rec) + "\n")
+            result = run_train_models(data_dir, output_dir, min_samples=30, extra_args=[
+                "--incremental", "--warm-start-min-rows", "20", "--warm-start-max-rounds", "1"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                incremental = json.load(f)["incremental"]
+            self.assertEqual(incremental["warm_started"], [])
+            self.assertTrue(all("rounds >" in c["reason"] for c in incremental["warm_start_checks"].values()))
+
+            # A full retrain drops the state, so the next --incremental run rebuilds instead of warm-starting
+            result = run_train_models(data_dir, output_dir, min_samples=30)
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            self.assertFalse(os.path.exists(os.path.join(output_dir, "incremental_state.joblib")))
+            self.assertFalse(os.path.exists(os.path.join(output_dir, "incremental_state")))
+            result = run_train_models(data_dir, output_dir, min_samples=30, extra_args=["--incremental"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                self.assertEqual(json.load(f)["incremental"]["mode"], "full")
+
+            # Models replaced by any other writer no longer match the hashes in the state: full rebuild
+            with open(os.path.join(data_dir, "features_b.jsonl"), "a") as f:
+                for i in range(190, 220):
+                    rec = _synthetic_record(i, i % 3 != 1, 0.4, i % 4, asset=["BTC", "ETH"][i % 2])
+                    f.write(json.dumps(rec) + "\n")
+            model_path = os.path.join(output_dir, "tp_optimizer.joblib")
+            joblib.dump(joblib.load(model_path), model_path, compress=3)
+            result = run_train_models(data_dir, output_dir, min_samples=30, extra_args=["--incremental"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                self.assertEqual(json.load(f)["incremental"]["mode"], "full")
+
+    def test_lag_features_match_groupby_shift(self):
+        """Vectorized lags equal per-asset groupby shifts; time windows average prior same-asset rows only."""
+        import numpy as np
+        import pandas as pd
+        from train_models import add_lag_features, save_feature_manifest
+
+        ts = 1700000000000 + np.arange(12) * 3_600_000
+        df = pd.DataFrame({
+            "timestamp": ts,
+            "asset": ["BTC", "ETH", "BTC", "BTC", "ETH", "SOL", "BTC", "ETH", "BTC", "SOL", "ETH", "BTC"],
+            "market_rsi14": [30.0, 40.0, np.nan, 50.0, 45.0, 60.0, 55.0, 41.0, 52.0, 61.0, np.nan, 58.0],
+        })
+        out = add_lag_features(df, windows=[1, 2], time_windows={"3h": 3 * 3_600_000})
+        for lag in (1, 2):
+            expected = df.groupby("asset")["market_rsi14"].shift(lag)
+            pd.testing.assert_series_equal(out[f"market_rsi14_lag{lag}"], expected, check_names=False)
+        pd.testing.assert_series_equal(
+            out["market_rsi14_roll2"], out[["market_rsi14_lag1", "market_rsi14_lag2"]].mean(axis=1), check_names=False,
+        )
+        # Non-contiguous lags: the mean is named after the lags it averages, not their count
+        sparse = add_lag_features(df, windows=[1, 5], time_windows={})
+        self.assertIn("market_rsi14_roll_lags1_5", sparse.columns)
+        self.assertFalse(any(c.endswith("_roll2") for c in sparse.columns))
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest_path = os.path.join(tmp, "m_features.json")
+            save_feature_manifest(["market_rsi14", "market_rsi14_roll_lags1_5"], manifest_path, "m", lag_windows=[5, 1], lag_time_windows={})
+            with open(manifest_path) as f:
+                self.assertEqual(json.load(f)["lag_features"], {"windows": [1, 5], "roll_suffix": "roll_lags1_5", "time_windows": {}})
+        # BTC at hour 6: prior BTC rows in [3h, 6h) are hours 3 (50.0); hour 2 is outside the window.
+        self.assertAlmostEqual(out.loc[6, "market_rsi14_roll3h"], 50.0)
+        # BTC at hour 3: prior BTC rows in [0h, 3h) are hour 0 (30.0) and hour 2 (NaN, ignored).
+        self.assertAlmostEqual(out.loc[3, "market_rsi14_roll3h"], 30.0)
+        self.assertTrue(np.isnan(out.loc[0, "market_rsi14_roll3h"]))
+
+    def test_clip_bounds_match_per_column_zscore_clipping(self):
+        """Fitted clip bounds reproduce per-column z-score clipping and can be re-applied to new rows."""
+        import numpy as np
+        import pandas as pd
+        from train_models import apply_clip_bounds, fit_clip_bounds
+
+        rng = np.random.default_rng(7)
+        values = rng.normal(size=200)
+        values[[5, 50]] = [40.0, -35.0]
+        values[10] = np.nan
+        df = pd.DataFrame({"x": values, "const": 1.0, "n": np.arange(200), "s": ["a"] * 200})
+        bounds = fit_clip_bounds(df)
+        self.assertEqual(set(bounds), {"x", "const", "n"})
+        self.assertEqual(bounds["const"]["std"], 0.0)
+
+        clipped = apply_clip_bounds(df, bounds)
+        filled = df["x"].fillna(df["x"].median())
+        z = (filled - filled.mean()).abs() / filled.std(ddof=0)
+        cap = df["x"].abs().quantile(0.99)
+        expected = df["x"].where(~(z > 3), df["x"].clip(-cap, cap))
+        pd.testing.assert_series_equal(clipped["x"], expected)
+        self.assertEqual(clipped["n"].dtype, np.float64)
+        self.assertTrue(clipped["s"].equals(df["s"]))
+
+        new_rows = pd.DataFrame({"x": [0.1, 100.0]})
+        self.assertAlmostEqual(apply_clip_bounds(new_rows, bounds)["x"].iloc[1], cap)
+
+    def test_shared_feature_matrices_match_per_model_prepare(self):
+        """build_feature_matrices and each prepare_* call reproduce the frozen output of the original per-model
+        preparation (fixtures/prepared_features_golden.json), as float32 views of one shared block."""
+        try:
+            import numpy as np
+            import pandas as pd
+            from train_models import (
+                add_lag_features,
+                build_feature_matrices,
+                load_features,
+                prepare_position_sizing_features,
+                prepare_signal_quality_features,
+                prepare_sl_features,
+                prepare_tp_features,
+            )
+        except ImportError as e:
+            self.skipTest(f"ML deps not installed: {e}")
+
+        with open(SCRIPT_DIR / "fixtures" / "prepared_features_golden.json") as f:
+            golden = json.load(f)["models"]
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "features.jsonl")
+            generate_synthetic_jsonl(data_path, num_records=60, include_sl_label=True, assets=["BTC", "ETH"])
+            df = add_lag_features(load_features(data_path))
+            shared = build_feature_matrices(df)
+            single = {
+                "signal_quality": prepare_signal_quality_features(df),
+                "position_sizing": prepare_position_sizing_features(df),
+                "tp_optimizer": prepare_tp_features(df),
+                "sl_optimizer": prepare_sl_features(df),
+            }
+            self.assertEqual(list(shared), list(golden))
+            for name, expected in golden.items():
+                for X, y in (shared[name], single[name]):
+                    self.assertEqual(X.columns.tolist(), expected["columns"], name)
+                    self.assertTrue(all(dtype == np.float32 for dtype in X.dtypes), name)
+                    np.testing.assert_array_equal(X.to_numpy(), np.asarray(expected["X"], dtype=np.float32), err_msg=name)
+                    np.testing.assert_array_equal(y.to_numpy(), np.asarray(expected["y"], dtype=y.dtype), err_msg=name)
+            # TP and SL label the same rows here, so their common columns come from the same memory
+            tp_X, sl_X = shared["tp_optimizer"][0], shared["sl_optimizer"][0]
+            self.assertTrue(np.shares_memory(tp_X["signal_strength"].to_numpy(), sl_X["signal_strength"].to_numpy()))
+
+    def test_training_matrix_is_one_contiguous_float32_buffer(self):
+        """_contiguous_float32 gives a C-contiguous float32 matrix that fits and row slices reuse without copies."""
+        import numpy as np
+        import pandas as pd
+        from train_models import _contiguous_float32, _time_split
+
+        X = pd.DataFrame({"a": np.arange(40), "b": np.linspace(0, 1, 40), "c": np.arange(40) % 2 == 0})
+        Xc = _contiguous_float32(X)
+        values = Xc.to_numpy()
+        self.assertEqual(values.dtype, np.float32)
+        self.assertTrue(values.flags["C_CONTIGUOUS"])
+        self.assertEqual(Xc.columns.tolist(), ["a", "b", "c"])
+        np.testing.assert_array_equal(values, X.to_numpy(dtype=np.float32))
+        # Idempotent and zero-copy on an already contiguous frame; time-split slices are views
+        self.assertTrue(np.shares_memory(_contiguous_float32(Xc).to_numpy(), values))
+        X_tr, _, X_val, _ = _time_split(Xc, pd.Series(np.zeros(40)))
+        self.assertTrue(np.shares_memory(X_tr.to_numpy(), values))
+        self.assertTrue(np.shares_memory(X_val.to_numpy(), values))
+
+    def test_binned_training_matrix_reuses_bins_with_identical_scores(self):
+        """BinnedTrainingMatrix bins each CV row range once and scores exactly like sklearn cross_val_score."""
+        try:
+            import numpy as np
+            import pandas as pd
+            import xgboost as xgb
+            from sklearn.model_selection import TimeSeriesSplit, cross_val_score
+            from train_models import BinnedTrainingMatrix
+        except ImportError as e:
+            self.skipTest(f"ML deps not installed: {e}")
+
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.normal(size=(300, 6)), columns=[f"x{i}" for i in range(6)])
+        y = pd.Series((X["x0"] + rng.normal(scale=0.5, size=300) > 0).astype(int))
+        w = np.linspace(0.5, 1.0, 300)
+        cv = TimeSeriesSplit(n_splits=3)
+        binned = BinnedTrainingMatrix(X, y, w)
+        for depth in (2, 4):
+            model = xgb.XGBClassifier(n_estimators=20, max_depth=depth, tree_method="hist", random_state=42)
+            expected = cross_val_score(model, X.astype(np.float32), y, cv=cv, scoring="roc_auc", params={"sample_weight": w})
+            np.testing.assert_array_equal(binned.cross_val_score(model, cv, "roc_auc"), expected)
+        self.assertEqual((binned.builds, binned.hits), (3, 3))
+        final = binned.fit(xgb.XGBClassifier(n_estimators=20, tree_method="hist", random_state=42))
+        self.assertEqual(final.get_booster().feature_names, X.columns.tolist())
+        np.testing.assert_array_equal(final.classes_, [0, 1])
+
+        # Multi-class and regression fits on the cached bins match a plain estimator.fit exactly
+        y_multi = pd.Series(np.digitize(X["x1"], [-0.5, 0.0, 0.5]))
+        multi = BinnedTrainingMatrix(X, y_multi).fit(xgb.XGBClassifier(n_estimators=10, tree_method="hist", random_state=42))
+        plain = xgb.XGBClassifier(n_estimators=10, tree_method="hist", random_state=42).fit(X, y_multi)
+        self.assertEqual(multi.n_classes_, 4)
+        np.testing.assert_array_equal(multi.predict_proba(X), plain.predict_proba(X))
+        y_reg = X["x2"] * 2.0 + rng.normal(scale=0.1, size=300)
+        reg = BinnedTrainingMatrix(X, y_reg, w).fit(xgb.XGBRegressor(n_estimators=10, tree_method="hist", random_state=42))
+        plain = xgb.XGBRegressor(n_estimators=10, tree_method="hist", random_state=42).fit(X, y_reg, sample_weight=w)
+        np.testing.assert_array_equal(reg.predict(X), plain.predict(X))
+
+        # Estimators the xgb.train path does not reproduce go through estimator.fit without touching the cache
+        fallback = binned.fit(xgb.XGBClassifier(n_estimators=5, tree_method="hist", callbacks=[xgb.callback.EvaluationMonitor(period=100)]))
+        self.assertEqual(fallback.get_booster().num_boosted_rounds(), 5)
+        self.assertEqual((binned.builds, binned.hits), (4, 3))
+
+    def test_fold_evaluator_shares_fits_between_walk_forward_and_holdout(self):
+        """FoldEvaluator scores holdout and walk-forward from n_splits fits, even for early-stopped models."""
+        try:
+            import numpy as np
+            import pandas as pd
+            import xgboost as xgb
+            from train_models import FoldEvaluator
+        except ImportError as e:
+            self.skipTest(f"ML deps not installed: {e}")
+
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.normal(size=(300, 5)), columns=[f"x{i}" for i in range(5)])
+        y = pd.Series((X["x0"] + rng.normal(scale=0.5, size=300) > 0).astype(int))
+        model = xgb.XGBClassifier(n_estimators=20, tree_method="hist", random_state=42, early_stopping_rounds=15)
+        evaluator = FoldEvaluator("signal_quality", X, y, sample_weight=np.linspace(0.5, 1.0, 300))
+        plan = evaluator.folds()
+        self.assertEqual(len(plan), 5)
+        self.assertEqual(plan[-1][3], 300, "last (holdout) fold should run to the final row")
+        for _, train_end, test_start, _ in plan:
+            self.assertEqual(test_start - train_end, 2, "purge gap between train and test")
+
+        holdout, wf = evaluator.evaluate(model)
+        self.assertEqual(evaluator.fits, 5)
+        self.assertEqual(wf["n_folds"], 5)
+        self.assertGreater(wf["mean_auc"], 0.7)
+        self.assertEqual(holdout, {"holdout_auc": wf["folds"][-1]["auc"], "holdout_accuracy": wf["folds"][-1]["accuracy"]})
+
+    def test_fold_evaluator_parallel_folds_match_serial(self):
+        """Fold fits on a thread pool aggregate to exactly the serial results, in fold order."""
+        try:
+            import numpy as np
+            import pandas as pd
+            import xgboost as xgb
+            from train_models import FoldEvaluator
+        except ImportError as e:
+            self.skipTest(f"ML deps not installed: {e}")
+
+        rng = np.random.default_rng(1)
+        X = pd.DataFrame(rng.normal(size=(400, 5)), columns=[f"x{i}" for i in range(5)])
+        y = pd.Series(X["x0"] * 2 + rng.normal(scale=0.3, size=400))
+        model = xgb.XGBRegressor(n_estimators=30, tree_method="hist", random_state=42, subsample=0.8)
+        serial = FoldEvaluator("position_sizing", X, y, n_splits=7, purge_gap=4, jobs=1)
+        parallel = FoldEvaluator("position_sizing", X, y, n_splits=7, purge_gap=4, jobs=3)
+        self.assertEqual(parallel.folds(), serial.folds())
+        holdout, wf = parallel.evaluate(model)
+        self.assertEqual((holdout, wf), serial.evaluate(model))
+        self.assertEqual([f["fold"] for f in wf["folds"]], list(range(7)))
+        self.assertEqual(parallel.fits, 7)
+
+    def test_parallel_schedule_splits_cores_by_expected_cost(self):
+        """--parallel gives each model a share of the cores proportional to rows x features x fits."""
+        try:
+            from train_models import _schedule_model_threads
+        except ImportError as e:
+            self.skipTest(f"ML deps not installed: {e}")
+
+        costs = {"signal_quality": 600.0, "position_sizing": 200.0, "tp_optimizer": 150.0, "sl_optimizer": 50.0}
+        threads = _schedule_model_threads(costs, 16)
+        self.assertEqual(sum(threads.values()), 16)
+        self.assertEqual(threads, {"signal_quality": 10, "position_sizing": 3, "tp_optimizer": 2, "sl_optimizer": 1})
+        self.assertTrue(all(t == 1 for t in _schedule_model_threads(costs, 2).values()), "never fewer than 1 thread")
+        self.assertEqual(set(_schedule_model_threads(dict.fromkeys(costs, 0.0), 8).values()), {2})
+        # The 1-thread floor must not push the total past the core count
+        skewed = _schedule_model_threads({"a": 100.0, "b": 1.0, "c": 1.0, "d": 1.0}, 8)
+        self.assertEqual(skewed, {"a": 5, "b": 1, "c": 1, "d": 1})
+        self.assertEqual(sum(_schedule_model_threads({"a": 1000.0, "b": 1.0, "c": 1.0, "d": 1.0}, 3).values()), 4)
+
+    def test_parallel_training_records_wall_clock_and_threads(self):
+        """--parallel training writes per-model wall-clock seconds and thread shares to the metadata."""
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "features.jsonl")
+            output_dir = os.path.join(tmp, "models")
+            generate_synthetic_jsonl(data_path, num_records=120)
+            result = run_train_models(data_path, output_dir, min_samples=50, extra_args=["--parallel"], timeout_sec=300)
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                metadata = json.load(f)
+            models_fit = metadata.get("models_fit", [])
+            self.assertGreaterEqual(len(models_fit), 1)
+            self.assertEqual(set(metadata["model_wall_clock_sec"]), set(models_fit))
+            self.assertTrue(all(v > 0 for v in metadata["model_wall_clock_sec"].values()))
+            self.assertEqual(set(metadata["parallel_threads"]), set(models_fit))
+
+    def test_shared_prepared_hands_workers_memory_mapped_matrices(self):
+        """SharedPrepared pickles only metadata; the loaded X/y are read-only memory maps equal to the originals."""
+        try:
+            import pickle
+            from pathlib import Path
+            import numpy as np
+            import pandas as pd
+            from train_models import SharedPrepared
+        except ImportError as e:
+            self.skipTest(f"ML deps not installed: {e}")
+
+        rng = np.random.default_rng(0)
+        index = pd.Index(np.arange(1000) * 3)
+        X = pd.DataFrame(rng.normal(size=(1000, 40)), index=index, columns=[f"f{i}" for i in range(40)])
+        y = pd.Series(rng.integers(0, 2, size=1000), index=index, name="label_profitable")
+        aux = pd.DataFrame({"asset": ["BTC", "ETH"] * 500}, index=index)
+        with tempfile.TemporaryDirectory() as tmp:
+            shared = SharedPrepared(Path(tmp), "signal_quality", (X, y, aux))
+            payload = pickle.dumps(shared)
+            self.assertLess(len(payload), X.to_numpy(dtype=np.float32).nbytes // 4)
+            X2, y2, aux2 = pickle.loads(payload).load()
+            bases, base = [], X2.to_numpy()
+            while base is not None:
+                bases.append(type(base))
+                base = getattr(base, "base", None)
+            self.assertIn(np.memmap, bases, "X should be a view over the memory-mapped file")
+            self.assertFalse(X2.to_numpy().flags.writeable)
+            pd.testing.assert_frame_equal(X2, X.astype(np.float32))
+            pd.testing.assert_series_equal(y2, y)
+            pd.testing.assert_frame_equal(aux2, aux)
+            del X2, y2
+
+    def test_profile_records_stage_timings_and_pstats(self):
+        """--profile-pstats writes wall/CPU/peak RSS per stage and per model plus loadable .pstats dumps."""
+        import pstats
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "features.jsonl")
+            output_dir = os.path.join(tmp, "models")
+            generate_synthetic_jsonl(data_path, num_records=120)
+            result = run_train_models(data_path, output_dir, min_samples=50, extra_args=["--profile-pstats"], timeout_sec=300)
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                metadata = json.load(f)
+            timings = metadata["timings"]
+            for stage in ("load", "lag_features", "clip_bounds", "prepare_features", "train_models", "report"):
+                self.assertIn(stage, timings["stages"])
+                record = timings["stages"][stage]
+                self.assertGreaterEqual(record["wall_sec"], 0)
+                self.assertGreaterEqual(record["cpu_sec"], 0)
+                self.assertEqual(record["calls"], 2 if stage == "report" else 1)
+            self.assertEqual(set(timings["models"]), set(metadata["models_fit"]))
+            for name, stages in timings["models"].items():
+                self.assertTrue({"train", "export", "evaluation", "shap"} <= set(stages), name)
+            sq = timings["models"]["signal_quality"]
+            self.assertGreater(sq["train"]["peak_rss_mb"], 0)
+            self.assertGreaterEqual(timings["stages"]["train_models"]["wall_sec"], sq["train"]["wall_sec"])
+            stats = pstats.Stats(os.path.join(timings["pstats_dir"], "signal_quality.train.pstats"))
+            self.assertGreater(stats.total_calls, 0)
+            self.assertTrue(os.path.isfile(os.path.join(timings["pstats_dir"], "load.pstats")))
+
+    def test_stage_profiler_peak_rss_is_per_stage(self):
+        """Peak RSS is sampled per stage: a stage after a large freed allocation does not inherit its peak."""
+        import time
+
+        try:
+            import numpy as np
+            from train_models import StageProfiler, _current_rss_mb
+        except ImportError as e:
+            self.skipTest(f"ML deps not installed: {e}")
+        if _current_rss_mb() is None:
+            self.skipTest("per-stage RSS needs /proc/self/statm")
+
+        profiler = StageProfiler()
+        with profiler.stage("outer"):
+            with profiler.stage("big"):
+                block = np.ones(256 << 17)  # 256 MB, touched
+                time.sleep(0.05)
+                del block
+            with profiler.stage("small"):
+                time.sleep(0.05)
+        stages = profiler.stages
+        self.assertGreater(stages["big"]["peak_rss_mb"], stages["small"]["peak_rss_mb"] + 128)
+        self.assertGreaterEqual(stages["outer"]["peak_rss_mb"], stages["big"]["peak_rss_mb"])
+
+    def test_onnx_latency_benchmark_records_percentiles_and_flags_regressions(self):
+        """Exported models get load time and p50/p95/p99 per batch size; a retrain is compared with the
+        previous *.onnx before promotion, slowdowns beyond the tolerance are flagged and, with
+        --reject-latency-regressions, the previous model is kept."""
+        from train_models import ONNX_AVAILABLE, compare_onnx_latency
+
+        if not ONNX_AVAILABLE:
+            self.skipTest("onnx not installed")
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError:
+            self.skipTest("onnxruntime not installed")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "features.jsonl")
+            output_dir = os.path.join(tmp, "models")
+            generate_synthetic_jsonl(data_path, num_records=120)
+            for _ in range(2):
+                result = run_train_models(data_path, output_dir, min_samples=50, extra_args=["--onnx-bench-runs", "20"], timeout_sec=300)
+                self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                metadata = json.load(f)
+            latency = metadata["onnx_latency"]
+            self.assertEqual(set(latency), set(metadata["models_trained"]))
+            for name, entry in latency.items():
+                self.assertGreater(entry["load_ms"], 0, name)
+                self.assertEqual(set(entry["batches"]), {"1", "8", "64", "1024"})
+                for stats in entry["batches"].values():
+                    self.assertLessEqual(stats["p50_ms"], stats["p95_ms"])
+                    self.assertLessEqual(stats["p95_ms"], stats["p99_ms"])
+                self.assertEqual(set(entry["p50_ratio"]), set(entry["batches"]), "Second run compares against the first")
+            self.assertIn("onnx_latency_regressions", metadata)
+            self.assertNotIn("onnx_latency_rejected", metadata, "Regressions are only reported by default")
+
+            # Deploy a one-round tp_optimizer: the retrained export is then far slower and, with
+            # --reject-latency-regressions, is held back before it replaces the deployed file.
+            import onnx
+            from train_models import truncate_tree_ensemble
+
+            deployed = Path(output_dir, "tp_optimizer.onnx")
+            onnx.save_model(truncate_tree_ensemble(onnx.load(str(deployed)), 1), str(deployed))
+            fast = deployed.read_bytes()
+            result = run_train_models(data_path, output_dir, min_samples=50, timeout_sec=300,
+                                      extra_args=["--onnx-bench-runs", "20", "--reject-latency-regressions"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                metadata = json.load(f)
+            self.assertIn("tp_optimizer", metadata["onnx_latency_rejected"])
+            self.assertEqual(metadata["onnx_latency_rejected"], metadata["onnx_latency_regressions"])
+            self.assertNotIn("tp_optimizer", metadata["models_trained"])
+            self.assertEqual(deployed.read_bytes(), fast)
+
+        def bench(p50s):
+            return {"load_ms": 1.0, "batches": {b: {"p50_ms": v} for b, v in p50s.items()}}
+
+        flagged = compare_onnx_latency(bench({"1": 0.5, "1024": 4.0}), bench({"1": 0.2, "1024": 4.0}), tolerance=1.25)
+        self.assertTrue(flagged["regression"])
+        self.assertEqual(flagged["slower_batches"], ["1"])
+        self.assertEqual(flagged["p50_ratio"], {"1": 2.5, "1024": 1.0})
+        noise = compare_onnx_latency(bench({"1": 0.02}), bench({"1": 0.01}), tolerance=1.25)
+        self.assertFalse(noise["regression"], "Sub-threshold absolute slowdowns are timer noise")
+
+    def test_onnx_optimize_promotes_smallest_variant_within_tolerance(self):
+        """--onnx-optimize builds raw/optimized/pruned variants in staging, each checked against XGBoost; the
+        promoted one becomes {name}.onnx and reproduces the XGBoost outputs within the tolerance."""
+        import hashlib
+        import joblib
+        import numpy as np
+        import pandas as pd
+        from train_models import ONNX_AVAILABLE, ONNX_VARIANTS_DIR, export_to_onnx, truncate_tree_ensemble, _boosting_rounds
+
+        if not ONNX_AVAILABLE:
+            self.skipTest("onnx not installed")
+        try:
+            import onnx
+            import onnxruntime as ort
+        except ImportError:
+            self.skipTest("onnxruntime not installed")
+
+        tolerance = 0.05
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "features.jsonl")
+            output_dir = os.path.join(tmp, "models")
+            generate_synthetic_jsonl(data_path, num_records=150, include_sl_label=True)
+            result = run_train_models(data_path, output_dir, min_samples=50, timeout_sec=300, extra_args=[
+                "--onnx-optimize", "--onnx-variant-tolerance", str(tolerance), "--no-onnx-bench",
+            ])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                metadata = json.load(f)
+            optimization = metadata["onnx_optimization"]
+            self.assertEqual(set(optimization), set(metadata["models_trained"]))
+            for name, info in optimization.items():
+                # Pruning is searched and verified on disjoint halves of the parity holdout rows
+                self.assertEqual(info["search_rows"] + info["verify_rows"], metadata["onnx_parity"][name]["rows"])
+                self.assertGreater(info["verify_rows"], 0)
+                variants = info["variants"]
+                self.assertTrue({"raw", "optimized"} <= set(variants), name)
+                self.assertTrue(variants["raw"]["passed"], f"{name}: raw export must match XGBoost")
+                promoted = variants[info["promoted"]]
+                self.assertTrue(promoted["passed"])
+                self.assertEqual(
+                    promoted["size_bytes"], min(v["size_bytes"] for v in variants.values() if v["passed"]), name,
+                )
+                if "pruned" in variants:
+                    self.assertLess(variants["pruned"]["rounds"], info["rounds"])
+                with open(os.path.join(output_dir, f"{name}.onnx"), "rb") as f:
+                    self.assertEqual(hashlib.sha256(f.read()).hexdigest(), promoted["sha256"])
+                self.assertEqual(metadata["onnx_hashes"][name], promoted["sha256"])
+            # Only the promoted file is kept; no variants next to the deployed artifacts
+            self.assertFalse(os.path.exists(os.path.join(output_dir, ONNX_VARIANTS_DIR)))
+            self.assertFalse(os.path.exists(os.path.join(output_dir, ".staging")))
+
+            raw_path = os.path.join(tmp, "tp_optimizer.raw.onnx")
+            with open(os.path.join(output_dir, "tp_optimizer_features.json")) as f:
+                features = json.load(f)["features"]
+            model = joblib.load(os.path.join(output_dir, "tp_optimizer.joblib"))
+            self.assertTrue(export_to_onnx(model, pd.DataFrame(np.zeros((1, len(features)), dtype=np.float32), columns=features), raw_path, "tp_optimizer"))
+            raw = onnx.load(raw_path)
+            rounds, per_round = _boosting_rounds(raw)
+            self.assertEqual(per_round, 4)
+            rows = np.random.default_rng(0).normal(size=(16, raw.graph.input[0].type.tensor_type.shape.dim[1].dim_value)).astype(np.float32)
+            one_round = ort.InferenceSession(truncate_tree_ensemble(raw, 1).SerializeToString(), providers=["CPUExecutionProvider"])
+            self.assertEqual(one_round.run(["probabilities"], {"input": rows})[0].shape, (16, 4))
+            self.assertLess(len(truncate_tree_ensemble(raw, 1).SerializeToString()), len(raw.SerializeToString()))
+
+    def test_onnx_parity_check_scores_holdout_and_fails_bad_exports(self):
+        """Every export is compared with XGBoost on the holdout rows in one batched call; a graph outside the
+        tolerance is not shipped (no {name}.onnx, not in models_trained)."""
+        import numpy as np
+        import pandas as pd
+        from train_models import (
+            ONNX_AVAILABLE, check_onnx_parity, export_to_onnx, truncate_tree_ensemble, train_position_sizing_model,
+        )
+
+        if not ONNX_AVAILABLE:
+            self.skipTest("onnx not installed")
+        try:
+            import onnx
+            import onnxruntime  # noqa: F401
+        except ImportError:
+            self.skipTest("onnxruntime not installed")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "features.jsonl")
+            output_dir = os.path.join(tmp, "models")
+            generate_synthetic_jsonl(data_path, num_records=120)
+            result = run_train_models(data_path, output_dir, min_samples=50, timeout_sec=300,
+                                      extra_args=["--onnx-parity-tolerance", "0", "--no-onnx-bench"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                metadata = json.load(f)
+            parity = metadata["onnx_parity"]
+            self.assertEqual(set(parity), set(metadata["models_fit"]))
+            for name, check in parity.items():
+                self.assertGreater(check["rows"], 0)
+                self.assertLess(check["rows"], metadata["trades_with_outcomes"], "Only the holdout rows are scored")
+                self.assertLessEqual(check["mean_abs_error"], check["max_abs_error"])
+                self.assertEqual(check["passed"], check["max_abs_error"] == 0, name)
+                self.assertEqual(name in metadata["models_trained"], check["passed"], name)
+                self.assertEqual(os.path.isfile(os.path.join(output_dir, f"{name}.onnx")), check["passed"], name)
+            self.assertEqual(metadata.get("onnx_parity_failed", []), sorted(n for n, c in parity.items() if not c["passed"]))
+
+            rng = np.random.default_rng(0)
+            X = pd.DataFrame(rng.normal(size=(300, 6)).astype(np.float32), columns=[f"c{i}" for i in range(6)])
+            y = pd.Series(X["c0"] * 2 + X["c1"] + rng.normal(scale=0.1, size=300))
+            model = train_position_sizing_model(X, y)
+            onnx_path = os.path.join(tmp, "position_sizing.onnx")
+            self.assertTrue(export_to_onnx(model, X.iloc[:1], onnx_path, "position_sizing"))
+            good = check_onnx_parity(onnx_path, model, X.iloc[-100:], "position_sizing", tolerance=1e-4)
+            self.assertTrue(good["passed"], good)
+            self.assertEqual(good["rows"], 100)
+            onnx.save_model(truncate_tree_ensemble(onnx.load(onnx_path), 1), onnx_path)
+            bad = check_onnx_parity(onnx_path, model, X.iloc[-100:], "position_sizing", tolerance=1e-4)
+            self.assertFalse(bad["passed"])
+            self.assertGreater(bad["max_abs_error"], 1e-4)
+
+    def test_failed_onnx_parity_keeps_previously_deployed_model(self):
+        """A retrain whose export fails the parity check leaves the deployed .onnx, feature manifest and joblib
+        of that model untouched; models that pass replace theirs."""
+        import hashlib
+
+        from train_models import ONNX_AVAILABLE, STAGING_DIR
+
+        if not ONNX_AVAILABLE:
+            self.skipTest("onnx not installed")
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError:
+            self.skipTest("onnxruntime not installed")
+
+        artifacts = ("{}.onnx", "{}_features.json", "{}.joblib")
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "features.jsonl")
+            output_dir = os.path.join(tmp, "models")
+            generate_synthetic_jsonl(data_path, num_records=150, include_sl_label=True)
+            result = run_train_models(data_path, output_dir, min_samples=50, timeout_sec=300, extra_args=["--no-onnx-bench"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                first = json.load(f)
+            deployed = {
+                name: {a: Path(output_dir, a.format(name)).read_bytes() for a in artifacts}
+                for name in first["models_trained"]
+            }
+
+            generate_synthetic_jsonl(data_path, num_records=210, include_sl_label=True)
+            result = run_train_models(data_path, output_dir, min_samples=50, timeout_sec=300,
+                                      extra_args=["--onnx-parity-tolerance", "0", "--no-onnx-bench"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                second = json.load(f)
+            failed = second.get("onnx_parity_failed", [])
+            self.assertTrue(failed, "A zero tolerance should reject at least one export")
+            for name, files in deployed.items():
+                for a, before in files.items():
+                    after = Path(output_dir, a.format(name)).read_bytes()
+                    if name in failed:
+                        self.assertEqual(after, before, f"{a.format(name)} was replaced by a rejected export")
+                    elif a.endswith(".onnx"):
+                        self.assertEqual(hashlib.sha256(after).hexdigest(), second["onnx_hashes"][name])
+            self.assertFalse(os.path.exists(os.path.join(output_dir, STAGING_DIR)))
+
+    def test_onnx_bundle_runs_all_models_from_one_union_input(self):
+        """--onnx-bundle writes one graph with a union-feature input and one output per model; on raw rows
+        (with outliers) each output equals that model's own .onnx run on its apply_clip_bounds-clipped columns."""
+        import numpy as np
+        import pandas as pd
+        from train_models import ONNX_AVAILABLE, ONNX_BUNDLE_FILE, ONNX_BUNDLE_MANIFEST, apply_clip_bounds
+
+        if not ONNX_AVAILABLE:
+            self.skipTest("onnx not installed")
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            self.skipTest("onnxruntime not installed")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "features.jsonl")
+            output_dir = os.path.join(tmp, "models")
+            generate_synthetic_jsonl(data_path, num_records=150, include_sl_label=True)
+            result = run_train_models(data_path, output_dir, min_samples=50, timeout_sec=300,
+                                      extra_args=["--onnx-bundle", "--onnx-bench-runs", "20"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                metadata = json.load(f)
+            bundle_info = metadata["onnx_bundle"]
+            self.assertTrue(bundle_info["written"])
+            self.assertEqual(bundle_info["models"], metadata["models_trained"])
+            self.assertTrue(all(e == 0 for e in bundle_info["parity_max_abs_error"].values()), bundle_info)
+            self.assertIn("separate_p50_sum_ms", bundle_info["latency"])
+            with open(os.path.join(output_dir, ONNX_BUNDLE_MANIFEST)) as f:
+                manifest = json.load(f)
+            self.assertEqual(manifest["n_features"], len(manifest["features"]))
+            self.assertEqual(len(set(manifest["features"])), manifest["n_features"])
+
+            bundle = ort.InferenceSession(os.path.join(output_dir, ONNX_BUNDLE_FILE), providers=["CPUExecutionProvider"])
+            self.assertEqual([i.name for i in bundle.get_inputs()], ["input"])
+            rng = np.random.default_rng(0)
+            raw = pd.DataFrame(rng.normal(scale=50, size=(64, manifest["n_features"])).astype(np.float32), columns=manifest["features"])
+            outputs = dict(zip([o.name for o in bundle.get_outputs()], bundle.run(None, {"input": raw.to_numpy()})))
+            clipped_any = False
+            for name, entry in manifest["models"].items():
+                self.assertEqual([manifest["features"][i] for i in entry["indices"]], entry["features"])
+                with open(os.path.join(output_dir, f"{name}_features.json")) as f:
+                    self.assertEqual(json.load(f)["features"], entry["features"])
+                columns = raw[entry["features"]]
+                clipped = apply_clip_bounds(columns, entry.get("clip_bounds", {})).astype(np.float32)
+                clipped_any = clipped_any or not np.array_equal(clipped.to_numpy(), columns.to_numpy())
+                single = ort.InferenceSession(os.path.join(output_dir, f"{name}.onnx"), providers=["CPUExecutionProvider"])
+                expected = single.run(None, {"input": clipped.to_numpy()})
+                np.testing.assert_array_equal(outputs[entry["output"]], expected[0])
+                if "probabilities" in entry:
+                    np.testing.assert_allclose(outputs[entry["probabilities"]], expected[1], atol=1e-6)
+            self.assertTrue(clipped_any, "Raw rows should exercise the in-graph clipping")
+
+    def test_native_export_writes_ubj_and_tree_arrays_matching_xgboost(self):
+        """Each model also ships as <name>.ubj and <name>.trees.npz; TreeArrays scores like XGBoost (missing values
+        included) without xgboost, and the native ONNX converter passes the holdout parity check."""
+        import joblib
+        import numpy as np
+        import pandas as pd
+        from train_models import ONNX_AVAILABLE, TreeArrays, _xgboost_reference
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "features.jsonl")
+            output_dir = os.path.join(tmp, "models")
+            generate_synthetic_jsonl(data_path, num_records=150, include_sl_label=True)
+            result = run_train_models(data_path, output_dir, min_samples=50, timeout_sec=300, extra_args=["--no-onnx-bench"])
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                metadata = json.load(f)
+            self.assertEqual(sorted(metadata["native_models"]), sorted(metadata["models_trained"]))
+
+            rng = np.random.default_rng(0)
+            for name, native in metadata["native_models"].items():
+                self.assertLessEqual(native["tree_arrays"]["max_abs_error"], 1e-4)
+                for fmt in ("ubj", "tree_arrays", "joblib"):
+                    self.assertGreater(native[fmt]["size_bytes"], 0)
+                    self.assertGreaterEqual(native[fmt]["load_ms"], 0)
+                model = joblib.load(os.path.join(output_dir, f"{name}.joblib"))
+                features = model.get_booster().feature_names
+                X = pd.DataFrame(rng.normal(scale=3, size=(200, len(features))).astype(np.float32), columns=features)
+                X = X.mask(rng.random(X.shape) < 0.2)
+                flat = TreeArrays.load(os.path.join(output_dir, f"{name}.trees.npz"))
+                self.assertEqual(flat.feature_names, features)
+                expected = _xgboost_reference(model, X)
+                np.testing.assert_allclose(flat.predict(X).reshape(len(X), -1), expected, atol=1e-5)
+                # The wrapper keeps best_iteration from the UBJSON file; a bare Booster would score every round
+                native_model = type(model)()
+                native_model.load_model(os.path.join(output_dir, f"{name}.ubj"))
+                np.testing.assert_allclose(_xgboost_reference(native_model, X), expected, atol=1e-6)
+                if ONNX_AVAILABLE:
+                    self.assertTrue(metadata["onnx_parity"][name]["passed"], metadata["onnx_parity"][name])
+
+    def test_native_onnx_export_does_not_need_onnxmltools(self):
+        """With onnxmltools unimportable the default native converter still exports every model (passing the
+        parity check); only --onnx-converter onnxmltools is unavailable."""
+        from train_models import ONNX_AVAILABLE
+
+        if not ONNX_AVAILABLE:
+            self.skipTest("onnx not installed")
+
+        def train_without_onnxmltools(data_path: str, output_dir: str, *extra: str) -> dict:
+            argv = [str(SCRIPT_DIR / "train_models.py"), "--data", data_path, "--output", output_dir,
+                    "--min-samples", "50", "--no-onnx-bench", *extra]
+            code = (
+                "import runpy, sys; sys.modules['onnxmltools'] = None; "
+                f"sys.argv = {argv!r}; runpy.run_path(sys.argv[0], run_name='__main__')"
+            )
+            result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                    cwd=str(SCRIPT_DIR), timeout=300)
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(os.path.join(output_dir, "training_metadata.json")) as f:
+                return json.load(f)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "features.jsonl")
+            generate_synthetic_jsonl(data_path, num_records=150, include_sl_label=True)
+            metadata = train_without_onnxmltools(data_path, os.path.join(tmp, "native"))
+            self.assertEqual(len(metadata["models_fit"]), 4)
+            self.assertEqual(metadata["models_trained"], metadata["models_fit"])
+            for name in metadata["models_trained"]:
+                self.assertTrue(os.path.isfile(os.path.join(tmp, "native", f"{name}.onnx")))
+                if "onnx_parity" in metadata:
+                    self.assertTrue(metadata["onnx_parity"][name]["passed"], name)
+
+            metadata = train_without_onnxmltools(data_path, os.path.join(tmp, "legacy"), "--onnx-converter", "onnxmltools")
+            self.assertEqual(metadata["models_trained"], [])
+            self.assertEqual(len(metadata["models_fit"]), 4)
+
+    def test_benchmark_harness_writes_comparable_results(self):
+        """benchmark_train_models.py times every stage per size and compares against a baseline results file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "bench.json")
+            cmd = [
+                sys.executable, str(SCRIPT_DIR / "benchmark_train_models.py"), "--sizes", "300,600",
+                "--data-dir", os.path.join(tmp, "data"), "--output", output, "--no-export",
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(SCRIPT_DIR), timeout=300)
+            self.assertEqual(result.returncode, 0, f"stdout={result.stdout!r} stderr={result.stderr!r}")
+            with open(output) as f:
+                report = json.load(f)
+            self.assertEqual(report["sizes"], [300, 600])
+            for size in ("300", "600"):
+                stages = report["results"][size]
+                self.assertEqual(stages["load_features"]["rows"], int(size))
+                for stage in ("add_lag_features", "prepare.signal_quality", "train.signal_quality", "build_improvement_report"):
+                    self.assertGreater(stages[stage]["rows_per_sec"], 0, stage)
+                    self.assertGreater(stages[stage]["peak_rss_mb"], 0, stage)
+            self.assertIn("exponent", report["scaling"]["load_features"])
+            self.assertEqual(len(os.listdir(os.path.join(tmp, "data"))), 2, "feature stores are cached per size")
+
+            result = subprocess.run(
+                cmd[:-3] + ["--output", os.path.join(tmp, "bench2.json"), "--no-export", "--baseline", output],
+                capture_output=True, text=True, cwd=str(SCRIPT_DIR), timeout=300,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn("Wall-time ratio vs baseline", result.stderr)
+
+    def test_optuna_study_resumes_and_warm_starts_from_storage(self):
+        """Studies persist in SQLite: same data resumes without new trials, new data enqueues the last best params."""
+        try:
+            import numpy as np
+            import pandas as pd
+            from train_models import OPTUNA_AVAILABLE, BinnedTrainingMatrix, _run_optuna_study
+        except ImportError as e:
+            self.skipTest(f"ML deps not installed: {e}")
+        if not OPTUNA_AVAILABLE:
+            self.skipTest("optuna not installed")
+
+        def objective(trial):
+            x = trial.suggest_float("x", -5.0, 5.0)
+            return -(x - 1.0) ** 2
+
+        X = pd.DataFrame({"a": np.arange(20.0)})
+        with tempfile.TemporaryDirectory() as tmp:
+            tuning = {"jobs": 1, "pruner": "median", "storage": os.path.join(tmp, "studies.db")}
+            first, _ = _run_optuna_study("demo", objective, BinnedTrainingMatrix(X, pd.Series(np.zeros(20))), 6, tuning)
+            self.assertEqual(len(first.trials), 6)
+            again, stats = _run_optuna_study("demo", objective, BinnedTrainingMatrix(X, pd.Series(np.zeros(20))), 6, tuning)
+            self.assertEqual(again.study_name, first.study_name)
+            self.assertEqual(len(again.trials), 6, "Same data should resume the finished study, not rerun it")
+            self.assertTrue(stats["resumed"])
+            self.assertEqual(stats["trials_run"], 0)
+            fresh, _ = _run_optuna_study("demo", objective, BinnedTrainingMatrix(X, pd.Series(np.ones(20))), 2, tuning)
+            self.assertNotEqual(fresh.study_name, first.study_name)
+            self.assertEqual(fresh.trials[0].params, first.best_params, "New data should start from the last best params")
+
+    def test_multi_fidelity_tuning_promotes_few_trials_to_full_budget(self):
+        """--tune-fidelity multi scores candidates on recent rows/fewer trees first and promotes only survivors."""
+        try:
+            import numpy as np
+            import pandas as pd
+            from train_models import OPTUNA_AVAILABLE, tune_model
+        except ImportError as e:
+            self.skipTest(f"ML deps not installed: {e}")
+        if not OPTUNA_AVAILABLE:
+            self.skipTest("optuna not installed")
+
+        rng = np.random.default_rng(3)
+        X = pd.DataFrame(rng.normal(size=(600, 5)), columns=[f"x{i}" for i in range(5)])
+        y = pd.Series(X["x0"] - X["x1"] + rng.normal(scale=0.3, size=600))
+        tuning = {"jobs": 1, "pruner": "halving", "storage": None, "fidelity": "multi", "n_trials": 9}
+        model, stats = tune_model("position_sizing", X, y, tuning=tuning)
+        self.assertIsNotNone(model)
+        self.assertEqual(stats["fidelity"], "multi")
+        per_rung = stats["trials_per_rung"]
+        self.assertEqual(per_rung[0], 9)
+        self.assertEqual(per_rung, sorted(per_rung, reverse=True))
+        self.assertLess(per_rung[-1], per_rung[0], "Some candidates should stop before the full budget")
+        self.assertLess(stats["relative_compute"], 1.0)
+
     def test_build_improvement_report_includes_wtt_performance(self):
         """build_improvement_report() includes wtt_performance when there are >= 5 WTT trades."""
         from train_models import load_features, build_improvement_report
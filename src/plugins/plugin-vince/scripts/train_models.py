@@ -29,40 +29,61 @@ Usage:
   feature store adds new sources.
 
 Requirements:
-    pip3 install -r requirements.txt  (xgboost scikit-learn pandas numpy onnx onnxmltools joblib; scipy optional)
+    pip3 install -r requirements.txt  (xgboost scikit-learn pandas numpy onnx onnxmltools joblib)
 """
 
 import argparse
+import collections
 import concurrent.futures
+import contextlib
+import copy
+import cProfile
 import hashlib
 import json
 import logging
 import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
 from datetime import datetime
+from itertools import count, repeat
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
 import joblib
-from sklearn.model_selection import TimeSeriesSplit, cross_val_score, GridSearchCV
+from sklearn.base import clone, is_classifier
+from sklearn.model_selection import TimeSeriesSplit, GridSearchCV
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import (
     accuracy_score,
+    get_scorer,
     log_loss,
     mean_absolute_error,
     mean_squared_error,
     roc_auc_score,
 )
 
+import xgboost as xgb
+
+# ONNX export needs onnx (the native converter builds the graph itself); onnxmltools is only needed for
+# --onnx-converter onnxmltools and as the fallback for boosters the native converter does not cover.
 try:
-    import xgboost as xgb
     import onnx
-    from onnxmltools.convert.xgboost import convert as convert_xgboost
-    from onnxmltools.convert.common.data_types import FloatTensorType
     ONNX_AVAILABLE = True
 except ImportError:
     ONNX_AVAILABLE = False
+
+try:
+    from onnxmltools.convert.xgboost import convert as convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+    ONNXMLTOOLS_AVAILABLE = True
+except ImportError:
+    ONNXMLTOOLS_AVAILABLE = False
     convert_xgboost = None  # type: ignore
     FloatTensorType = None  # type: ignore
 
@@ -75,6 +96,30 @@ def _get_train_n_jobs() -> int:
     return -1
 
 
+# Cores this process may use. None = all of them; a --parallel model worker gets its share from
+# _schedule_model_threads() so concurrent models do not oversubscribe the machine.
+_CORE_BUDGET: int | None = None
+
+
+def _available_cores() -> int:
+    return _CORE_BUDGET or os.cpu_count() or 1
+
+
+def _set_core_budget(threads: int | None) -> None:
+    global _CORE_BUDGET
+    _CORE_BUDGET = threads
+
+
+def _resolve_jobs(requested: int | None) -> int:
+    """Parallel jobs for a --*-jobs/--load-workers option: 1 under CI / VINCE_TRAIN_NJOBS=1, else requested
+    (0/None = all available cores)."""
+    if _get_train_n_jobs() == 1:
+        return 1
+    if not requested or requested < 0:
+        return _available_cores()
+    return int(requested)
+
+
 try:
     import optuna
     optuna.logging.set_verbosity(optuna.logging.WARNING)
@@ -88,11 +133,59 @@ try:
 except ImportError:
     SHAP_AVAILABLE = False
 
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+def _json_backends() -> Dict[str, Any]:
+    """Installed JSON decoders, fastest first. All take bytes and return plain dict/list/str/number objects."""
+    backends: Dict[str, Any] = {}
+    try:
+        import orjson
+        backends["orjson"] = orjson.loads
+    except ImportError:
+        pass
+    try:
+        import msgspec
+        backends["msgspec"] = msgspec.json.Decoder().decode
+    except ImportError:
+        pass
+    backends["json"] = json.loads
+    return backends
+
+
+def set_json_backend(name: str | None = None) -> str:
+    """Select the decoder used by load_features: 'auto' (fastest installed), 'orjson', 'msgspec' or 'json'.
+
+    Defaults to $VINCE_JSON_BACKEND, else auto. The choice is module state (JSON_BACKEND); parse worker
+    processes are handed the selected name explicitly. Lines a fast decoder rejects (e.g. NaN literals)
+    are retried with stdlib json.
+    """
+    global JSON_BACKEND, _json_decode
+    name = (name or os.environ.get("VINCE_JSON_BACKEND") or "auto").lower()
+    backends = _json_backends()
+    if name == "auto":
+        name = next(iter(backends))
+    elif name not in backends:
+        logger.warning("JSON backend %s not installed; using stdlib json", name)
+        name = "json"
+    JSON_BACKEND, _json_decode = name, backends[name]
+    return name
+
+
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 if not ONNX_AVAILABLE:
-    logger.warning("ONNX export not available. Install: pip3 install onnx onnxmltools")
+    logger.warning("ONNX export not available. Install: pip3 install onnx")
+
+# Decoder for load_features until set_json_backend() picks one (main() does, from --json-backend).
+JSON_BACKEND = "json"
+_json_decode = json.loads
 
 
 def setup_logging_to_file(output_dir: Path, verbose: bool = False) -> None:
@@ -105,6 +198,119 @@ def setup_logging_to_file(output_dir: Path, verbose: bool = False) -> None:
     logger.info("Logging to %s", log_path)
 
 
+# Per-stage profiling (--profile). Peak RSS is per stage on Linux, sampled from /proc/self/statm by a
+# background thread while any stage is open; elsewhere it is the process high-water mark at the end of the stage.
+PROFILE_DIR = "profile"
+RSS_SAMPLE_INTERVAL_SEC = 0.01
+
+
+def _current_rss_mb() -> float | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1 << 20)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+class _RssSampler:
+    """Running RSS maximum for each open stage, fed by one daemon thread that runs while any stage is open."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL_SEC):
+        self.interval = interval
+        self._peaks: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._stop: threading.Event | None = None
+        self._tokens = count()
+
+    def _sample(self) -> None:
+        rss = _current_rss_mb()
+        if rss is None:
+            return
+        with self._lock:
+            for token, peak in self._peaks.items():
+                self._peaks[token] = max(peak, rss)
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            self._sample()
+
+    def open(self) -> int:
+        with self._lock:
+            token = next(self._tokens)
+            self._peaks[token] = 0.0
+            if self._stop is None:
+                self._stop = threading.Event()
+                threading.Thread(target=self._run, args=(self._stop,), name="rss-sampler", daemon=True).start()
+        self._sample()
+        return token
+
+    def close(self, token: int) -> float | None:
+        """Stop tracking a stage; returns its peak RSS in MB (the process high-water mark without /proc)."""
+        self._sample()
+        with self._lock:
+            peak = self._peaks.pop(token)
+            if not self._peaks and self._stop is not None:
+                self._stop.set()
+                self._stop = None
+        return peak if peak > 0 else _peak_rss_mb()
+
+
+_RSS_SAMPLER = _RssSampler()
+
+
+class StageProfiler:
+    """Wall time, CPU time (all threads) and peak RSS per named stage, accumulated over repeated stages.
+
+    With pstats_dir set, stages entered with pstats=True (not nested in another such stage) are also run
+    under cProfile and dumped to <pstats_dir>/<prefix><stage>.pstats.
+    """
+
+    def __init__(self, pstats_dir: Path | None = None, prefix: str = ""):
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.pstats_dir = pstats_dir
+        self.prefix = prefix
+        self._profiling = False
+
+    @contextlib.contextmanager
+    def stage(self, name: str, pstats: bool = True):
+        profile = None
+        if self.pstats_dir is not None and pstats and not self._profiling:
+            profile = cProfile.Profile()
+        rss_token = _RSS_SAMPLER.open()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profile is not None:
+            self._profiling = True
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._profiling = False
+                self.pstats_dir.mkdir(parents=True, exist_ok=True)
+                profile.dump_stats(str(self.pstats_dir / f"{self.prefix}{name}.pstats"))
+            peak = _RSS_SAMPLER.close(rss_token) or 0.0
+            record = self.stages.setdefault(name, {"wall_sec": 0.0, "cpu_sec": 0.0, "calls": 0, "peak_rss_mb": 0.0})
+            record["wall_sec"] = round(record["wall_sec"] + time.perf_counter() - wall, 4)
+            record["cpu_sec"] = round(record["cpu_sec"] + time.process_time() - cpu, 4)
+            record["calls"] += 1
+            record["peak_rss_mb"] = round(max(record["peak_rss_mb"], peak), 1)
+
+
+def _profiled(profiler: StageProfiler | None, name: str, pstats: bool = True):
+    """profiler.stage(name) or a no-op context when not profiling."""
+    return profiler.stage(name, pstats=pstats) if profiler is not None else contextlib.nullcontext()
+
+
 # ==========================================
 # Feature Engineering
 # ==========================================
@@ -125,102 +331,599 @@ def _jsonl_paths(data_path: str, real_only: bool = False) -> List[str]:
     return []
 
 
-def load_features(filepath: str, real_only: bool = False) -> pd.DataFrame:
-    """Load feature records from JSONL file(s) exported by FeatureStore (one JSON object per line).
-    If filepath is a directory, loads features_*.jsonl and combined.jsonl; optionally exclude synthetic_*.jsonl when real_only=True."""
-    paths = _jsonl_paths(filepath, real_only=real_only)
-    if not paths:
-        logger.warning("No JSONL files found at %s", filepath)
-        return pd.DataFrame()
+# Rows flattened per chunk in load_features(). Peak memory while loading is bounded by one chunk of
+# parsed dicts plus the typed column buffers already built, instead of the whole corpus as Python objects.
+LOAD_CHUNK_SIZE = 50_000
 
-    records = []
-    for path_str in paths:
-        with open(path_str, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
+
+def _iter_jsonl_records(path_str: str, start: int = 0, end: int | None = None):
+    """Yield parsed JSON objects from one JSONL file, line by line. Invalid lines are logged and skipped.
+
+    With a byte range, yields only the lines that *start* inside [start, end), so adjacent ranges of the
+    same file partition its lines exactly (used for parallel parsing of very large files).
+    """
+    decode = _json_decode
+    with open(path_str, "rb") as f:
+        pos = start
+        if start > 0:
+            # Finish the line straddling `start`; it belongs to the previous range.
+            f.seek(start - 1)
+            pos = start - 1 + len(f.readline())
+        for line in f:
+            if end is not None and pos >= end:
+                break
+            pos += len(line)
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield decode(line)
+            except ValueError:
                 try:
-                    records.append(json.loads(line))
-                except json.JSONDecodeError as e:
+                    yield json.loads(line)
+                except ValueError as e:
                     logger.warning("Skipping invalid JSON line in %s: %s", path_str, e)
-    logger.info("Loaded %d records from %s (%d file(s))", len(records), filepath, len(paths))
 
-    flat_records = []
-    for r in records:
-        if not isinstance(r, dict):
+
+class _PrefixedNames(dict):
+    """key -> prefix + key, built once per distinct key instead of an f-string per field per record."""
+
+    def __init__(self, prefix: str):
+        super().__init__()
+        self.prefix = prefix
+
+    def __missing__(self, key: str) -> str:
+        name = self[key] = self.prefix + key
+        return name
+
+
+_EMPTY: Dict[str, Any] = {}
+_SKIP_SIGNAL_KEYS = frozenset(("sources", "factors"))
+# Sections whose list-valued fields are dropped (news headlines, execution TP ladders).
+_SCALAR_ONLY_SECTIONS = frozenset(("news", "execution"))
+_consume = collections.deque(maxlen=0).extend
+
+
+class _FlattenPlan:
+    """Flattens whole chunks of FeatureStore records into market_*/session_*/signal_*/.../label_* columns.
+
+    Records without an id or timestamp are dropped. Each nested section is compiled once per distinct key layout into the tuple of output columns
+    (None for skipped fields: signal sources/factors, list values in news/execution). When every
+    record in a chunk shares a section's layout (the normal case for FeatureStore output) the
+    section is read column by column with C-level itemgetter maps; otherwise its values are written per row
+    into preallocated buffers. The few derived fields (drivers, sentiment averages, label fallbacks,
+    WTT) are computed per row. Column order is the first-appearance union of each row's flattened
+    keys, rebuilt from the distinct row shapes, so the chunk frame is identical to a DataFrame of the
+    per-record flattened dicts (test_train_models.py checks it against a per-record reference flattener).
+    """
+
+    _SECTIONS = (
+        ("market", "market_"), ("session", "session_"), ("signal", "signal_"), ("regime", "regime_"),
+        ("news", "news_"), ("execution", "exec_"), ("outcome", "outcome_"), ("labels", "label_"),
+    )
+    _WTT_COLUMNS = (
+        "wtt_primary", "wtt_alignment", "wtt_edge", "wtt_payoffShape", "wtt_timingForgiveness", "wtt_invalidateHit",
+    )
+
+    def __init__(self):
+        self.names = {section: _PrefixedNames(prefix) for section, prefix in self._SECTIONS}
+        self.layouts: Dict[Tuple[str, tuple, tuple], tuple] = {}
+
+    def _layout(self, section: str, keys: tuple, is_list: tuple) -> tuple:
+        layout_key = (section, keys, is_list)
+        names = self.layouts.get(layout_key)
+        if names is None:
+            prefixed = self.names[section]
+            skip = _SKIP_SIGNAL_KEYS if section == "signal" else ()
+            names = self.layouts[layout_key] = tuple(
+                None if (k in skip or (is_list and is_list[j])) else prefixed[k] for j, k in enumerate(keys)
+            )
+        return names
+
+    def to_frame(self, records: List[Any]) -> pd.DataFrame:
+        records = [r for r in records if isinstance(r, dict) and r.get('id') is not None and r.get('timestamp') is not None]
+        n = len(records)
+        if not n:
+            return pd.DataFrame()
+        missing = np.nan
+        cols: Dict[str, List[Any]] = {
+            'id': [r['id'] for r in records],
+            'timestamp': [r['timestamp'] for r in records],
+            'asset': [r.get('asset') or '' for r in records],
+        }
+
+        def column(name: str) -> List[Any]:
+            buf = cols.get(name)
+            if buf is None:
+                buf = cols[name] = [missing] * n
+            return buf
+
+        news_raw = [r.get('news', _EMPTY) for r in records]
+        section_dicts = {
+            "market": [r.get('market') or _EMPTY for r in records],
+            "session": [r.get('session') or _EMPTY for r in records],
+            "signal": [r.get('signal') or _EMPTY for r in records],
+            "regime": [r.get('regime') or _EMPTY for r in records],
+            "news": [x if isinstance(x, dict) else _EMPTY for x in news_raw],
+            "execution": [r.get('execution') or _EMPTY for r in records],
+            "outcome": [r.get('outcome') or _EMPTY for r in records],
+            "labels": [r.get('labels') or _EMPTY for r in records],
+        }
+
+        # Per section: one layout for the whole chunk (homogeneous) or a layout per row.
+        section_names: Dict[str, tuple] = {}
+        row_names: Dict[str, List[tuple]] = {}
+        setitem = list.__setitem__
+        for section, dicts in section_dicts.items():
+            keys = list(map(tuple, dicts))
+            if keys.count(keys[0]) == n:
+                values = [list(map(itemgetter(k), dicts)) for k in keys[0]]
+                is_list: tuple = ()
+                if section in _SCALAR_ONLY_SECTIONS:
+                    # List-valued fields are skipped; only a field that is a list in some rows but not others needs per-row handling.
+                    is_list = tuple(any(map(isinstance, v, repeat(list))) for v in values)
+                    mixed = any(flag and not all(map(isinstance, v, repeat(list))) for flag, v in zip(is_list, values))
+                if section not in _SCALAR_ONLY_SECTIONS or not mixed:
+                    names = section_names[section] = self._layout(section, keys[0], is_list)
+                    for name, v in zip(names, values):
+                        if name is not None:
+                            cols[name] = v
+                    continue
+            if section in _SCALAR_ONLY_SECTIONS:
+                flags = [tuple(map(isinstance, d.values(), repeat(list))) for d in dicts]
+            else:
+                flags = repeat(())
+            per_row = row_names[section] = [self._layout(section, k, f) for k, f in zip(keys, flags)]
+            sink: List[Any] = [missing] * n
+            bufs_by_layout: Dict[tuple, tuple] = {}
+            for i, (names, d) in enumerate(zip(per_row, dicts)):
+                if not names:
+                    continue
+                bufs = bufs_by_layout.get(names)
+                if bufs is None:
+                    bufs = bufs_by_layout[names] = tuple(sink if nm is None else column(nm) for nm in names)
+                _consume(map(setitem, bufs, repeat(i), d.values()))
+
+        # Derived fields (written after the sections; none of them can be overwritten by a later section).
+        signals, outcomes, labels_l = section_dicts["signal"], section_dicts["outcome"], section_dicts["labels"]
+        sources_l = [s.get('sources') or [] for s in signals]
+        drivers_l = [r.get('decisionDrivers') or s.get('factors') or [] for r, s in zip(records, signals)]
+        cols['decision_drivers'] = [d if isinstance(d, list) else [] for d in drivers_l]
+        cols['signal_source_count'] = list(map(len, sources_l))
+        cols['label_profitable'] = [lb.get('profitable') if lb else o.get('profitable') for lb, o in zip(labels_l, outcomes)]
+        has_avg, has_news_avg, has_mae, has_wtt = [False] * n, [False] * n, [False] * n, [False] * n
+        for i, (signal, sources) in enumerate(zip(signals, sources_l)):
+            if sources and isinstance(sources[0], dict):
+                sents = [x.get('sentiment', 0) for x in sources if isinstance(x.get('sentiment'), (int, float))]
+                column('signal_avg_sentiment')[i] = float(np.mean(sents)) if sents else 0.0
+                has_avg[i] = True
+            elif signal.get('avgSentiment') is not None:
+                column('signal_avg_sentiment')[i] = float(signal['avgSentiment'])
+                has_avg[i] = True
+        for i, news in enumerate(news_raw):
+            if isinstance(news, list) and news:
+                sents = [x.get('sentiment', 0) for x in news if isinstance(x, dict) and isinstance(x.get('sentiment'), (int, float))]
+                column('news_avg_sentiment')[i] = float(np.mean(sents)) if sents else 0.0
+                has_news_avg[i] = True
+        for i, (labels, outcome) in enumerate(zip(labels_l, outcomes)):
+            if outcome and 'maxAdverseExcursion' not in labels:
+                exc = outcome.get('maxAdverseExcursion')
+                if exc is not None:
+                    column('label_maxAdverseExcursion')[i] = float(exc)
+                    has_mae[i] = True
+        for i, r in enumerate(records):
+            wtt = r.get('wtt')
+            if wtt:
+                column('wtt_primary')[i] = 1 if wtt.get('primary') else 0
+                column('wtt_alignment')[i] = wtt.get('alignment', 0)
+                column('wtt_edge')[i] = wtt.get('edge', 0)
+                column('wtt_payoffShape')[i] = wtt.get('payoffShape', 0)
+                column('wtt_timingForgiveness')[i] = wtt.get('timingForgiveness', 0)
+                column('wtt_invalidateHit')[i] = 1 if wtt.get('invalidateHit') else 0
+                has_wtt[i] = True
+
+        # Column order: union of each distinct row shape's flattened key sequence, in row order.
+        hetero = [row_names[s] for s, _ in self._SECTIONS if s in row_names]
+        shapes = zip(zip(*hetero) if hetero else repeat((), n), has_avg, has_news_avg, has_mae, has_wtt)
+        order: Dict[str, None] = {}
+        for row_layouts, avg, news_avg, mae, wtt in dict.fromkeys(shapes):
+            layouts = dict(section_names)
+            layouts.update(zip((s for s, _ in self._SECTIONS if s in row_names), row_layouts))
+            seq: List[str] = ['id', 'timestamp', 'asset']
+            for section, _ in self._SECTIONS:
+                seq.extend(nm for nm in layouts[section] if nm is not None)
+                if section == "signal":
+                    seq += ['decision_drivers', 'signal_source_count'] + (['signal_avg_sentiment'] if avg else [])
+                elif section == "news" and news_avg:
+                    seq.append('news_avg_sentiment')
+            seq.append('label_profitable')
+            if mae:
+                seq.append('label_maxAdverseExcursion')
+            if wtt:
+                seq.extend(self._WTT_COLUMNS)
+            for name in seq:
+                order.setdefault(name)
+        return pd.DataFrame({name: cols[name] for name in order})
+
+
+def _chunk_to_frame(records: List[Any], columns: List[str] | None = None, plan: _FlattenPlan | None = None) -> pd.DataFrame:
+    """Flatten one chunk of raw records into typed column buffers (a DataFrame), optionally keeping only `columns`."""
+    chunk = (plan or _FlattenPlan()).to_frame(records)
+    if columns is not None:
+        chunk = chunk[[c for c in columns if c in chunk.columns]]
+    return chunk
+
+
+# infer_dtype() results for object chunk columns -> value kind used by _common_chunk_dtype
+_OBJECT_VALUE_KINDS = {"boolean": "bool", "integer": "int", "floating": "float", "mixed-integer-float": "float", "string": "str"}
+
+
+def _common_chunk_dtype(parts: List[pd.Series | None]) -> Any:
+    """Dtype pd.DataFrame(all_records) would infer for one column split across chunks (None = chunk lacks it).
+
+    Each chunk's column is already typed, so its dtype (or infer_dtype for object columns) stands for all
+    of its values; only the value kinds present and whether any value is missing decide the result.
+    """
+    kinds: set = set()
+    has_null = False
+    none_only = True  # every value is None (not NaN): the one all-null case that stays object
+    str_dtype = None
+    for part in parts:
+        if part is None:
+            has_null, none_only = True, False
             continue
-        id_ = r.get('id')
-        ts = r.get('timestamp')
-        asset = r.get('asset')
-        if id_ is None or ts is None:
+        null = part.isna()
+        if null.any():
+            has_null = True
+        if null.all():
+            none_only = none_only and part.dtype == object and bool(np.equal(part.to_numpy(), None).all())
             continue
-        flat = {'id': id_, 'timestamp': ts, 'asset': asset or ''}
-
-        for k, v in r.get('market', {}).items():
-            flat[f'market_{k}'] = v
-        for k, v in r.get('session', {}).items():
-            flat[f'session_{k}'] = v
-        signal = r.get('signal', {})
-        for k, v in signal.items():
-            if k != 'sources' and k != 'factors':
-                flat[f'signal_{k}'] = v
-        sources = signal.get('sources', [])
-        drivers = r.get('decisionDrivers') or signal.get('factors') or []
-        flat['decision_drivers'] = drivers if isinstance(drivers, list) else []
-        flat['signal_source_count'] = len(sources)
-        if sources and isinstance(sources[0], dict):
-            sents = [s.get('sentiment', 0) for s in sources if isinstance(s.get('sentiment'), (int, float))]
-            flat['signal_avg_sentiment'] = float(np.mean(sents)) if sents else 0.0
-        elif signal.get('avgSentiment') is not None:
-            flat['signal_avg_sentiment'] = float(signal['avgSentiment'])
-        for k, v in r.get('regime', {}).items():
-            flat[f'regime_{k}'] = v
-        news = r.get('news', {})
-        if isinstance(news, dict):
-            for k, v in news.items():
-                if not isinstance(v, list):
-                    flat[f'news_{k}'] = v
-        elif isinstance(news, list) and news:
-            sents = [n.get('sentiment', 0) for n in news if isinstance(n, dict) and isinstance(n.get('sentiment'), (int, float))]
-            flat['news_avg_sentiment'] = float(np.mean(sents)) if sents else 0.0
-        execution = r.get('execution') or {}
-        if execution:
-            for k, v in execution.items():
-                if not isinstance(v, list):
-                    flat[f'exec_{k}'] = v
-        outcome = r.get('outcome') or {}
-        if outcome:
-            for k, v in outcome.items():
-                flat[f'outcome_{k}'] = v
-        labels = r.get('labels') or {}
-        if labels:
-            for k, v in labels.items():
-                flat[f'label_{k}'] = v
-        flat['label_profitable'] = labels.get('profitable') if labels else outcome.get('profitable')
-        if 'label_maxAdverseExcursion' not in flat and outcome:
-            exc = outcome.get('maxAdverseExcursion')
-            if exc is not None:
-                flat['label_maxAdverseExcursion'] = float(exc)
-        wtt = r.get('wtt')
-        if wtt:
-            flat['wtt_primary'] = 1 if wtt.get('primary') else 0
-            flat['wtt_alignment'] = wtt.get('alignment', 0)
-            flat['wtt_edge'] = wtt.get('edge', 0)
-            flat['wtt_payoffShape'] = wtt.get('payoffShape', 0)
-            flat['wtt_timingForgiveness'] = wtt.get('timingForgiveness', 0)
-            flat['wtt_invalidateHit'] = 1 if wtt.get('invalidateHit') else 0
-
-        flat_records.append(flat)
-
-    df = pd.DataFrame(flat_records)
-    if df.empty:
-        logger.warning("No valid records after flattening")
-        return df
+        if pd.api.types.is_bool_dtype(part.dtype):
+            kinds.add("bool")
+        elif pd.api.types.is_integer_dtype(part.dtype):
+            kinds.add("int")
+        elif pd.api.types.is_float_dtype(part.dtype):
+            kinds.add("float")
+        elif pd.api.types.is_string_dtype(part.dtype) and part.dtype != object:
+            kinds.add("str")
+            str_dtype = part.dtype
+        else:
+            kinds.add(_OBJECT_VALUE_KINDS.get(pd.api.types.infer_dtype(part, skipna=True), "object"))
+    if not kinds:
+        return np.dtype(object) if none_only else np.dtype(np.float64)
+    if kinds == {"int"} and not has_null:
+        return np.dtype(np.int64)
+    if kinds <= {"int", "float"}:
+        return np.dtype(np.float64)
+    if kinds == {"bool"} and not has_null:
+        return np.dtype(bool)
+    if kinds == {"str"} and str_dtype is not None:
+        return str_dtype
+    return np.dtype(object)
+
+
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Append chunk frames into the final frame.
+
+    Chunks are typed independently, so a column can disagree across chunks (all-null in one, bool vs
+    int in another, absent from a third). Each such column gets the dtype a single
+    pd.DataFrame(all_records) would have inferred, and every chunk is cast/reindexed to it before the
+    concat, so no column is rebuilt from Python objects.
+    """
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    order: Dict[str, None] = {}
+    chunk_dtypes: Dict[str, set] = {}
+    for chunk in chunks:
+        for c, dt in chunk.dtypes.items():
+            order.setdefault(c, None)
+            chunk_dtypes.setdefault(c, set()).add(dt)
+    columns = list(order)
+    mixed = {
+        c: _common_chunk_dtype([chunk[c] if c in chunk.columns else None for chunk in chunks])
+        for c, dts in chunk_dtypes.items()
+        if len(dts) > 1 or any(c not in chunk.columns for chunk in chunks)
+    }
+    if mixed:
+        aligned = []
+        for chunk in chunks:
+            if len(chunk.columns) != len(columns):
+                chunk = chunk.reindex(columns=columns)
+            aligned.append(chunk.astype({c: dt for c, dt in mixed.items() if chunk[c].dtype != dt}))
+        chunks = aligned
+    return pd.concat(chunks, ignore_index=True, sort=False)
+
+
+def _finalize_loaded_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce timestamp to numeric, drop rows without one and sort by time."""
     if 'timestamp' in df.columns:
         df['timestamp'] = pd.to_numeric(df['timestamp'], errors='coerce')
         df = df.dropna(subset=['timestamp'])
         df = df.sort_values('timestamp').reset_index(drop=True)
+    return df
+
+
+def _load_jsonl_file(
+    path_str: str, chunk_size: int = LOAD_CHUNK_SIZE, columns: List[str] | None = None,
+    start: int = 0, end: int | None = None,
+) -> Tuple[pd.DataFrame, int]:
+    """Stream one JSONL file (or a byte range of it) into a flattened, unsorted frame. Returns (frame, raw record count)."""
+    chunk_size = max(1, int(chunk_size))
+    plan = _FlattenPlan()
+    n_records = 0
+    chunks: List[pd.DataFrame] = []
+    pending: List[Any] = []
+    for r in _iter_jsonl_records(path_str, start=start, end=end):
+        n_records += 1
+        pending.append(r)
+        if len(pending) >= chunk_size:
+            chunks.append(_chunk_to_frame(pending, columns, plan))
+            pending = []
+    if pending:
+        chunks.append(_chunk_to_frame(pending, columns, plan))
+    return _concat_chunks([c for c in chunks if len(c.columns)]), n_records
+
+
+# Files larger than this are split into newline-aligned byte ranges so one huge
+# combined.jsonl can still be parsed by several workers.
+LOAD_SPLIT_BYTES = 64 << 20
+
+
+def _parse_range_worker(
+    path_str: str, start: int, end: int | None, chunk_size: int, columns: List[str] | None, json_backend: str,
+) -> Tuple[Dict[str, Any], int]:
+    """Process-pool entry point: parse a byte range and return {column: array} plus the raw record count.
+
+    json_backend is the parent's JSON_BACKEND (a spawned worker would otherwise start from the default).
+    Column arrays (numpy / Arrow-backed) pickle far more compactly than the per-record dicts.
+    """
+    if json_backend != JSON_BACKEND:
+        set_json_backend(json_backend)
+    frame, n = _load_jsonl_file(path_str, chunk_size=chunk_size, columns=columns, start=start, end=end)
+    return {c: frame[c].values for c in frame.columns}, n
+
+
+def _parse_files(
+    paths: List[str], chunk_size: int, columns: List[str] | None, workers: int,
+    split_bytes: int = LOAD_SPLIT_BYTES,
+) -> List[Tuple[pd.DataFrame, int]]:
+    """Parse each file into (frame, raw record count), in `paths` order.
+
+    With workers > 1, files (and byte ranges of files larger than split_bytes) are parsed in a process
+    pool; range results are re-joined per file in offset order so the output matches serial parsing.
+    """
+    if workers <= 1:
+        return [_load_jsonl_file(p, chunk_size=chunk_size, columns=columns) for p in paths]
+
+    tasks: List[Tuple[int, str, int, int | None]] = []
+    for i, p in enumerate(paths):
+        size = os.path.getsize(p)
+        n_ranges = max(1, -(-size // max(1, split_bytes)))
+        step = -(-size // n_ranges) if size else 0
+        for r in range(n_ranges):
+            tasks.append((i, p, r * step, (r + 1) * step if r < n_ranges - 1 else None))
+    if len(tasks) <= 1:
+        return [_load_jsonl_file(p, chunk_size=chunk_size, columns=columns) for p in paths]
+
+    workers = min(workers, len(tasks))
+    logger.info("Parsing %d file(s) as %d task(s) with %d worker process(es)", len(paths), len(tasks), workers)
+    per_file: List[List[Tuple[pd.DataFrame, int]]] = [[] for _ in paths]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_parse_range_worker, p, start, end, chunk_size, columns, JSON_BACKEND) for _, p, start, end in tasks]
+        for (i, _, _, _), fut in zip(tasks, futures):
+            cols, n = fut.result()
+            per_file[i].append((pd.DataFrame(cols, copy=False), n))
+    return [
+        (_concat_chunks([f for f, _ in parts if len(f.columns)]), sum(n for _, n in parts))
+        for parts in per_file
+    ]
+
+
+# ==========================================
+# Feature Cache (columnar, per source file)
+# ==========================================
+
+# Bump when _FlattenPlan output changes so stale cached columns are discarded.
+FEATURE_CACHE_VERSION = 1
+FEATURE_CACHE_DIRNAME = ".feature_cache"
+_FEATURE_CACHE_MANIFEST = "manifest.json"
+
+
+def _sha256_file(path: str, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _default_feature_cache_dir(data_path: str) -> Path:
+    """Cache lives next to the JSONL files: <dir>/.feature_cache (for a single file, its parent directory)."""
+    p = Path(data_path)
+    return (p if p.is_dir() else p.parent) / FEATURE_CACHE_DIRNAME
+
+
+class FeatureCache:
+    """On-disk Arrow IPC cache of flattened load_features() output, one file per source JSONL.
+
+    Entries are keyed by source path, size, mtime and SHA-256. Size + mtime unchanged is trusted
+    as-is; otherwise the content hash decides (a touched-but-identical file keeps its entry).
+    Arrow files are memory-mapped on read. Object columns (decision_drivers, mixed bool/int) are
+    stored JSON-encoded so None/NaN and bool/int survive the round trip exactly.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.manifest_path = self.cache_dir / _FEATURE_CACHE_MANIFEST
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._fingerprints: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get("version") == FEATURE_CACHE_VERSION:
+                self.entries = manifest.get("files") or {}
+            else:
+                self._dirty = True
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    def _fingerprint(self, path_str: str, entry: Dict[str, Any] | None) -> Dict[str, Any]:
+        st = os.stat(path_str)
+        fp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        if entry and entry.get("size") == fp["size"] and entry.get("mtime_ns") == fp["mtime_ns"]:
+            fp["sha256"] = entry.get("sha256")
+        else:
+            fp["sha256"] = _sha256_file(path_str)
+        return fp
+
+    def get(self, path_str: str, columns: List[str] | None) -> Tuple[pd.DataFrame, int] | None:
+        """Return (frame, raw record count) for one source file when its fingerprint matches, else None."""
+        key = str(Path(path_str).resolve())
+        entry = self.entries.get(key)
+        fp = self._fingerprint(path_str, entry)
+        self._fingerprints[key] = fp
+        if entry and entry.get("sha256") == fp["sha256"]:
+            try:
+                df = self._read(self.cache_dir / entry["cache_file"], entry.get("json_columns") or [], columns)
+                if fp["mtime_ns"] != entry.get("mtime_ns"):
+                    entry.update(fp)
+                    self._dirty = True
+                self.hits += 1
+                return df, int(entry.get("n_records", len(df)))
+            except Exception as e:
+                logger.warning("Feature cache entry unreadable for %s (%s); re-parsing", path_str, e)
+        self.misses += 1
+        return None
+
+    def put(self, path_str: str, df: pd.DataFrame, n_records: int) -> None:
+        """Store the full flattened frame for a source file (fingerprinted by the preceding get())."""
+        key = str(Path(path_str).resolve())
+        fp = self._fingerprints.pop(key, None) or self._fingerprint(path_str, None)
+        try:
+            self._write(key, df, n_records, fp)
+        except Exception as e:
+            logger.warning("Could not write feature cache for %s: %s", path_str, e)
+
+    def _write(self, key: str, df: pd.DataFrame, n_records: int, fp: Dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        json_columns = []
+        out = df.copy()
+        for c in out.columns[out.dtypes == object]:
+            if pd.api.types.infer_dtype(out[c], skipna=False) == "string":
+                continue
+            out[c] = [json.dumps(v) for v in out[c].tolist()]
+            json_columns.append(c)
+        table = pa.Table.from_pandas(out, preserve_index=False)
+        cache_file = f"{Path(key).stem}-{fp['sha256'][:16]}.arrow"
+        tmp = self.cache_dir / (cache_file + ".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, self.cache_dir / cache_file)
+        old = self.entries.get(key)
+        if old and old.get("cache_file") != cache_file:
+            (self.cache_dir / old["cache_file"]).unlink(missing_ok=True)
+        self.entries[key] = {
+            **fp, "cache_file": cache_file, "n_records": n_records, "n_rows": len(df),
+            "json_columns": json_columns,
+        }
+        self._dirty = True
+
+    @staticmethod
+    def _read(cache_path: Path, json_columns: List[str], columns: List[str] | None) -> pd.DataFrame:
+        with pa.memory_map(str(cache_path), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+            if columns is not None:
+                table = table.select([c for c in columns if c in table.column_names])
+            df = table.to_pandas()
+        for c in json_columns:
+            if c in df.columns:
+                df[c] = pd.Series([json.loads(v) for v in df[c].tolist()], index=df.index, dtype=object)
+        return df
+
+    def save(self) -> None:
+        """Persist the manifest. Entries whose source file no longer exists are pruned with their Arrow file."""
+        for key in list(self.entries):
+            if not Path(key).exists():
+                (self.cache_dir / self.entries[key]["cache_file"]).unlink(missing_ok=True)
+                del self.entries[key]
+                self._dirty = True
+        if not self._dirty:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"version": FEATURE_CACHE_VERSION, "files": self.entries}, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+        self._dirty = False
+
+
+def load_features(
+    filepath: str, real_only: bool = False, chunk_size: int = LOAD_CHUNK_SIZE,
+    columns: List[str] | None = None, use_cache: bool = False, cache_dir: str | None = None,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """Load feature records from JSONL file(s) exported by FeatureStore (one JSON object per line).
+    If filepath is a directory, loads features_*.jsonl and combined.jsonl; optionally exclude synthetic_*.jsonl when real_only=True.
+
+    Records are streamed: every `chunk_size` records are flattened into a typed chunk frame, so the raw
+    dicts never accumulate for the whole corpus. Pass `columns` to keep only those flattened columns
+    (e.g. validate_ml_improvement.py only needs labels and signal strength/confidence).
+    With use_cache=True (requires pyarrow), each file's flattened columns are cached under
+    cache_dir (default <data dir>/.feature_cache) and only new or changed files are re-parsed.
+    workers > 1 parses files (and byte ranges of large files) in a process pool; see _resolve_jobs.
+    """
+    paths = _jsonl_paths(filepath, real_only=real_only)
+    if not paths:
+        logger.warning("No JSONL files found at %s", filepath)
+        return pd.DataFrame()
+
+    if columns is not None and "timestamp" not in columns:
+        columns = list(columns) + ["timestamp"]
+    cache = None
+    if use_cache:
+        if PYARROW_AVAILABLE:
+            cache = FeatureCache(Path(cache_dir) if cache_dir else _default_feature_cache_dir(filepath))
+        else:
+            logger.info("pyarrow not installed; feature cache disabled (pip3 install pyarrow)")
+
+    loaded: List[Tuple[pd.DataFrame, int] | None] = [None] * len(paths)
+    if cache is not None:
+        loaded = [cache.get(p, columns) for p in paths]
+    to_parse = [i for i, r in enumerate(loaded) if r is None]
+    if to_parse:
+        # The cache stores full frames, so misses are parsed without the column filter.
+        parse_columns = None if cache is not None else columns
+        parsed = _parse_files([paths[i] for i in to_parse], chunk_size, parse_columns, workers)
+        for i, (frame, n) in zip(to_parse, parsed):
+            if cache is not None:
+                cache.put(paths[i], frame, n)
+                if columns is not None:
+                    frame = frame[[c for c in columns if c in frame.columns]]
+            loaded[i] = (frame, n)
+    if cache is not None:
+        try:
+            cache.save()
+        except OSError as e:
+            logger.warning("Could not save feature cache manifest: %s", e)
+        logger.info("Feature cache %s: %d hit(s), %d re-parsed", cache.cache_dir, cache.hits, cache.misses)
+
+    n_records = sum(n for _, n in loaded)
+    frames = [frame for frame, _ in loaded if len(frame.columns)]
+    del loaded
+    logger.info("Loaded %d records from %s (%d file(s))", n_records, filepath, len(paths))
+
+    df = _concat_chunks(frames)
+    del frames
+    if df.empty:
+        logger.warning("No valid records after flattening")
+        return df
+    df = _finalize_loaded_frame(df)
     logger.info("DataFrame shape: %s", df.shape)
     return df
 
@@ -236,42 +939,120 @@ LAG_SOURCE_COLUMNS = [
     "market_oiChange24h", "market_dvol",
 ]
 
-# Number of prior trades to look back (per asset)
+# Number of prior trades to look back (per asset). The mean over these lags is named after the trades it
+# spans: _roll{k} when the lags are 1..k (a k-trade window, _roll3 by default), otherwise _roll_lags{a}_{b}...
 LAG_WINDOWS = [1, 2, 3]
 
+# Time-based rolling means per asset over prior trades, label -> window in ms (timestamps are ms).
+# Empty by default; e.g. {"6h": 6 * 3_600_000} adds market_rsi14_roll6h. See --lag-time-windows.
+LAG_TIME_WINDOWS: Dict[str, int] = {}
 
-def add_lag_features(df: pd.DataFrame) -> pd.DataFrame:
+_TIME_WINDOW_UNITS_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000}
+
+
+def parse_time_window(label: str) -> int:
+    """'30m' / '6h' / '1d' -> window length in ms."""
+    label = label.strip().lower()
+    if len(label) < 2 or label[-1] not in _TIME_WINDOW_UNITS_MS or not label[:-1].isdigit() or int(label[:-1]) <= 0:
+        raise ValueError(f"Invalid time window {label!r}; expected e.g. 30m, 6h or 1d")
+    return int(label[:-1]) * _TIME_WINDOW_UNITS_MS[label[-1]]
+
+
+def _lag_roll_suffix(windows: List[int]) -> str:
+    """Suffix of the mean over the lags: roll{k} for lags 1..k, else roll_lags{a}_{b}... (e.g. roll_lags1_5)."""
+    windows = sorted(set(windows))
+    if windows == list(range(1, len(windows) + 1)):
+        return f"roll{len(windows)}"
+    return "roll_lags" + "_".join(map(str, windows))
+
+
+def _lag_feature_names(col: str, windows: List[int], time_windows: Dict[str, int]) -> List[str]:
+    names = [f"{col}_lag{lag}" for lag in windows]
+    if windows:
+        names.append(f"{col}_{_lag_roll_suffix(windows)}")
+    return names + [f"{col}_roll{label}" for label in time_windows]
+
+
+def _is_lag_feature(col: str) -> bool:
+    return "_lag" in col or "_roll" in col
+
+
+def add_lag_features(
+    df: pd.DataFrame, windows: List[int] | None = None, time_windows: Dict[str, int] | None = None,
+) -> pd.DataFrame:
     """Add lagged market features from prior trades (per asset, time-ordered).
 
-    Creates columns like market_priceChange24h_lag1, market_priceChange24h_lag2, etc.
-    Also adds rolling means (lag1-3 average) for key columns.
-    Only uses columns that exist in the DataFrame. Fills NaN for early rows.
+    Creates columns like market_priceChange24h_lag1, market_priceChange24h_lag2, etc., a mean over those
+    lags (_roll3 for the default windows; see _lag_roll_suffix) and one _roll{label} mean per time window over the
+    asset's trades in [t - window, t). Only uses columns that exist in the DataFrame. Fills NaN for early rows.
+
+    All source columns are handled as one float block: rows are grouped by asset once (stable sort of
+    the factorized asset codes), every lag is a single row offset within that grouped block, and the
+    new columns are attached in one concat instead of one insert per column.
     """
     if df.empty or "timestamp" not in df.columns:
         return df
+    windows = LAG_WINDOWS if windows is None else sorted(set(windows))
+    time_windows = LAG_TIME_WINDOWS if time_windows is None else time_windows
 
     df = df.sort_values("timestamp").reset_index(drop=True)
     available_lag_cols = [c for c in LAG_SOURCE_COLUMNS if c in df.columns]
-    if not available_lag_cols:
+    if not available_lag_cols or not (windows or time_windows):
         return df
 
-    has_asset = "asset" in df.columns and df["asset"].nunique() > 1
-
-    for col in available_lag_cols:
-        for lag in LAG_WINDOWS:
-            lag_name = f"{col}_lag{lag}"
-            if has_asset:
-                df[lag_name] = df.groupby("asset")[col].shift(lag)
-            else:
-                df[lag_name] = df[col].shift(lag)
-
-        # Rolling mean of last 3 trades
-        lag_cols_for_roll = [f"{col}_lag{i}" for i in LAG_WINDOWS if f"{col}_lag{i}" in df.columns]
-        if lag_cols_for_roll:
-            df[f"{col}_roll3"] = df[lag_cols_for_roll].mean(axis=1)
-
-    lag_count = sum(1 for c in df.columns if "_lag" in c or "_roll3" in c)
-    logger.info("Added %d lag/rolling features from %d source columns", lag_count, len(available_lag_cols))
+    n, m = len(df), len(available_lag_cols)
+    if "asset" in df.columns and df["asset"].nunique() > 1:
+        codes = pd.factorize(df["asset"])[0]
+    else:
+        codes = np.zeros(n, dtype=np.intp)
+    # Group-sorted layout: rows of each asset are contiguous and stay time-ordered.
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    group_start = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1]
+    pos = np.arange(n) - np.repeat(group_start, np.diff(np.r_[group_start, n]))
+    valid_group = sorted_codes >= 0  # NaN assets are excluded from groupby in the original semantics
+    block = np.column_stack([
+        pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan) for c in available_lag_cols
+    ])[order]
+
+    n_out = len(_lag_feature_names("", windows, time_windows))
+    out = np.full((n, m, n_out), np.nan)
+    for j, lag in enumerate(windows):
+        if lag < n:
+            out[lag:, :, j] = block[:-lag]
+        out[(pos < lag) | ~valid_group, :, j] = np.nan
+    if windows:
+        lags = out[:, :, :len(windows)]
+        counts = np.sum(~np.isnan(lags), axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:, :, len(windows)] = np.where(counts > 0, np.nansum(lags, axis=2) / counts, np.nan)
+    if time_windows:
+        # Prefix sums per group give each window mean in O(1): rows of the same asset whose timestamp
+        # lies in [t - window, t) (strictly before t, so no current-row leakage).
+        ts = pd.to_numeric(df["timestamp"], errors="coerce").to_numpy(dtype=np.float64)[order]
+        ts = ts - np.nanmin(ts)
+        # One sorted key over all groups: spacing groups further apart than any window keeps searches in-group.
+        key = sorted_codes * (np.nanmax(ts) + max(time_windows.values()) + 1) + ts
+        finite = ~np.isnan(block)
+        csum = np.vstack([np.zeros((1, m)), np.cumsum(np.where(finite, block, 0.0), axis=0)])
+        ccount = np.vstack([np.zeros((1, m)), np.cumsum(finite, axis=0)])
+        right = np.searchsorted(key, key, side="left")
+        base = len(windows) + (1 if windows else 0)
+        for j, width in enumerate(time_windows.values()):
+            left = np.searchsorted(key, key - width, side="left")
+            counts = ccount[right] - ccount[left]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = np.where(counts > 0, (csum[right] - csum[left]) / counts, np.nan)
+            means[~valid_group] = np.nan
+            out[:, :, base + j] = means
+
+    unsorted = np.empty_like(out)
+    unsorted[order] = out
+    names = [name for col in available_lag_cols for name in _lag_feature_names(col, windows, time_windows)]
+    lag_frame = pd.DataFrame(unsorted.reshape(n, m * n_out), columns=names, index=df.index)
+    df = pd.concat([df.drop(columns=[c for c in names if c in df.columns]), lag_frame], axis=1)
+
+    logger.info("Added %d lag/rolling features from %d source columns", len(names), m)
     return df
 
 
@@ -297,36 +1078,96 @@ OPTIONAL_FEATURE_COLUMNS = (
 )
 
 
-def _clip_outliers(df: pd.DataFrame, z_thresh: float = 3.0) -> pd.DataFrame:
-    """Clip numeric outliers using z-score (requires scipy). Returns a copy. No-op if scipy missing."""
-    try:
-        from scipy import stats
-    except ImportError:
-        return df
-    import warnings
+# Outlier clipping: |z| > CLIP_Z_THRESH (z from the median-filled column) is clipped to +/- the 0.99
+# quantile of |value|. Bounds are fitted once per row set and saved in each {model}_features.json.
+CLIP_Z_THRESH = 3.0
+
+
+def _column_block(df: pd.DataFrame, cols: List[str]) -> np.ndarray:
+    """Numeric columns as a C-contiguous (n_cols, n_rows) float64 block; one contiguous row per column."""
+    block = np.empty((len(cols), len(df)), dtype=np.float64)
+    for i, c in enumerate(cols):
+        block[i] = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return block
+
+
+def fit_clip_bounds(df: pd.DataFrame, z_thresh: float = CLIP_Z_THRESH) -> Dict[str, Dict[str, float]]:
+    """Fit z-score clip bounds for every numeric column in one vectorized pass.
+
+    Returns {column: {"mean", "std", "cap", "z"}}; apply with apply_clip_bounds. std is 0 for constant
+    columns (never clipped). All-NaN columns are left out.
+    """
+    cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    if not cols or df.empty:
+        return {}
+    block = _column_block(df, cols)
+    missing = np.isnan(block)
+    n_valid = block.shape[1] - missing.sum(axis=1)
+    keep = n_valid > 0
+    cols = [c for c, k in zip(cols, keep) if k]
+    block, missing, n_valid = block[keep], missing[keep], n_valid[keep]
+    if not cols:
+        return {}
+    rows = np.arange(len(cols))
+    # Order statistics from one sort per block (NaNs sort last): median and linear 0.99 quantile of |x|.
+    ordered = np.sort(block, axis=1)
+    median = (ordered[rows, (n_valid - 1) // 2] + ordered[rows, n_valid // 2]) / 2
+    ordered = np.sort(np.abs(block), axis=1)
+    pos = 0.99 * (n_valid - 1)
+    lo = np.floor(pos).astype(np.intp)
+    lo_val, hi_val = ordered[rows, lo], ordered[rows, np.minimum(lo + 1, n_valid - 1)]
+    cap = lo_val + (hi_val - lo_val) * (pos - lo)
+    del ordered
+    # z uses the median-filled column (population std); constant columns (sample std < 1e-10) are skipped.
+    filled = np.where(missing, median[:, None], block)
+    mean = filled.mean(axis=1)
+    std = filled.std(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        valid_mean = np.where(missing, 0.0, block).sum(axis=1) / n_valid
+        sample_var = np.where(missing, 0.0, (block - valid_mean[:, None]) ** 2).sum(axis=1) / (n_valid - 1)
+    std = np.where(sample_var >= 1e-20, std, 0.0)
+    return {
+        c: {"mean": float(mu), "std": float(sd), "cap": float(cp), "z": float(z_thresh)}
+        for c, mu, sd, cp in zip(cols, mean, std, cap)
+    }
+
+
+def apply_clip_bounds(df: pd.DataFrame, bounds: Dict[str, Dict[str, float]]) -> pd.DataFrame:
+    """Clip outliers with fitted bounds. Returns a copy; bounded columns come back as float64.
+
+    A value is clipped to [-cap, cap] when |value - mean| / std > z (std > 0); NaNs pass through.
+    """
+    cols = [c for c in bounds if c in df.columns]
     df = df.copy()
-    numeric = df.select_dtypes(include=[np.number])
-    for col in numeric.columns:
-        ser = pd.to_numeric(df[col], errors="coerce")
-        if ser.isna().all():
-            continue
-        df[col] = ser.astype(np.float64)
-        std = df[col].std()
-        if std == 0 or (hasattr(std, "__float__") and abs(std) < 1e-10):
-            continue
-        filled = df[col].fillna(df[col].median())
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore", RuntimeWarning)
-            z = np.abs(stats.zscore(filled))
-        z = np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0)
-        mask = z > z_thresh
-        if mask.any():
-            cap = float(df[col].abs().quantile(0.99))
-            clipped = df.loc[mask, col].clip(lower=-cap, upper=cap)
-            df.loc[mask, col] = clipped.astype(np.float64)
+    if not cols:
+        return df
+    block = _column_block(df, cols)
+    mean, std, cap, z = (np.array([bounds[c][k] for c in cols])[:, None] for k in ("mean", "std", "cap", "z"))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        outlier = (std > 0) & (np.abs(block - mean) / np.where(std > 0, std, 1.0) > z)
+    clipped = outlier.any(axis=1)
+    for i, c in enumerate(cols):
+        if clipped[i]:
+            df[c] = np.where(outlier[i], np.clip(block[i], -cap[i, 0], cap[i, 0]), block[i])
+        elif df[c].dtype != np.float64:
+            df[c] = block[i]
     return df
 
 
+_SENTIMENT_FEATURE_COLUMNS = ("signal_avg_sentiment", "news_avg_sentiment")
+_NEWS_NUMERIC_FEATURE_COLUMNS = ("news_nasdaqChange", "news_etfFlowBtc", "news_etfFlowEth")
+# Categorical columns _add_common_features (and the TP/SL direction flag) derive features from.
+_DERIVED_SOURCE_COLUMNS = (
+    "news_macroRiskEnvironment", "regime_volatilityRegime", "regime_marketRegime", "asset", "signal_direction",
+)
+# Derived columns _add_common_features only adds when the matching flag is set.
+_COMMON_FLAG_FEATURES = {
+    "include_regime_binary": ("regime_volatility_high", "regime_bullish", "regime_bearish"),
+    "include_regime_ordinal": ("volatility_level",),
+    "include_market_regime": ("market_regime_num",),
+}
+
+
 def _add_common_features(
     df_trades: pd.DataFrame, feature_cols: List[str],
     include_regime_binary: bool = False, include_regime_ordinal: bool = False,
@@ -342,11 +1183,11 @@ def _add_common_features(
         if opt in df_trades.columns:
             feature_cols.append(opt)
     # Sentiment columns
-    for col in ("signal_avg_sentiment", "news_avg_sentiment"):
+    for col in _SENTIMENT_FEATURE_COLUMNS:
         if col in df_trades.columns:
             feature_cols.append(col)
     # News numeric columns
-    for opt in ("news_nasdaqChange", "news_etfFlowBtc", "news_etfFlowEth"):
+    for opt in _NEWS_NUMERIC_FEATURE_COLUMNS:
         if opt in df_trades.columns:
             feature_cols.append(opt)
     # News macro risk one-hot
@@ -381,149 +1222,195 @@ def _add_common_features(
         df_trades = pd.concat([df_trades, asset_dummies], axis=1)
         feature_cols.extend(asset_dummies.columns.tolist())
     # Lag and rolling features
-    lag_roll_cols = [c for c in df_trades.columns if ("_lag" in c or "_roll3" in c)]
+    lag_roll_cols = [c for c in df_trades.columns if _is_lag_feature(c)]
     feature_cols.extend(lag_roll_cols)
     return df_trades, feature_cols
 
 
-def _finalize_features(
-    df_trades: pd.DataFrame, feature_cols: List[str], label_col: str, label_transform=None,
-    model_name: str = "model",
-) -> Tuple[pd.DataFrame, pd.Series]:
-    """Shared finalization: select available columns, fillna, cast bools, extract y.
+# Per-model feature specs: label column, base feature columns (in manifest order), _add_common_features
+# flags, label transform, and the label summary logged after preparation.
+MODEL_FEATURE_SPECS: Dict[str, Dict[str, Any]] = {
+    "signal_quality": {
+        "display": "Signal quality",
+        "label": "label_profitable",
+        "base": [
+            "market_priceChange24h", "market_volumeRatio", "market_fundingPercentile",
+            "market_longShortRatio", "signal_strength", "signal_confidence",
+            "signal_source_count", "signal_hasCascadeSignal", "signal_hasFundingExtreme",
+            "signal_hasWhaleSignal", "session_isWeekend", "session_isOpenWindow",
+            "session_utcHour",
+        ],
+        "common": {"include_regime_binary": True},
+        "label_transform": lambda s: s.astype(int),
+        "summary": ("Signal quality positive rate: %.2f%%", lambda y: y.mean() * 100),
+    },
+    "position_sizing": {
+        "display": "Position sizing",
+        "label": "label_rMultiple",
+        "base": [
+            "signal_strength", "signal_confidence", "signal_source_count",
+            "session_isWeekend", "exec_streakMultiplier", "market_atrPct",
+        ],
+        "common": {"include_regime_ordinal": True},
+        "label_transform": lambda s: s.clip(-2, 3),
+        "summary": ("Position sizing target mean: %.2f", lambda y: y.mean()),
+    },
+    "tp_optimizer": {
+        "display": "TP",
+        "label": "label_optimalTpLevel",
+        "base": ["signal_direction_num", "market_atrPct", "signal_strength", "signal_confidence"],
+        "common": {"include_regime_ordinal": True, "include_market_regime": True},
+        "label_transform": lambda s: s.astype(int),
+        "summary": ("TP level distribution: %s", lambda y: y.value_counts().to_dict()),
+    },
+    "sl_optimizer": {
+        "display": "SL",
+        "label": "label_maxAdverseExcursion",
+        "base": ["signal_direction_num", "market_atrPct", "signal_strength", "signal_confidence"],
+        "common": {"include_regime_ordinal": True, "include_market_regime": True},
+        "label_transform": lambda s: s.clip(0, 5),
+        "summary": ("SL target mean: %.2f", lambda y: y.mean()),
+    },
+}
+
+
+def _numeric_feature_block(df_trades: pd.DataFrame, cols: List[str]) -> Tuple[List[str], np.ndarray]:
+    """Coerce feature columns to numbers (fillna 0, bools as 0/1) into one C-contiguous float32
+    (n_cols, n_rows) block. Columns that stay non-numeric are dropped; returns (kept names, block).
 
     No StandardScaler — XGBoost is tree-based and invariant to monotonic transforms.
     Removing the unfitted scaler also eliminates train/serve skew (scaler was never
-    saved alongside ONNX models).
+    saved alongside ONNX models). float32 is what XGBoost and ONNX score on anyway.
+    """
+    names: List[str] = []
+    columns: List[np.ndarray] = []
+    for c in cols:
+        s = pd.to_numeric(df_trades[c], errors="coerce").fillna(0).infer_objects()
+        if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+            names.append(c)
+            columns.append(s.to_numpy(dtype=np.float32))
+    block = np.empty((len(names), len(df_trades)), dtype=np.float32)
+    for i, values in enumerate(columns):
+        block[i] = values
+    return names, block
+
+
+def _feature_source_columns(df: pd.DataFrame, names: List[str]) -> List[str]:
+    """Columns of df the models' features and labels are built from (frame order); only these are
+    clipped and copied during materialization."""
+    wanted = set(OPTIONAL_FEATURE_COLUMNS + _SENTIMENT_FEATURE_COLUMNS + _NEWS_NUMERIC_FEATURE_COLUMNS + _DERIVED_SOURCE_COLUMNS)
+    for name in names:
+        wanted.update(MODEL_FEATURE_SPECS[name]["base"])
+        wanted.add(MODEL_FEATURE_SPECS[name]["label"])
+    return [c for c in df.columns if c in wanted or _is_lag_feature(c)]
+
+
+def _materialize_feature_group(
+    df_trades: pd.DataFrame, names: List[str], clip_bounds: Dict[str, Dict[str, float]] | None,
+) -> Dict[str, Tuple[pd.DataFrame, pd.Series]]:
+    """Build one float32 matrix holding the union of the models' features; df_trades holds the rows every
+    model in `names` labels, restricted to _feature_source_columns.
+
+    Each model gets a DataFrame of zero-copy column views into the shared block plus its label.
     """
-    available_cols = sorted(set(c for c in feature_cols if c in df_trades.columns), key=feature_cols.index)
-    # Deduplicate while preserving order
-    seen = set()
-    deduped = []
-    for c in available_cols:
-        if c not in seen:
-            seen.add(c)
-            deduped.append(c)
-    X = df_trades[deduped].copy()
-    y = df_trades[label_col]
-    if label_transform is not None:
-        y = label_transform(y)
-
-    for c in X.columns:
-        X[c] = pd.to_numeric(X[c], errors="coerce")
-    X = X.fillna(0)
-    X = X.infer_objects(copy=False)
-    X = X.select_dtypes(include=[np.number, "bool"])
-    for c in X.select_dtypes(include=["bool"]).columns:
-        X[c] = X[c].astype(int)
-
-    logger.info("%s features: %s", model_name, X.shape)
-    return X, y
+    specs = [MODEL_FEATURE_SPECS[n] for n in names]
+    flags = {flag: any(s["common"].get(flag, False) for s in specs) for flag in _COMMON_FLAG_FEATURES}
+    base = set(c for s in specs for c in s["base"])
+    if clip_bounds is not None:
+        df_trades = apply_clip_bounds(df_trades, clip_bounds)
+    if "signal_direction_num" in base and "signal_direction" in df_trades.columns:
+        df_trades["signal_direction_num"] = (df_trades["signal_direction"] == "long").astype(int)
+    df_trades, common = _add_common_features(df_trades, [], **flags)
+
+    model_cols: Dict[str, List[str]] = {}
+    for name, spec in zip(names, specs):
+        dropped = set(c for flag, cols in _COMMON_FLAG_FEATURES.items() if not spec["common"].get(flag) for c in cols)
+        wanted = spec["base"] + [c for c in common if c not in dropped]
+        model_cols[name] = list(dict.fromkeys(c for c in wanted if c in df_trades.columns))
+    union = list(dict.fromkeys(c for n in names for c in model_cols[n]))
+    numeric, block = _numeric_feature_block(df_trades, union)
+    position = {c: i for i, c in enumerate(numeric)}
+
+    out: Dict[str, Tuple[pd.DataFrame, pd.Series]] = {}
+    for name, spec in zip(names, specs):
+        cols = [c for c in model_cols[name] if c in position]
+        X = pd.DataFrame({c: block[position[c]] for c in cols}, index=df_trades.index, copy=False)
+        y = spec["label_transform"](df_trades[spec["label"]])
+        logger.info("%s features: %s", spec["display"], X.shape)
+        message, stat = spec["summary"]
+        logger.info(message, stat(y))
+        out[name] = (X, y)
+    return out
+
+
+def build_feature_matrices(
+    df: pd.DataFrame, model_names: List[str] | None = None, clip_outliers: bool = True,
+    clip_bounds: Dict[str, Dict[str, Dict[str, float]]] | None = None,
+) -> Dict[str, Tuple[pd.DataFrame, pd.Series]]:
+    """Feature matrices (X, y) for several models from one shared materialization.
+
+    Models whose labels cover the same rows (and that clip with the same bounds) share a single float32
+    matrix: rows are selected, clipped, enriched and coerced once, and each X is a set of column views
+    into it. clip_bounds maps model name to previously fitted bounds; otherwise bounds are fitted on each
+    row set. Models without labeled rows get an empty (X, y).
+    """
+    model_names = list(MODEL_FEATURE_SPECS) if model_names is None else model_names
+    out: Dict[str, Tuple[pd.DataFrame, pd.Series]] = {}
+    groups: List[Tuple[pd.Index, Dict[str, Dict[str, float]] | None, List[str]]] = []
+    for name in model_names:
+        label_col = MODEL_FEATURE_SPECS[name]["label"]
+        rows = df.index[df[label_col].notna()] if label_col in df.columns else df.index[:0]
+        if rows.empty:
+            out[name] = (pd.DataFrame(), pd.Series(dtype=float))
+            continue
+        bounds = (clip_bounds or {}).get(name) if clip_outliers else None
+        for g_rows, g_bounds, g_names in groups:
+            if g_bounds == bounds and g_rows.equals(rows):
+                g_names.append(name)
+                break
+        else:
+            groups.append((rows, bounds, [name]))
+    for rows, bounds, names in groups:
+        df_trades = df.loc[rows, _feature_source_columns(df, names)]
+        if clip_outliers and bounds is None:
+            bounds = fit_clip_bounds(df_trades)
+        out.update(_materialize_feature_group(df_trades, names, bounds))
+    return {name: out[name] for name in model_names}
+
+
+def _prepare_single_model(
+    name: str, df: pd.DataFrame, clip_outliers: bool, clip_bounds: Dict[str, Dict[str, float]] | None,
+) -> Tuple[pd.DataFrame, pd.Series]:
+    bounds = {name: clip_bounds} if clip_bounds is not None else None
+    return build_feature_matrices(df, [name], clip_outliers=clip_outliers, clip_bounds=bounds)[name]
 
 
 def prepare_signal_quality_features(
-    df: pd.DataFrame, clip_outliers: bool = True,
+    df: pd.DataFrame, clip_outliers: bool = True, clip_bounds: Dict[str, Dict[str, float]] | None = None,
 ) -> Tuple[pd.DataFrame, pd.Series]:
     """Prepare features for signal quality prediction."""
-    df_trades = df[df["label_profitable"].notna()].copy()
-    if clip_outliers:
-        df_trades = _clip_outliers(df_trades)
-
-    feature_cols = [
-        "market_priceChange24h", "market_volumeRatio", "market_fundingPercentile",
-        "market_longShortRatio", "signal_strength", "signal_confidence",
-        "signal_source_count", "signal_hasCascadeSignal", "signal_hasFundingExtreme",
-        "signal_hasWhaleSignal", "session_isWeekend", "session_isOpenWindow",
-        "session_utcHour",
-    ]
-    df_trades, feature_cols = _add_common_features(
-        df_trades, feature_cols, include_regime_binary=True,
-    )
-    X, y = _finalize_features(
-        df_trades, feature_cols, "label_profitable",
-        label_transform=lambda s: s.astype(int),
-        model_name="Signal quality",
-    )
-    logger.info("Signal quality positive rate: %.2f%%", y.mean() * 100)
-    return X, y
+    return _prepare_single_model("signal_quality", df, clip_outliers, clip_bounds)
 
 
 def prepare_position_sizing_features(
-    df: pd.DataFrame, clip_outliers: bool = True,
+    df: pd.DataFrame, clip_outliers: bool = True, clip_bounds: Dict[str, Dict[str, float]] | None = None,
 ) -> Tuple[pd.DataFrame, pd.Series]:
     """Prepare features for position sizing prediction."""
-    df_trades = df[df["label_rMultiple"].notna()].copy()
-    if clip_outliers:
-        df_trades = _clip_outliers(df_trades)
-
-    feature_cols = [
-        "signal_strength", "signal_confidence", "signal_source_count",
-        "session_isWeekend", "exec_streakMultiplier", "market_atrPct",
-    ]
-    df_trades, feature_cols = _add_common_features(
-        df_trades, feature_cols, include_regime_ordinal=True,
-    )
-    X, y = _finalize_features(
-        df_trades, feature_cols, "label_rMultiple",
-        label_transform=lambda s: s.clip(-2, 3),
-        model_name="Position sizing",
-    )
-    logger.info("Position sizing target mean: %.2f", y.mean())
-    return X, y
+    return _prepare_single_model("position_sizing", df, clip_outliers, clip_bounds)
 
 
 def prepare_tp_features(
-    df: pd.DataFrame, clip_outliers: bool = True,
+    df: pd.DataFrame, clip_outliers: bool = True, clip_bounds: Dict[str, Dict[str, float]] | None = None,
 ) -> Tuple[pd.DataFrame, pd.Series]:
     """Prepare features for take-profit optimization."""
-    df_trades = df[df["label_optimalTpLevel"].notna()].copy()
-    if clip_outliers:
-        df_trades = _clip_outliers(df_trades)
-
-    df_trades["signal_direction_num"] = (df_trades["signal_direction"] == "long").astype(int)
-    feature_cols = [
-        "signal_direction_num", "market_atrPct", "signal_strength", "signal_confidence",
-    ]
-    df_trades, feature_cols = _add_common_features(
-        df_trades, feature_cols, include_regime_ordinal=True, include_market_regime=True,
-    )
-    X, y = _finalize_features(
-        df_trades, feature_cols, "label_optimalTpLevel",
-        label_transform=lambda s: s.astype(int),
-        model_name="TP",
-    )
-    logger.info("TP level distribution: %s", y.value_counts().to_dict())
-    return X, y
+    return _prepare_single_model("tp_optimizer", df, clip_outliers, clip_bounds)
 
 
 def prepare_sl_features(
-    df: pd.DataFrame, clip_outliers: bool = True,
+    df: pd.DataFrame, clip_outliers: bool = True, clip_bounds: Dict[str, Dict[str, float]] | None = None,
 ) -> Tuple[pd.DataFrame, pd.Series]:
     """Prepare features for stop-loss optimization (max adverse excursion)."""
-    label_col = "label_maxAdverseExcursion"
-    if label_col not in df.columns:
-        return pd.DataFrame(), pd.Series(dtype=float)
-    df_trades = df[df[label_col].notna()].copy()
-    if clip_outliers:
-        df_trades = _clip_outliers(df_trades)
-    if df_trades.empty:
-        return pd.DataFrame(), pd.Series(dtype=float)
-
-    df_trades["signal_direction_num"] = (df_trades["signal_direction"] == "long").astype(int)
-    feature_cols = [
-        "signal_direction_num", "market_atrPct", "signal_strength", "signal_confidence",
-    ]
-    df_trades, feature_cols = _add_common_features(
-        df_trades, feature_cols, include_regime_ordinal=True, include_market_regime=True,
-    )
-
-    X, y = _finalize_features(
-        df_trades, feature_cols, label_col,
-        label_transform=lambda s: s.clip(0, 5),
-        model_name="SL",
-    )
-    logger.info("SL target mean: %.2f", y.mean())
-    return X, y
+    return _prepare_single_model("sl_optimizer", df, clip_outliers, clip_bounds)
 
 
 # ==========================================
@@ -573,6 +1460,113 @@ def _compute_bench_score_weights(
     return w
 
 
+def _contiguous_float32(X: pd.DataFrame) -> pd.DataFrame:
+    """X backed by one C-contiguous float32 (n_rows, n_features) array, keeping column names and index.
+
+    XGBoost bins float32 anyway, so every fit/predict (CV folds, tuning trials, holdout, walk-forward,
+    SHAP, ONNX checks) can use the same buffer without dtype conversion; row slices stay zero-copy views.
+    No copy when X already is such a frame.
+    """
+    values = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+    return pd.DataFrame(values, index=X.index, columns=X.columns, copy=False)
+
+
+class BinnedTrainingMatrix:
+    """One model's training matrix with XGBoost's binned form cached per training row set.
+
+    A hist-method fit builds a QuantileDMatrix (quantile sketch + histogram bins) from scratch on every
+    call, although CV folds and tuning trials keep training on the same few row ranges. fit() builds the
+    QuantileDMatrix for a row range once (public API, same arguments as estimator.fit) and trains every later
+    fold/trial on it with xgb.train and the parameters estimator.fit would use, so models are identical to a
+    plain fit.
+    """
+
+    def __init__(self, X: pd.DataFrame, y: pd.Series, sample_weight: np.ndarray | None = None):
+        self.X = _contiguous_float32(X)
+        self.y = y
+        self.sample_weight = sample_weight
+        self._binned: Dict[Tuple[Any, ...], Any] = {}
+        self._lock = threading.Lock()  # parallel tuning trials: build each row range once
+        self.builds = 0
+        self.hits = 0
+
+    @staticmethod
+    def _rows(rows: np.ndarray | None, n: int) -> Tuple[Any, Tuple[Any, ...]]:
+        """(indexer, cache key) for a row set; contiguous ranges become slices so X/y stay views."""
+        if rows is None:
+            return slice(0, n), (0, n)
+        rows = np.asarray(rows)
+        if len(rows) and rows[-1] - rows[0] + 1 == len(rows) and np.all(np.diff(rows) == 1):
+            return slice(int(rows[0]), int(rows[-1]) + 1), (int(rows[0]), int(rows[-1]) + 1)
+        return rows, (hashlib.sha1(rows.astype(np.int64).tobytes()).hexdigest(),)
+
+    def fit(self, estimator: Any, rows: np.ndarray | None = None) -> Any:
+        """Fit an XGBoost sklearn estimator on a row subset (default: all rows) using the cached bins.
+
+        The booster is trained with xgb.train on the cached QuantileDMatrix and loaded into the estimator.
+        Estimators this path does not reproduce (early stopping, callbacks, custom objectives) fall back to
+        estimator.fit.
+        """
+        indexer, key = self._rows(rows, len(self.y))
+        X, y = self.X.iloc[indexer], self.y.iloc[indexer]
+        w = self.sample_weight[indexer] if self.sample_weight is not None else None
+        if estimator.early_stopping_rounds is not None or estimator.callbacks or callable(estimator.objective):
+            return estimator.fit(X, y, sample_weight=w)
+        params = estimator.get_xgb_params()
+        if is_classifier(estimator):
+            # As XGBClassifier.fit: labels must be 0..k-1, and k > 2 switches to a multi-class objective
+            classes = np.unique(np.asarray(y))
+            if not np.array_equal(classes, np.arange(len(classes))):
+                raise ValueError(f"Invalid classes inferred from unique values of `y`. Expected: {np.arange(len(classes))}, got {classes}")
+            if len(classes) > 2:
+                if params.get("objective") != "multi:softmax":
+                    params["objective"] = "multi:softprob"
+                params["num_class"] = len(classes)
+        key = key + (estimator.max_bin, estimator.missing if estimator.missing == estimator.missing else "nan")
+        with self._lock:
+            dtrain = self._binned.get(key)
+            if dtrain is None:
+                dtrain = self._binned[key] = xgb.QuantileDMatrix(
+                    X, label=y, weight=w, missing=estimator.missing, max_bin=estimator.max_bin,
+                    nthread=estimator.n_jobs, enable_categorical=estimator.enable_categorical,
+                    feature_types=estimator.feature_types,
+                )
+                self.builds += 1
+            else:
+                self.hits += 1
+        booster = xgb.train(params, dtrain, num_boost_round=estimator.get_num_boosting_rounds())
+        estimator.load_model(bytearray(booster.save_raw("ubj")))
+        return estimator
+
+    def cross_val_score(
+        self, estimator: Any, cv: Any, scoring: str, on_fold: Callable[[int, List[float]], None] | None = None,
+        start: int = 0,
+    ) -> np.ndarray:
+        """sklearn cross_val_score equivalent (per-fold clones and sample weights; nan for a failed fold).
+
+        on_fold(fold, scores_so_far) runs after each fold; exceptions it raises (e.g. a pruned trial) propagate.
+        start > 0 cross-validates only rows[start:] (e.g. the most recent rows).
+        """
+        scorer = get_scorer(scoring)
+        scores: List[float] = []
+        for fold, (train_idx, test_idx) in enumerate(cv.split(self.X.iloc[start:])):
+            train_idx, test_idx = train_idx + start, test_idx + start
+            model = clone(estimator)
+            try:
+                self.fit(model, train_idx)
+                scores.append(scorer(model, self.X.iloc[test_idx], self.y.iloc[test_idx]))
+            except Exception as e:
+                logger.debug("CV fold failed: %s", e)
+                scores.append(np.nan)
+            if on_fold is not None:
+                on_fold(fold, scores)
+        return np.asarray(scores, dtype=float)
+
+
+def _log_binned_reuse(binned: BinnedTrainingMatrix) -> None:
+    logger.info("Binned training matrices: %d built, %d reused across folds/trials", binned.builds, binned.hits)
+
+
 def _time_split(X: pd.DataFrame, y: pd.Series, test_frac: float = 0.2):
     """Split by time order (last test_frac as validation)."""
     n = len(X)
@@ -582,54 +1576,6 @@ def _time_split(X: pd.DataFrame, y: pd.Series, test_frac: float = 0.2):
     return X.iloc[:split], y.iloc[:split], X.iloc[split:], y.iloc[split:]
 
 
-def _holdout_metrics(
-    model_factory, X: pd.DataFrame, y: pd.Series, kind: str,
-    sample_weight: np.ndarray | None = None,
-) -> Dict[str, float]:
-    """Compute metrics on time-based holdout (last 20%) for drift detection.
-
-    Trains a *fresh* model on the train split only to avoid data leakage
-    (the deployed model was fit on the full dataset).
-    Returns dict for improvement_report.holdout_metrics.
-    """
-    X_tr, y_tr, X_val, y_val = _time_split(X, y, test_frac=0.2)
-    if X_val is None or len(X_val) < 5:
-        return {}
-    try:
-        model = model_factory()
-        w_tr = sample_weight[:len(y_tr)] if sample_weight is not None and len(sample_weight) >= len(y_tr) else None
-        if w_tr is not None:
-            model.fit(X_tr, y_tr, sample_weight=w_tr)
-        else:
-            model.fit(X_tr, y_tr)
-
-        if kind == "signal_quality":
-            proba = model.predict_proba(X_val)[:, 1]
-            return {
-                "holdout_auc": float(roc_auc_score(y_val, proba)),
-                "holdout_accuracy": float(accuracy_score(y_val, (proba >= 0.5).astype(int))),
-            }
-        if kind == "position_sizing":
-            pred = model.predict(X_val)
-            return {"holdout_mae": float(mean_absolute_error(y_val, pred))}
-        if kind == "tp_optimizer":
-            pred = model.predict(X_val)
-            proba = model.predict_proba(X_val)
-            return {
-                "holdout_accuracy": float(accuracy_score(y_val, pred)),
-                "holdout_log_loss": float(log_loss(y_val, proba)),
-            }
-        if kind == "sl_optimizer":
-            pred = model.predict(X_val)
-            err = np.asarray(y_val) - np.asarray(pred)
-            quantile_loss = np.mean(np.where(err >= 0, 0.95 * err, -0.05 * err))
-            return {"holdout_mae": float(mean_absolute_error(y_val, pred)), "holdout_quantile_loss": float(quantile_loss)}
-    except Exception as e:
-        logger.debug("Holdout metrics failed for %s: %s", kind, e)
-        return {}
-    return {}
-
-
 def _shap_analysis(model: Any, X: pd.DataFrame, model_name: str, max_samples: int = 200) -> Dict[str, Any]:
     """Compute SHAP values for feature explanation. Returns dict with mean absolute SHAP values per feature and top interactions."""
     if not SHAP_AVAILABLE:
@@ -679,157 +1625,472 @@ def _shap_analysis(model: Any, X: pd.DataFrame, model_name: str, max_samples: in
         return {}
 
 
-def _walk_forward_validation(
-    X: pd.DataFrame, y: pd.Series, model_factory, n_splits: int = 5,
-    min_train_size: int = 50, purge_gap: int = 2,
-) -> Dict[str, Any]:
-    """Walk-forward validation with expanding window and purge gap.
-
-    Unlike TimeSeriesSplit, this uses an expanding training window and enforces
-    a purge gap (number of rows skipped between train and test) to prevent
-    information leakage from sequential trades.
-
-    Returns dict with per-fold metrics and aggregated statistics.
+def _fold_metrics(name: str, model: Any, X: pd.DataFrame, y: pd.Series) -> Dict[str, float]:
+    """Metrics for one test window from a single predict/predict_proba call (holdout_metrics keys without prefix)."""
+    if name == "signal_quality":
+        proba = model.predict_proba(X)[:, 1]
+        try:
+            auc = float(roc_auc_score(y, proba))
+        except ValueError:
+            # Single class in y (e.g. small fold); use neutral AUC
+            auc = 0.5
+        return {"auc": auc, "accuracy": float(accuracy_score(y, (proba >= 0.5).astype(int)))}
+    if name == "tp_optimizer":
+        proba = model.predict_proba(X)
+        return {
+            "accuracy": float(accuracy_score(y, proba.argmax(axis=1))),
+            "log_loss": float(log_loss(y, proba, labels=np.arange(proba.shape[1]))),
+        }
+    pred = model.predict(X)
+    metrics = {"mae": float(mean_absolute_error(y, pred))}
+    if name == "sl_optimizer":
+        err = np.asarray(y) - pred
+        metrics["quantile_loss"] = float(np.mean(np.where(err >= 0, 0.95 * err, -0.05 * err)))
+    return metrics
+
+
+class FoldEvaluator:
+    """CV, walk-forward and holdout metrics for one model from one shared set of time-ordered fits.
+
+    Folds use an expanding training window and a purge gap (rows skipped between train and test) to
+    prevent leakage from sequential trades. The last fold runs to the final row and is the holdout, so
+    n_splits fits give the walk-forward/CV scores and the holdout metrics; the deployed model (fit on all
+    data) is never scored on rows it saw. Fits train the model's params without early stopping (which would
+    need the test rows) and go through BinnedTrainingMatrix. Fold fits are independent and run on `jobs`
+    threads (XGBoost releases the GIL), each with cores // jobs XGBoost threads; results are aggregated in
+    fold order.
     """
-    n = len(X)
-    if n < min_train_size + 10:
-        return {}
 
-    # Expanding window: folds advance forward through time
-    test_region = n - min_train_size - purge_gap
-    if test_region < 10:
-        return {}
-    fold_size = max(10, test_region // n_splits)
-    results = []
+    def __init__(
+        self, name: str, X: pd.DataFrame, y: pd.Series, sample_weight: np.ndarray | None = None,
+        n_splits: int = 5, min_train_size: int = 50, purge_gap: int = 2, jobs: int = 1,
+    ):
+        self.name = name
+        self.binned = BinnedTrainingMatrix(X, y, sample_weight)
+        self.n_splits = n_splits
+        self.min_train_size = min_train_size
+        self.purge_gap = purge_gap
+        self.jobs = max(1, jobs)
+        self._lock = threading.Lock()
+        self.fits = 0
+
+    def folds(self) -> List[Tuple[int, int, int, int]]:
+        """(fold, train_end, test_start, test_end) in time order; [] when there is too little data."""
+        return self.fold_plan(len(self.binned.y), self.n_splits, self.min_train_size, self.purge_gap)
+
+    @staticmethod
+    def fold_plan(n: int, n_splits: int = 5, min_train_size: int = 50, purge_gap: int = 2) -> List[Tuple[int, int, int, int]]:
+        """Fold boundaries for n time-ordered rows (see folds())."""
+        test_region = n - min_train_size - purge_gap
+        if n < min_train_size + 10 or test_region < 10:
+            return []
+        fold_size = max(10, test_region // n_splits)
+        plan = []
+        for fold in range(n_splits):
+            test_start = min_train_size + purge_gap + fold * fold_size
+            if n - test_start < 5:
+                break
+            plan.append((fold, test_start - purge_gap, test_start, min(test_start + fold_size, n)))
+        if plan:
+            # The holdout fold takes the rows left over by integer fold sizes
+            plan[-1] = plan[-1][:3] + (n,)
+        return plan
+
+    def fit(self, estimator_cls: type, params: Dict[str, Any], stop: int, n_jobs: int | None = None) -> Any:
+        """estimator_cls(**params) trained on rows [0, stop) with n_jobs XGBoost threads."""
+        model = estimator_cls(**params)
+        if n_jobs is not None:
+            model.set_params(n_jobs=n_jobs)
+        model = self.binned.fit(model, np.arange(stop))
+        with self._lock:
+            self.fits += 1
+        return model
+
+    def _score_fold(
+        self, estimator_cls: type, params: Dict[str, Any], fold_plan: Tuple[int, int, int, int], n_jobs: int | None,
+    ) -> Dict[str, Any] | None:
+        fold, train_end, test_start, test_end = fold_plan
+        X, y = self.binned.X, self.binned.y
+        try:
+            fitted = self.fit(estimator_cls, params, train_end, n_jobs=n_jobs)
+            metrics = _fold_metrics(self.name, fitted, X.iloc[test_start:test_end], y.iloc[test_start:test_end])
+        except Exception as e:
+            logger.debug("Walk-forward fold %d failed for %s: %s", fold, self.name, e)
+            return None
+        return {"fold": fold, "train_size": train_end, "test_size": test_end - test_start, **metrics}
+
+    def evaluate(self, model: Any) -> Tuple[Dict[str, float], Dict[str, Any]]:
+        """(holdout_metrics, walk_forward) for the params of a trained model; empty dicts when not enough data."""
+        params = {k: v for k, v in model.get_params().items() if k not in ("early_stopping_rounds", "n_jobs")}
+        plan = self.folds()
+        jobs = min(self.jobs, len(plan)) or 1
+        n_jobs = max(1, _available_cores() // jobs) if jobs > 1 else model.get_params().get("n_jobs")
+        fold_args = (repeat(type(model)), repeat(params), plan, repeat(n_jobs))
+        if jobs > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+                scored = list(pool.map(self._score_fold, *fold_args))
+        else:
+            scored = list(map(self._score_fold, *fold_args))
+        results = [r for r in scored if r is not None]
+        if not results:
+            return {}, {}
+
+        holdout: Dict[str, float] = {}
+        if results[-1]["fold"] == plan[-1][0]:
+            holdout = {f"holdout_{k}": v for k, v in results[-1].items() if k not in ("fold", "train_size", "test_size")}
+        agg: Dict[str, Any] = {"n_folds": len(results), "folds": results}
+        for k in results[0]:
+            if k not in ("fold", "train_size", "test_size"):
+                values = [r[k] for r in results]
+                agg[f"mean_{k}"] = round(float(np.mean(values)), 4)
+                agg[f"std_{k}"] = round(float(np.std(values)), 4)
+
+        logger.info("Walk-forward validation: %d folds (purge gap %d, %d jobs), %s (%d fits)",
+                    len(results), self.purge_gap, jobs,
+                    ", ".join(f"{k}={v}" for k, v in agg.items() if k not in ("folds", "n_folds")),
+                    self.fits)
+        return holdout, agg
+
+
+# Optuna tuning: trials run on --tune-jobs threads (XGBoost releases the GIL) with fold-level pruning, and
+# studies persist in SQLite so an interrupted tuning run resumes and later retrains warm-start from the
+# last best parameters.
+OPTUNA_STORAGE_FILE = "optuna_studies.db"
+OPTUNA_PRUNERS = ("median", "halving", "hyperband", "none")
+# --tune-fidelity multi: each trial is scored rung by rung on the most recent fraction of rows with the same
+# fraction of its n_estimators (1/9, 1/3, then full), and the pruner (ASHA by default, or Hyperband) promotes
+# only the best candidates to the next rung. Rungs never use fewer than MULTI_FIDELITY_MIN_ROWS rows.
+MULTI_FIDELITY_RUNGS = (1 / 9, 1 / 3, 1.0)
+MULTI_FIDELITY_MIN_ROWS = 60
+
+
+def _tuning_options(args: argparse.Namespace, output_dir: Path) -> Dict[str, Any]:
+    """Optuna settings from the CLI: trial/time budget overrides for TUNER_SPECS, parallel trial jobs, pruner
+    and study storage (None = in-memory)."""
+    storage = getattr(args, "tune_storage", None)
+    if storage is None:
+        storage = str(output_dir / OPTUNA_STORAGE_FILE)
+    elif storage.lower() == "none":
+        storage = None
+    fidelity = getattr(args, "tune_fidelity", "full")
+    pruner = getattr(args, "tune_pruner", None) or ("halving" if fidelity == "multi" else "median")
+    return {
+        "fidelity": fidelity,
+        "n_trials": getattr(args, "optuna_trials", None),
+        "timeout": getattr(args, "tune_timeout", None),
+        "jobs": _resolve_jobs(getattr(args, "tune_jobs", 0)),
+        "pruner": pruner,
+        "storage": storage,
+    }
 
-    for fold in range(n_splits):
-        test_start = min_train_size + purge_gap + fold * fold_size
-        test_end = min(test_start + fold_size, n)
-        train_end = test_start - purge_gap  # purge gap: skip rows between train and test
 
-        X_train = X.iloc[:train_end]
-        y_train = y.iloc[:train_end]
-        X_test = X.iloc[test_start:test_end]
-        y_test = y.iloc[test_start:test_end]
+def _optuna_pruner(kind: str, max_resource: int = 3) -> Any:
+    """Pruner over a trial's steps (CV folds, or fidelity rungs): median of earlier trials at the same step,
+    successive halving (ASHA), or Hyperband (several ASHA brackets)."""
+    if kind == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=0)
+    if kind == "halving":
+        return optuna.pruners.SuccessiveHalvingPruner(min_resource=1, reduction_factor=3)
+    if kind == "hyperband":
+        return optuna.pruners.HyperbandPruner(min_resource=1, max_resource=max_resource, reduction_factor=3)
+    return optuna.pruners.NopPruner()
 
-        if len(X_train) < min_train_size or len(X_test) < 5:
-            continue
 
-        try:
-            model = model_factory()
-            model.fit(X_train, y_train)
+def _set_trial_threads(model: Any, tuning: Dict[str, Any] | None) -> None:
+    """Split cores between concurrent trials instead of every trial using all of them."""
+    jobs = (tuning or {}).get("jobs", 1)
+    if jobs > 1:
+        model.set_params(n_jobs=max(1, _available_cores() // jobs))
 
-            fold_metrics = {"fold": fold, "train_size": len(X_train), "test_size": len(X_test)}
 
-            if hasattr(model, "predict_proba"):
-                proba = model.predict_proba(X_test)[:, 1]
-                try:
-                    fold_metrics["auc"] = float(roc_auc_score(y_test, proba))
-                except ValueError:
-                    # Single class in y_test (e.g. small fold); use neutral AUC
-                    fold_metrics["auc"] = 0.5
-                fold_metrics["accuracy"] = float(accuracy_score(y_test, (proba >= 0.5).astype(int)))
-            else:
-                pred = model.predict(X_test)
-                fold_metrics["mae"] = float(mean_absolute_error(y_test, pred))
+def _pruned_cv_score(
+    trial: Any, binned: BinnedTrainingMatrix, model: Any, cv: Any, scoring: str, tuning: Dict[str, Any] | None,
+) -> float:
+    """Mean CV score of one trial; reports the running mean after every fold so the pruner can stop
+    hopeless trials before the larger folds are trained."""
+    _set_trial_threads(model, tuning)
 
-            results.append(fold_metrics)
-        except Exception as e:
-            logger.debug("Walk-forward fold %d failed: %s", fold, e)
+    def report(fold: int, scores: List[float]) -> None:
+        running = float(np.mean(scores))
+        if np.isfinite(running):
+            trial.report(running, fold + 1)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
 
-    if not results:
-        return {}
+    return float(binned.cross_val_score(model, cv, scoring, on_fold=report).mean())
 
-    # Aggregate
-    agg: Dict[str, Any] = {"n_folds": len(results), "folds": results}
-    if "auc" in results[0]:
-        aucs = [r["auc"] for r in results]
-        agg["mean_auc"] = round(float(np.mean(aucs)), 4)
-        agg["std_auc"] = round(float(np.std(aucs)), 4)
-    if "mae" in results[0]:
-        maes = [r["mae"] for r in results]
-        agg["mean_mae"] = round(float(np.mean(maes)), 4)
-        agg["std_mae"] = round(float(np.std(maes)), 4)
-    if "accuracy" in results[0]:
-        accs = [r["accuracy"] for r in results]
-        agg["mean_accuracy"] = round(float(np.mean(accs)), 4)
-
-    logger.info("Walk-forward validation: %d folds, %s",
-                len(results),
-                ", ".join(f"{k}={v}" for k, v in agg.items() if k not in ("folds", "n_folds")))
-    return agg
-
-
-def _tune_signal_quality_optuna(X: pd.DataFrame, y: pd.Series, sample_weight: np.ndarray | None, n_trials: int = 50) -> xgb.XGBClassifier:
-    """Bayesian hyperparameter tuning via Optuna with TimeSeriesSplit. Returns best estimator."""
-    pos_count = int(np.sum(y))
-    scale_pos_weight = (len(y) - pos_count) / pos_count if pos_count > 0 else 1.0
-    tscv = TimeSeriesSplit(n_splits=3)
 
-    def objective(trial):
-        params = {
-            "max_depth": trial.suggest_int("max_depth", 2, 7),
-            "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.15, log=True),
-            "n_estimators": trial.suggest_int("n_estimators", 100, 400, step=50),
-            "subsample": trial.suggest_float("subsample", 0.6, 1.0),
-            "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
-            "min_child_weight": trial.suggest_int("min_child_weight", 1, 10),
-            "reg_alpha": trial.suggest_float("reg_alpha", 1e-8, 10.0, log=True),
-            "reg_lambda": trial.suggest_float("reg_lambda", 1e-8, 10.0, log=True),
-            "gamma": trial.suggest_float("gamma", 0.0, 5.0),
-        }
-        model = xgb.XGBClassifier(
-            objective="binary:logistic", eval_metric="auc", random_state=42,
-            tree_method="hist", scale_pos_weight=scale_pos_weight, **params,
-        )
-        scores = cross_val_score(model, X, y, cv=tscv, scoring="roc_auc",
-                                 fit_params={"sample_weight": sample_weight} if sample_weight is not None else {})
-        return scores.mean()
+def _fidelity_step(frac: float) -> int:
+    """Pruning step of a rung in units of the smallest rung (1, 3, 9), so ASHA/Hyperband rungs line up."""
+    return int(round(frac / MULTI_FIDELITY_RUNGS[0]))
 
-    study = optuna.create_study(direction="maximize", sampler=optuna.samplers.TPESampler(seed=42))
-    study.optimize(objective, n_trials=n_trials, show_progress_bar=False)
 
-    best = study.best_params
-    logger.info("Optuna Signal Quality - best CV AUC: %.3f (params: %s)", study.best_value, best)
+def _multi_fidelity_cv_score(
+    trial: Any, binned: BinnedTrainingMatrix, model: Any, cv: Any, scoring: str, tuning: Dict[str, Any] | None,
+) -> float:
+    """Full-fidelity CV score of one trial, reached rung by rung (MULTI_FIDELITY_RUNGS).
 
-    final = xgb.XGBClassifier(
-        objective="binary:logistic", eval_metric="auc", random_state=42,
-        tree_method="hist", scale_pos_weight=scale_pos_weight, **best,
-    )
-    final.fit(X, y, sample_weight=sample_weight)
-    return final
+    Each rung cross-validates the most recent fraction of rows with that fraction of n_estimators and is
+    reported as one pruning step, so Hyperband/ASHA drops weak candidates after the cheap rungs. The trial's
+    compute relative to one full-fidelity evaluation (rows x trees) is kept in user attr "fidelity_cost".
+    """
+    _set_trial_threads(model, tuning)
+    n = len(binned.y)
+    n_estimators = model.get_params()["n_estimators"]
+    cost = 0.0
+    score = float("nan")
+    for step, frac in enumerate(MULTI_FIDELITY_RUNGS, start=1):
+        rows = n if frac >= 1 else min(n, max(int(n * frac), MULTI_FIDELITY_MIN_ROWS))
+        trees = n_estimators if frac >= 1 else max(10, int(round(n_estimators * frac)))
+        rung_model = clone(model).set_params(n_estimators=trees)
+        score = float(binned.cross_val_score(rung_model, cv, scoring, start=n - rows).mean())
+        cost += (rows / n) * (trees / n_estimators)
+        trial.set_user_attr("fidelity_cost", round(cost, 4))
+        trial.set_user_attr("fidelity_rung", step)
+        if step < len(MULTI_FIDELITY_RUNGS) and np.isfinite(score):
+            trial.report(score, _fidelity_step(frac))
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+    return score
+
+
+def _study_fingerprint(binned: BinnedTrainingMatrix) -> str:
+    """Short hash of the training data (columns, values, labels, weights) that names its Optuna study."""
+    h = hashlib.sha1()
+    h.update(json.dumps(binned.X.columns.tolist()).encode())
+    h.update(binned.X.to_numpy().tobytes())
+    h.update(np.asarray(binned.y, dtype=np.float64).tobytes())
+    if binned.sample_weight is not None:
+        h.update(np.asarray(binned.sample_weight, dtype=np.float64).tobytes())
+    return h.hexdigest()[:12]
+
+
+def _previous_best_params(storage: Any, model_name: str, exclude: str) -> Dict[str, Any] | None:
+    """Best parameters of the most recent earlier study for this model (warm start), if any."""
+    try:
+        summaries = optuna.study.get_all_study_summaries(storage=storage)
+    except Exception as e:
+        logger.debug("Could not list Optuna studies: %s", e)
+        return None
+    earlier = [
+        st for st in summaries
+        if st.study_name.startswith(f"{model_name}-") and st.study_name != exclude and st.best_trial is not None
+    ]
+    if not earlier:
+        return None
+    latest = max(earlier, key=lambda st: st.datetime_start or datetime.min)
+    return dict(latest.best_trial.params)
 
 
-def _tune_signal_quality(X: pd.DataFrame, y: pd.Series, sample_weight: np.ndarray | None) -> xgb.XGBClassifier:
-    """Hyperparameter tuning: Optuna (if available) or GridSearchCV fallback."""
-    if OPTUNA_AVAILABLE:
-        return _tune_signal_quality_optuna(X, y, sample_weight)
+def _run_optuna_study(
+    model_name: str, objective: Callable[[Any], float], binned: BinnedTrainingMatrix, n_trials: int,
+    tuning: Dict[str, Any] | None = None, timeout: float | None = None,
+) -> Tuple[Any, Dict[str, Any]]:
+    """Create or resume this model's study for the current data and run the trials still missing,
+    stopping new trials once `timeout` seconds have passed. Returns (study, stats for the metadata).
 
-    # Fallback: GridSearchCV
-    pos_count = int(np.sum(y))
-    scale_pos_weight = (len(y) - pos_count) / pos_count if pos_count > 0 else 1.0
-    param_grid = {
-        "max_depth": [3, 4, 5],
-        "learning_rate": [0.03, 0.05, 0.07],
-        "n_estimators": [150, 200],
+    The study is named {model}-{data fingerprint}: rerunning on the same data continues where the last run
+    stopped, new data starts a new study with the previous study's best parameters enqueued first.
+    """
+    tuning = tuning or {}
+    storage = None
+    if tuning.get("storage"):
+        try:
+            storage = optuna.storages.RDBStorage(
+                f"sqlite:///{Path(tuning['storage']).resolve()}",
+                engine_kwargs={"connect_args": {"timeout": 60}},  # --parallel model processes share the file
+            )
+        except Exception as e:
+            logger.warning("Optuna storage %s unavailable (%s); tuning in memory", tuning["storage"], e)
+    # Pruning steps are folds in full-fidelity studies and rungs in multi-fidelity ones; keep them apart.
+    multi = tuning.get("fidelity") == "multi"
+    study_name = f"{model_name}-{'mf-' if multi else ''}{_study_fingerprint(binned)}"
+    pruner = _optuna_pruner(tuning.get("pruner", "median"), max_resource=_fidelity_step(1.0) if multi else 3)
+    study = optuna.create_study(
+        study_name=study_name, storage=storage, load_if_exists=storage is not None, direction="maximize",
+        sampler=optuna.samplers.TPESampler(seed=42), pruner=pruner,
+    )
+    done_states = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    done = len(study.get_trials(deepcopy=False, states=done_states))
+    if done:
+        logger.info("Optuna %s: resuming study %s (%d/%d trials done)", model_name, study_name, done, n_trials)
+    elif storage is not None:
+        warm = _previous_best_params(storage, model_name, study_name)
+        if warm:
+            study.enqueue_trial(warm, skip_if_exists=True)
+            logger.info("Optuna %s: warm-starting from previous best params %s", model_name, warm)
+    before = len(study.trials)
+    remaining = max(0, n_trials - done)
+    started = time.perf_counter()
+    if remaining:
+        study.optimize(
+            objective, n_trials=remaining, timeout=timeout, n_jobs=tuning.get("jobs", 1), show_progress_bar=False,
+        )
+    seconds = time.perf_counter() - started
+    ran = study.get_trials(deepcopy=False)[before:]
+    durations = [t.duration.total_seconds() for t in ran if t.duration is not None]
+    pruned = sum(t.state == optuna.trial.TrialState.PRUNED for t in ran)
+    stats: Dict[str, Any] = {
+        "study": study_name,
+        "resumed": bool(done),
+        "trial_budget": n_trials,
+        "time_budget_sec": timeout,
+        "trials_run": len(ran),
+        "trials_pruned": int(pruned),
+        "trials_total": len(study.trials),
+        "seconds": round(seconds, 3),
+        "trials_per_sec": round(len(ran) / seconds, 4) if seconds > 0 and ran else 0.0,
+        "sec_per_trial": round(float(np.mean(durations)), 3) if durations else None,
+        "stopped_by_time_budget": bool(timeout is not None and len(ran) < remaining),
     }
-    base = xgb.XGBClassifier(
-        objective="binary:logistic",
-        eval_metric="auc",
-        random_state=42,
-        tree_method="hist",
-        subsample=0.8,
-        colsample_bytree=0.8,
-        scale_pos_weight=scale_pos_weight,
+    if multi:
+        costs = [t.user_attrs.get("fidelity_cost", 0.0) for t in ran]
+        rungs = [t.user_attrs.get("fidelity_rung", 0) for t in ran]
+        stats["fidelity"] = "multi"
+        stats["trials_per_rung"] = [sum(r >= k for r in rungs) for k in range(1, len(MULTI_FIDELITY_RUNGS) + 1)]
+        # Compute spent relative to evaluating every trial at full fidelity (rows x trees)
+        stats["relative_compute"] = round(sum(costs) / len(ran), 4) if ran else None
+    logger.info(
+        "Optuna %s: %d trials run (%d pruned) in %.1fs, %.2f trials/s%s", model_name, len(ran), pruned, seconds,
+        stats["trials_per_sec"], " (time budget reached)" if stats["stopped_by_time_budget"] else "",
     )
+    return study, stats
+
+
+def _scale_pos_weight(y: pd.Series) -> float:
+    pos_count = int(np.sum(y))
+    return (len(y) - pos_count) / pos_count if pos_count > 0 else 1.0
+
+
+# Optuna search space shared by all models: name -> (suggest kind, low, high, suggest kwargs).
+XGB_SEARCH_SPACE: Dict[str, Tuple[str, float, float, Dict[str, Any]]] = {
+    "max_depth": ("int", 2, 7, {}),
+    "learning_rate": ("float", 0.01, 0.15, {"log": True}),
+    "n_estimators": ("int", 100, 400, {"step": 50}),
+    "subsample": ("float", 0.6, 1.0, {}),
+    "colsample_bytree": ("float", 0.5, 1.0, {}),
+    "min_child_weight": ("int", 1, 10, {}),
+    "reg_alpha": ("float", 1e-8, 10.0, {"log": True}),
+    "reg_lambda": ("float", 1e-8, 10.0, {"log": True}),
+}
+# GridSearchCV fallback when Optuna is not installed.
+XGB_GRID_SEARCH_SPACE = {"max_depth": [3, 4, 5], "learning_rate": [0.03, 0.05, 0.07], "n_estimators": [150, 200]}
+
+# Per-model tuning specs: estimator, fixed params (from the labels), CV scoring (higher is better; `sign`
+# turns it back into the logged metric), search space, trial budget (--optuna-trials) and wall-clock
+# budget in seconds per model (--tune-timeout; None = unbounded).
+TUNER_SPECS: Dict[str, Dict[str, Any]] = {
+    "signal_quality": {
+        "display": "Signal Quality",
+        "estimator": xgb.XGBClassifier,
+        "params": lambda y: {
+            "objective": "binary:logistic", "eval_metric": "auc", "scale_pos_weight": _scale_pos_weight(y),
+        },
+        "scoring": "roc_auc",
+        "metric": ("CV AUC", 1),
+        "search_space": {**XGB_SEARCH_SPACE, "gamma": ("float", 0.0, 5.0, {})},
+        "n_trials": 50,
+        "timeout": None,
+    },
+    "position_sizing": {
+        "display": "Position Sizing",
+        "estimator": xgb.XGBRegressor,
+        "params": lambda y: {"objective": "reg:squarederror"},
+        "scoring": "neg_mean_absolute_error",
+        "metric": ("CV MAE", -1),
+        "search_space": XGB_SEARCH_SPACE,
+        "n_trials": 50,
+        "timeout": None,
+    },
+    "tp_optimizer": {
+        "display": "TP Optimizer",
+        "estimator": xgb.XGBClassifier,
+        "params": lambda y: {
+            "objective": "multi:softprob", "num_class": max(int(y.nunique()), 2), "eval_metric": "mlogloss",
+        },
+        "scoring": "accuracy",
+        "metric": ("CV accuracy", 1),
+        "search_space": XGB_SEARCH_SPACE,
+        "n_trials": 50,
+        "timeout": None,
+    },
+    "sl_optimizer": {
+        "display": "SL Optimizer",
+        "estimator": xgb.XGBRegressor,
+        "params": lambda y: {"objective": "reg:quantileerror", "quantile_alpha": 0.95},
+        "scoring": "neg_mean_absolute_error",
+        "metric": ("CV MAE", -1),
+        "search_space": XGB_SEARCH_SPACE,
+        "n_trials": 50,
+        "timeout": None,
+    },
+}
+
+
+def _suggest_params(trial: Any, space: Dict[str, Tuple[str, float, float, Dict[str, Any]]]) -> Dict[str, Any]:
+    suggest = {"int": trial.suggest_int, "float": trial.suggest_float}
+    return {name: suggest[kind](name, low, high, **kw) for name, (kind, low, high, kw) in space.items()}
+
+
+def tune_model(
+    name: str, X: pd.DataFrame, y: pd.Series, sample_weight: np.ndarray | None = None,
+    tuning: Dict[str, Any] | None = None,
+) -> Tuple[Any, Dict[str, Any]]:
+    """Tune one model from its TUNER_SPECS entry and refit the best parameters on all rows.
+
+    Optuna (TimeSeriesSplit(3) CV, pruning, persistent study, trial and time budget) when installed,
+    GridSearchCV otherwise. Returns (fitted estimator, tuning stats for training_metadata.json).
+    """
+    spec = TUNER_SPECS[name]
+    tuning = tuning or {}
+    fixed = {"random_state": 42, "tree_method": "hist", "n_jobs": _CORE_BUDGET, **spec["params"](y)}
+    label, sign = spec["metric"]
     tscv = TimeSeriesSplit(n_splits=3)
-    search = GridSearchCV(base, param_grid, cv=tscv, scoring="roc_auc", n_jobs=_get_train_n_jobs(), verbose=0)
-    if sample_weight is not None:
-        search.fit(X, y, sample_weight=sample_weight)
-    else:
-        search.fit(X, y)
-    logger.info("Signal Quality Model - best CV AUC: %.3f (params: %s)", search.best_score_, search.best_params_)
-    return search.best_estimator_
+
+    if not OPTUNA_AVAILABLE:
+        # Candidates run in grid_jobs processes with one XGBoost thread each (not all cores each)
+        grid_jobs = _resolve_jobs(0)
+        base = spec["estimator"](subsample=0.8, colsample_bytree=0.8, **{**fixed, "n_jobs": 1 if grid_jobs > 1 else fixed["n_jobs"]})
+        search = GridSearchCV(base, XGB_GRID_SEARCH_SPACE, cv=tscv, scoring=spec["scoring"], n_jobs=grid_jobs, verbose=0)
+        started = time.perf_counter()
+        if sample_weight is not None:
+            search.fit(X, y, sample_weight=sample_weight)
+        else:
+            search.fit(X, y)
+        seconds = time.perf_counter() - started
+        logger.info("%s - best %s: %.3f (params: %s)", spec["display"], label, sign * search.best_score_, search.best_params_)
+        n_candidates = len(search.cv_results_["params"])
+        return search.best_estimator_, {
+            "method": "grid", "trials_run": n_candidates, "seconds": round(seconds, 3),
+            "trials_per_sec": round(n_candidates / seconds, 4) if seconds > 0 else 0.0,
+            "sec_per_trial": round(seconds / n_candidates, 3) if n_candidates else None,
+            "best_score": float(sign * search.best_score_), "best_params": search.best_params_,
+        }
+
+    binned = BinnedTrainingMatrix(X, y, sample_weight)
+
+    score = _multi_fidelity_cv_score if tuning.get("fidelity") == "multi" else _pruned_cv_score
+
+    def objective(trial):
+        model = spec["estimator"](**fixed, **_suggest_params(trial, spec["search_space"]))
+        return score(trial, binned, model, tscv, spec["scoring"], tuning)
+
+    n_trials = tuning.get("n_trials") or spec["n_trials"]
+    timeout = tuning.get("timeout") or spec["timeout"]
+    study, stats = _run_optuna_study(name, objective, binned, n_trials, tuning, timeout=timeout)
+    stats["method"] = "optuna"
+    completed = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+    if not completed:
+        logger.warning("Optuna %s: no completed trial within budget; using default parameters", spec["display"])
+        stats["best_params"] = None
+        return None, stats
+    logger.info("Optuna %s - best %s: %.3f (params: %s)", spec["display"], label, sign * study.best_value, study.best_params)
+    stats["best_score"] = float(sign * study.best_value)
+    stats["best_params"] = study.best_params
+    final = spec["estimator"](**fixed, **study.best_params)
+    binned.fit(final)
+    _log_binned_reuse(binned)
+    return final, stats
 
 
 def train_signal_quality_model(
@@ -842,22 +2103,6 @@ def train_signal_quality_model(
     scale_pos_weight = (len(y) - pos_count) / pos_count if pos_count > 0 else 1.0
     w_tr = sample_weight[: len(y_tr)] if sample_weight is not None and len(sample_weight) >= len(y_tr) else None
 
-    cv_model = xgb.XGBClassifier(
-        n_estimators=200,
-        max_depth=4,
-        learning_rate=0.05,
-        objective="binary:logistic",
-        eval_metric="auc",
-        random_state=42,
-        tree_method="hist",
-        subsample=0.8,
-        colsample_bytree=0.8,
-        scale_pos_weight=scale_pos_weight,
-    )
-    tscv = TimeSeriesSplit(n_splits=5)
-    scores = cross_val_score(cv_model, X, y, cv=tscv, scoring="roc_auc")
-    logger.info("Signal Quality Model - CV AUC: %.3f (+/- %.3f)", scores.mean(), scores.std())
-
     model = xgb.XGBClassifier(
         n_estimators=200,
         max_depth=4,
@@ -869,6 +2114,7 @@ def train_signal_quality_model(
         subsample=0.8,
         colsample_bytree=0.8,
         scale_pos_weight=scale_pos_weight,
+        n_jobs=_CORE_BUDGET,
         early_stopping_rounds=15 if use_early_stop else None,
     )
     if use_early_stop:
@@ -887,46 +2133,6 @@ def train_signal_quality_model(
     return model
 
 
-def _tune_position_sizing(X: pd.DataFrame, y: pd.Series, sample_weight: np.ndarray | None) -> xgb.XGBRegressor:
-    """Hyperparameter tuning for position sizing: Optuna (if available) or GridSearchCV fallback."""
-    if OPTUNA_AVAILABLE:
-        tscv = TimeSeriesSplit(n_splits=3)
-
-        def objective(trial):
-            params = {
-                "max_depth": trial.suggest_int("max_depth", 2, 7),
-                "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.15, log=True),
-                "n_estimators": trial.suggest_int("n_estimators", 100, 400, step=50),
-                "subsample": trial.suggest_float("subsample", 0.6, 1.0),
-                "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
-                "min_child_weight": trial.suggest_int("min_child_weight", 1, 10),
-                "reg_alpha": trial.suggest_float("reg_alpha", 1e-8, 10.0, log=True),
-                "reg_lambda": trial.suggest_float("reg_lambda", 1e-8, 10.0, log=True),
-            }
-            model = xgb.XGBRegressor(objective="reg:squarederror", random_state=42, tree_method="hist", **params)
-            scores = cross_val_score(model, X, y, cv=tscv, scoring="neg_mean_absolute_error",
-                                     fit_params={"sample_weight": sample_weight} if sample_weight is not None else {})
-            return scores.mean()
-
-        study = optuna.create_study(direction="maximize", sampler=optuna.samplers.TPESampler(seed=42))
-        study.optimize(objective, n_trials=50, show_progress_bar=False)
-        logger.info("Optuna Position Sizing - best CV MAE: %.3f (params: %s)", -study.best_value, study.best_params)
-        final = xgb.XGBRegressor(objective="reg:squarederror", random_state=42, tree_method="hist", **study.best_params)
-        final.fit(X, y, sample_weight=sample_weight)
-        return final
-
-    # Fallback: GridSearchCV
-    param_grid = {"max_depth": [3, 4, 5], "learning_rate": [0.03, 0.05, 0.07], "n_estimators": [150, 200]}
-    base = xgb.XGBRegressor(objective="reg:squarederror", random_state=42, tree_method="hist", subsample=0.8, colsample_bytree=0.8)
-    search = GridSearchCV(base, param_grid, cv=TimeSeriesSplit(n_splits=3), scoring="neg_mean_absolute_error", n_jobs=_get_train_n_jobs(), verbose=0)
-    if sample_weight is not None:
-        search.fit(X, y, sample_weight=sample_weight)
-    else:
-        search.fit(X, y)
-    logger.info("Position Sizing Model - best CV MAE: %.3f (params: %s)", -search.best_score_, search.best_params_)
-    return search.best_estimator_
-
-
 def train_position_sizing_model(
     X: pd.DataFrame, y: pd.Series, sample_weight: np.ndarray | None = None
 ) -> xgb.XGBRegressor:
@@ -935,20 +2141,6 @@ def train_position_sizing_model(
     use_early_stop = X_val is not None and len(X_val) >= 5
     w_tr = sample_weight[: len(y_tr)] if sample_weight is not None and len(sample_weight) >= len(y_tr) else None
 
-    cv_model = xgb.XGBRegressor(
-        n_estimators=200,
-        max_depth=4,
-        learning_rate=0.05,
-        objective="reg:squarederror",
-        random_state=42,
-        tree_method="hist",
-        subsample=0.8,
-        colsample_bytree=0.8,
-    )
-    tscv = TimeSeriesSplit(n_splits=5)
-    scores = cross_val_score(cv_model, X, y, cv=tscv, scoring="neg_mean_absolute_error")
-    logger.info("Position Sizing Model - CV MAE: %.3f (+/- %.3f)", -scores.mean(), scores.std())
-
     model = xgb.XGBRegressor(
         n_estimators=200,
         max_depth=4,
@@ -958,6 +2150,7 @@ def train_position_sizing_model(
         tree_method="hist",
         subsample=0.8,
         colsample_bytree=0.8,
+        n_jobs=_CORE_BUDGET,
         early_stopping_rounds=15 if use_early_stop else None,
     )
     if use_early_stop:
@@ -970,105 +2163,6 @@ def train_position_sizing_model(
     return model
 
 
-def _tune_tp_optimizer(X: pd.DataFrame, y: pd.Series, sample_weight: np.ndarray | None, n_trials: int = 50) -> xgb.XGBClassifier:
-    """Bayesian hyperparameter tuning for TP optimizer via Optuna or GridSearchCV fallback."""
-    n_class = int(y.nunique())
-    if OPTUNA_AVAILABLE:
-        tscv = TimeSeriesSplit(n_splits=3)
-
-        def objective(trial):
-            params = {
-                "max_depth": trial.suggest_int("max_depth", 2, 7),
-                "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.15, log=True),
-                "n_estimators": trial.suggest_int("n_estimators", 100, 400, step=50),
-                "subsample": trial.suggest_float("subsample", 0.6, 1.0),
-                "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
-                "min_child_weight": trial.suggest_int("min_child_weight", 1, 10),
-                "reg_alpha": trial.suggest_float("reg_alpha", 1e-8, 10.0, log=True),
-                "reg_lambda": trial.suggest_float("reg_lambda", 1e-8, 10.0, log=True),
-            }
-            model = xgb.XGBClassifier(
-                objective="multi:softprob", num_class=max(n_class, 2), eval_metric="mlogloss",
-                random_state=42, tree_method="hist", **params,
-            )
-            scores = cross_val_score(model, X, y, cv=tscv, scoring="accuracy",
-                                     fit_params={"sample_weight": sample_weight} if sample_weight is not None else {})
-            return scores.mean()
-
-        study = optuna.create_study(direction="maximize", sampler=optuna.samplers.TPESampler(seed=42))
-        study.optimize(objective, n_trials=n_trials, show_progress_bar=False)
-        logger.info("Optuna TP Optimizer - best CV accuracy: %.3f (params: %s)", study.best_value, study.best_params)
-        final = xgb.XGBClassifier(
-            objective="multi:softprob", num_class=max(n_class, 2), eval_metric="mlogloss",
-            random_state=42, tree_method="hist", **study.best_params,
-        )
-        final.fit(X, y, sample_weight=sample_weight)
-        return final
-
-    # Fallback: GridSearchCV
-    param_grid = {"max_depth": [3, 4, 5], "learning_rate": [0.03, 0.05, 0.07], "n_estimators": [150, 200]}
-    base = xgb.XGBClassifier(
-        objective="multi:softprob", num_class=max(n_class, 2), eval_metric="mlogloss",
-        random_state=42, tree_method="hist", subsample=0.8, colsample_bytree=0.8,
-    )
-    search = GridSearchCV(base, param_grid, cv=TimeSeriesSplit(n_splits=3), scoring="accuracy", n_jobs=_get_train_n_jobs(), verbose=0)
-    if sample_weight is not None:
-        search.fit(X, y, sample_weight=sample_weight)
-    else:
-        search.fit(X, y)
-    logger.info("TP Optimizer - best CV accuracy: %.3f (params: %s)", search.best_score_, search.best_params_)
-    return search.best_estimator_
-
-
-def _tune_sl_optimizer(X: pd.DataFrame, y: pd.Series, sample_weight: np.ndarray | None, n_trials: int = 50) -> xgb.XGBRegressor:
-    """Bayesian hyperparameter tuning for SL optimizer via Optuna or GridSearchCV fallback."""
-    if OPTUNA_AVAILABLE:
-        tscv = TimeSeriesSplit(n_splits=3)
-
-        def objective(trial):
-            params = {
-                "max_depth": trial.suggest_int("max_depth", 2, 7),
-                "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.15, log=True),
-                "n_estimators": trial.suggest_int("n_estimators", 100, 400, step=50),
-                "subsample": trial.suggest_float("subsample", 0.6, 1.0),
-                "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
-                "min_child_weight": trial.suggest_int("min_child_weight", 1, 10),
-                "reg_alpha": trial.suggest_float("reg_alpha", 1e-8, 10.0, log=True),
-                "reg_lambda": trial.suggest_float("reg_lambda", 1e-8, 10.0, log=True),
-            }
-            model = xgb.XGBRegressor(
-                objective="reg:quantileerror", quantile_alpha=0.95,
-                random_state=42, tree_method="hist", **params,
-            )
-            scores = cross_val_score(model, X, y, cv=tscv, scoring="neg_mean_absolute_error",
-                                     fit_params={"sample_weight": sample_weight} if sample_weight is not None else {})
-            return scores.mean()
-
-        study = optuna.create_study(direction="maximize", sampler=optuna.samplers.TPESampler(seed=42))
-        study.optimize(objective, n_trials=n_trials, show_progress_bar=False)
-        logger.info("Optuna SL Optimizer - best CV MAE: %.3f (params: %s)", -study.best_value, study.best_params)
-        final = xgb.XGBRegressor(
-            objective="reg:quantileerror", quantile_alpha=0.95,
-            random_state=42, tree_method="hist", **study.best_params,
-        )
-        final.fit(X, y, sample_weight=sample_weight)
-        return final
-
-    # Fallback: GridSearchCV
-    param_grid = {"max_depth": [3, 4, 5], "learning_rate": [0.03, 0.05, 0.07], "n_estimators": [150, 200]}
-    base = xgb.XGBRegressor(
-        objective="reg:quantileerror", quantile_alpha=0.95,
-        random_state=42, tree_method="hist", subsample=0.8, colsample_bytree=0.8,
-    )
-    search = GridSearchCV(base, param_grid, cv=TimeSeriesSplit(n_splits=3), scoring="neg_mean_absolute_error", n_jobs=_get_train_n_jobs(), verbose=0)
-    if sample_weight is not None:
-        search.fit(X, y, sample_weight=sample_weight)
-    else:
-        search.fit(X, y)
-    logger.info("SL Optimizer - best CV MAE: %.3f (params: %s)", -search.best_score_, search.best_params_)
-    return search.best_estimator_
-
-
 def train_tp_optimizer_model(
     X: pd.DataFrame, y: pd.Series, sample_weight: np.ndarray | None = None
 ) -> xgb.XGBClassifier:
@@ -1078,22 +2172,6 @@ def train_tp_optimizer_model(
     use_early_stop = X_val is not None and len(X_val) >= 5
     w_tr = sample_weight[: len(y_tr)] if sample_weight is not None and len(sample_weight) >= len(y_tr) else None
 
-    cv_model = xgb.XGBClassifier(
-        n_estimators=200,
-        max_depth=4,
-        learning_rate=0.05,
-        objective="multi:softprob",
-        num_class=max(n_class, 2),
-        eval_metric="mlogloss",
-        random_state=42,
-        tree_method="hist",
-        subsample=0.8,
-        colsample_bytree=0.8,
-    )
-    tscv = TimeSeriesSplit(n_splits=5)
-    scores = cross_val_score(cv_model, X, y, cv=tscv, scoring="accuracy")
-    logger.info("TP Optimizer Model - CV Accuracy: %.3f (+/- %.3f)", scores.mean(), scores.std())
-
     model = xgb.XGBClassifier(
         n_estimators=200,
         max_depth=4,
@@ -1105,6 +2183,7 @@ def train_tp_optimizer_model(
         tree_method="hist",
         subsample=0.8,
         colsample_bytree=0.8,
+        n_jobs=_CORE_BUDGET,
         early_stopping_rounds=15 if use_early_stop else None,
     )
     if use_early_stop:
@@ -1135,6 +2214,7 @@ def train_sl_optimizer_model(
         tree_method="hist",
         subsample=0.8,
         colsample_bytree=0.8,
+        n_jobs=_CORE_BUDGET,
         early_stopping_rounds=15 if use_early_stop else None,
     )
     if use_early_stop:
@@ -1143,97 +2223,703 @@ def train_sl_optimizer_model(
         else:
             model.fit(X_tr, y_tr, eval_set=[(X_val, y_val)], verbose=False)
     else:
-        model.fit(X, y, sample_weight=sample_weight if sample_weight is not None else None)
-    return model
+        model.fit(X, y, sample_weight=sample_weight if sample_weight is not None else None)
+    return model
+
+
+MODEL_TRAINERS = {
+    "signal_quality": train_signal_quality_model,
+    "position_sizing": train_position_sizing_model,
+    "tp_optimizer": train_tp_optimizer_model,
+    "sl_optimizer": train_sl_optimizer_model,
+}
+
+
+# ==========================================
+# ONNX Export
+# ==========================================
+
+def _onnx_rename_io_for_runtime(onnx_model: "onnx.ModelProto", input_name: str = "input", output_name: str = "output") -> None:
+    """Rename graph input/output to 'input'/'output' for onnxruntime-node compatibility.
+
+    Node edges that consume the input or produce the output are renamed too; otherwise the graph output
+    is dangling and onnxruntime rejects the model.
+    """
+    g = onnx_model.graph
+    renames = {}
+    if g.input:
+        renames[g.input[0].name] = input_name
+        g.input[0].name = input_name
+    if g.output:
+        renames[g.output[0].name] = output_name
+        g.output[0].name = output_name
+    for node in g.node:
+        for edges in (node.input, node.output):
+            for i, edge in enumerate(edges):
+                if edge in renames:
+                    edges[i] = renames[edge]
+
+
+def verify_onnx_inference(onnx_path: str, X_sample: pd.DataFrame, model_name: str, is_classifier: bool = True) -> bool:
+    """Run one inference with onnxruntime to verify shape and value range. Catches dimension/dtype issues before deploy."""
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        logger.debug("onnxruntime not installed; skipping ONNX smoke test for %s", model_name)
+        return True
+    try:
+        session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        input_name = session.get_inputs()[0].name
+        output_name = session.get_outputs()[0].name
+        if (X_sample.dtypes == np.float32).all():
+            sample = X_sample  # prepared matrices are already float32 with NaNs filled
+        else:
+            sample = X_sample.fillna(0).select_dtypes(include=[np.number]).astype(np.float32)
+        if sample.shape[0] == 0:
+            logger.warning("ONNX smoke test %s: no numeric sample row", model_name)
+            return False
+        row = np.ascontiguousarray(sample.iloc[:1].values, dtype=np.float32)
+        out = session.run([output_name], {input_name: row})
+        if not out or out[0] is None:
+            logger.warning("ONNX smoke test %s: no output", model_name)
+            return False
+        arr = out[0]
+        if arr.size == 0:
+            logger.warning("ONNX smoke test %s: empty output", model_name)
+            return False
+        if is_classifier:
+            flat = arr.flatten()
+            if not np.all(np.isfinite(flat)):
+                logger.warning("ONNX smoke test %s: non-finite output", model_name)
+                return False
+            if np.any(flat < -0.01) or np.any(flat > 1.01):
+                logger.debug("ONNX smoke test %s: output outside [0,1] (may be logits): %s", model_name, flat[: min(4, len(flat))].tolist())
+        logger.info("ONNX smoke test passed for %s (shape %s)", model_name, arr.shape)
+        return True
+    except Exception as e:
+        logger.warning("ONNX smoke test failed for %s: %s", model_name, e)
+        return False
+
+
+# Post-export latency benchmark: batch sizes scored per model, timed runs per batch size (stops early once the
+# per-batch budget is spent, after at least ONNX_BENCH_MIN_RUNS), and the p50 slowdown vs the previously
+# exported model above which the new model is flagged as a latency regression. Slowdowns smaller than
+# ONNX_LATENCY_MIN_DELTA_MS are timer noise for these tiny models and never flag.
+ONNX_BENCH_BATCH_SIZES = (1, 8, 64, 1024)
+ONNX_BENCH_RUNS = 200
+ONNX_BENCH_MIN_RUNS = 20
+ONNX_BENCH_BUDGET_SEC = 0.1
+ONNX_LATENCY_TOLERANCE = 1.25
+ONNX_LATENCY_MIN_DELTA_MS = 0.05
+
+
+def benchmark_onnx_model(
+    onnx_path: str, X: pd.DataFrame, model_name: str, batch_sizes: Tuple[int, ...] = ONNX_BENCH_BATCH_SIZES,
+    runs: int = ONNX_BENCH_RUNS, budget_sec: float = ONNX_BENCH_BUDGET_SEC,
+) -> Dict[str, Any] | None:
+    """Load time and p50/p95/p99 session.run latency per batch size for one exported model.
+
+    Batches are built by cycling through the rows of X (the model's prepared features), so the trees take
+    realistic paths. Returns None when onnxruntime is missing or the model's input width does not match X.
+    """
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        logger.debug("onnxruntime not installed; skipping ONNX latency benchmark for %s", model_name)
+        return None
+    try:
+        started = time.perf_counter()
+        session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        load_ms = 1e3 * (time.perf_counter() - started)
+        model_input = session.get_inputs()[0]
+        width = model_input.shape[1] if len(model_input.shape) > 1 else None
+        if isinstance(width, int) and width != X.shape[1]:
+            logger.info("ONNX benchmark %s: model expects %d features, sample has %d; skipping", model_name, width, X.shape[1])
+            return None
+        if (X.dtypes == np.float32).all():
+            rows = X.to_numpy()
+        else:
+            rows = X.fillna(0).select_dtypes(include=[np.number]).to_numpy(dtype=np.float32)
+        if len(rows) == 0:
+            return None
+        batches: Dict[str, Dict[str, float]] = {}
+        for size in batch_sizes:
+            batch = np.ascontiguousarray(np.take(rows, np.arange(size) % len(rows), axis=0), dtype=np.float32)
+            feed = {model_input.name: batch}
+            for _ in range(3):
+                session.run(None, feed)
+            latencies: List[float] = []
+            deadline = time.perf_counter() + budget_sec
+            while len(latencies) < runs and (len(latencies) < ONNX_BENCH_MIN_RUNS or time.perf_counter() < deadline):
+                t0 = time.perf_counter()
+                session.run(None, feed)
+                latencies.append(time.perf_counter() - t0)
+            ms = 1e3 * np.asarray(latencies)
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            batches[str(size)] = {
+                "p50_ms": round(float(p50), 4),
+                "p95_ms": round(float(p95), 4),
+                "p99_ms": round(float(p99), 4),
+                "rows_per_sec": round(size / (p50 / 1e3), 1) if p50 > 0 else None,
+                "runs": len(latencies),
+            }
+        return {"load_ms": round(load_ms, 3), "batches": batches}
+    except Exception as e:
+        logger.warning("ONNX benchmark failed for %s: %s", model_name, e)
+        return None
+
+
+def compare_onnx_latency(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = ONNX_LATENCY_TOLERANCE,
+) -> Dict[str, Any]:
+    """p50 ratio (current / baseline) per batch size; regression when a batch size is more than tolerance
+    times slower and at least ONNX_LATENCY_MIN_DELTA_MS slower in absolute terms."""
+    ratios: Dict[str, float] = {}
+    slower: List[str] = []
+    for size, stats in current["batches"].items():
+        old_p50 = baseline["batches"].get(size, {}).get("p50_ms")
+        if not old_p50:
+            continue
+        ratios[size] = round(stats["p50_ms"] / old_p50, 3)
+        if ratios[size] > tolerance and stats["p50_ms"] - old_p50 >= ONNX_LATENCY_MIN_DELTA_MS:
+            slower.append(size)
+    return {"baseline": baseline, "p50_ratio": ratios, "regression": bool(slower), "slower_batches": slower}
+
+
+# Parity: each export must reproduce the XGBoost outputs (class probabilities / predictions) on the model's
+# time-split holdout rows (at most the last ONNX_PARITY_ROWS of them) within ONNX_PARITY_TOLERANCE, or the
+# export fails. Both sides score the rows in one batched call.
+ONNX_PARITY_TOLERANCE = 1e-4
+ONNX_PARITY_ROWS = 50_000
+
+
+def _xgboost_reference(model: Any, X: pd.DataFrame | np.ndarray) -> np.ndarray:
+    """What the ONNX graph must reproduce: class probabilities for classifiers, predictions for regressors."""
+    if hasattr(model, "predict_proba"):
+        return np.asarray(model.predict_proba(X), dtype=np.float64)
+    return np.asarray(model.predict(X), dtype=np.float64).reshape(len(X), -1)
+
+
+def _onnx_outputs(session: Any, rows: np.ndarray) -> np.ndarray:
+    """Probabilities (classifier graphs: second output) or predictions (regressor graphs) as [rows, k]."""
+    outputs = session.get_outputs()
+    out = session.run([outputs[-1].name], {session.get_inputs()[0].name: rows})[0]
+    return np.asarray(out, dtype=np.float64).reshape(len(rows), -1)
+
+
+def check_onnx_parity(
+    onnx_path: str, model: Any, X: pd.DataFrame, model_name: str, tolerance: float = ONNX_PARITY_TOLERANCE,
+) -> Dict[str, Any] | None:
+    """Max / mean absolute deviation between the ONNX session and the XGBoost model over X.
+
+    XGBoost scores the DataFrame (columns checked by name); the session gets the same rows as a float32
+    matrix in manifest column order, as the inference service does, so a feature-order or float32 rounding
+    bug shows up as a deviation. Returns None when onnxruntime is not installed.
+    """
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        logger.debug("onnxruntime not installed; skipping ONNX parity check for %s", model_name)
+        return None
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"rows": int(len(X)), "tolerance": tolerance}
+    try:
+        reference = _xgboost_reference(model, X)
+        session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        out = _onnx_outputs(session, np.ascontiguousarray(X.to_numpy(dtype=np.float32)))
+        if out.shape != reference.shape:
+            result["error"] = f"ONNX output shape {out.shape} != XGBoost {reference.shape}"
+        else:
+            deviation = np.abs(out - reference)
+            result["max_abs_error"] = float(deviation.max()) if deviation.size else 0.0
+            result["mean_abs_error"] = float(deviation.mean()) if deviation.size else 0.0
+    except Exception as e:
+        result["error"] = str(e)
+    result["passed"] = "error" not in result and result["max_abs_error"] <= tolerance
+    result["seconds"] = round(time.perf_counter() - started, 4)
+    if result["passed"]:
+        logger.info("ONNX parity %s: %d rows, max |ONNX - XGBoost| %.3g, mean %.3g (%.2fs)", model_name,
+                    result["rows"], result["max_abs_error"], result["mean_abs_error"], result["seconds"])
+    else:
+        logger.error("ONNX parity failed for %s on %d rows: %s", model_name, result["rows"],
+                     result.get("error") or f"max |ONNX - XGBoost| {result['max_abs_error']:.3g} > {tolerance:g}")
+    return result
+
+
+# Post-export variants (--onnx-optimize): written to onnx_variants/ inside the model's staging directory,
+# checked for parity on the newer half of the holdout rows (pruning searches on the older half); the smallest
+# (then fastest) passing one replaces the staged {name}.onnx and the other variants are deleted.
+ONNX_VARIANTS_DIR = "onnx_variants"
+ONNX_VARIANT_TOLERANCE = 1e-4
+
+
+def _onnx_parity_error(model_bytes: bytes, rows: np.ndarray, reference: np.ndarray) -> float:
+    """Max absolute difference between an ONNX model's outputs and the reference (inf on shape mismatch)."""
+    import onnxruntime as ort
+
+    session = ort.InferenceSession(model_bytes, providers=["CPUExecutionProvider"])
+    out = _onnx_outputs(session, rows)
+    if out.shape != reference.shape:
+        return float("inf")
+    return float(np.max(np.abs(out - reference))) if out.size else 0.0
+
+
+def _tree_ensemble_node(onnx_model: "onnx.ModelProto") -> Any | None:
+    nodes = [n for n in onnx_model.graph.node if n.op_type in ("TreeEnsembleClassifier", "TreeEnsembleRegressor")]
+    return nodes[0] if len(nodes) == 1 else None
+
+
+def _boosting_rounds(onnx_model: "onnx.ModelProto") -> Tuple[int, int]:
+    """(boosting rounds, trees per round) of the graph's tree ensemble; (0, 0) when there is none."""
+    node = _tree_ensemble_node(onnx_model)
+    if node is None:
+        return 0, 0
+    attrs = {a.name: onnx.helper.get_attribute_value(a) for a in node.attribute}
+    per_round = len(set(attrs.get("class_ids") or attrs.get("target_ids") or [0]))
+    return -(-(max(attrs["nodes_treeids"]) + 1) // per_round), per_round
+
+
+def truncate_tree_ensemble(onnx_model: "onnx.ModelProto", rounds: int) -> "onnx.ModelProto":
+    """Copy of the model keeping only the first `rounds` boosting rounds (XGBoost trees are numbered round by
+    round, one tree per class per round). The base values are unchanged."""
+    truncated = onnx.ModelProto()
+    truncated.CopyFrom(onnx_model)
+    node = _tree_ensemble_node(truncated)
+    _, per_round = _boosting_rounds(onnx_model)
+    keep = rounds * per_round
+    attrs = {a.name: onnx.helper.get_attribute_value(a) for a in node.attribute}
+    keep_nodes = [t < keep for t in attrs["nodes_treeids"]]
+    weights_prefix = "class_" if "class_treeids" in attrs else "target_"
+    keep_weights = [t < keep for t in attrs[weights_prefix + "treeids"]]
+    for i, attr in enumerate(node.attribute):
+        if attr.name.startswith("nodes_"):
+            mask = keep_nodes
+        elif attr.name.startswith(weights_prefix):
+            mask = keep_weights
+        else:
+            continue
+        values = [v for v, k in zip(attrs[attr.name], mask) if k]
+        node.attribute[i].CopyFrom(onnx.helper.make_attribute(attr.name, values))
+    return truncated
+
+
+def optimize_onnx_model(
+    model: Any, onnx_path: str, X: pd.DataFrame, model_name: str, variants_dir: Path,
+    tolerance: float = ONNX_VARIANT_TOLERANCE, holdout: pd.DataFrame | None = None,
+) -> Dict[str, Any] | None:
+    """Build optimized / pruned variants of an exported model and promote the best passing one to onnx_path.
+
+    Variants: "raw" (the export), "optimized" (onnxruntime's offline basic graph optimizations) and
+    "pruned" (fewest leading boosting rounds whose outputs stay within tolerance, then optimized). The
+    holdout rows (default: the last ONNX_PARITY_ROWS rows of X) are split in time: the round count is searched
+    on the older half, and every variant's outputs are compared with the XGBoost model's on the newer half,
+    so a pruned model is verified on rows that did not choose it. Passing variants are ranked by file size,
+    then batch-1 p50 latency. variants_dir is removed afterwards; only onnx_path is kept. Returns per-variant
+    size / hash / latency / error and the promoted variant, or None when onnxruntime is not installed.
+    """
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        logger.info("onnxruntime not installed; skipping ONNX optimization for %s", model_name)
+        return None
+    try:
+        variants_dir.mkdir(parents=True, exist_ok=True)
+        holdout = X.iloc[-ONNX_PARITY_ROWS:] if holdout is None else holdout
+        rows = np.ascontiguousarray(holdout.to_numpy(dtype=np.float32))
+        reference = _xgboost_reference(model, holdout)
+        split = len(rows) // 2
+        search_rows, search_reference = rows[:split], reference[:split]
+        verify_rows, verify_reference = rows[split:], reference[split:]
+        raw = onnx.load_model(onnx_path)
+
+        def ort_optimize(source: "onnx.ModelProto", path: Path) -> None:
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_BASIC
+            options.optimized_model_filepath = str(path)
+            ort.InferenceSession(source.SerializeToString(), options, providers=["CPUExecutionProvider"])
+
+        paths = {"raw": variants_dir / f"{model_name}.raw.onnx", "optimized": variants_dir / f"{model_name}.optimized.onnx"}
+        onnx.save_model(raw, str(paths["raw"]))
+        ort_optimize(raw, paths["optimized"])
+        rounds, _ = _boosting_rounds(raw)
+        kept_rounds = rounds
+        if rounds > 1 and split > 0:
+            # Binary search for the fewest leading rounds within tolerance (boosting corrections shrink, so
+            # parity is close to monotone in the number of rounds; the result is verified on other rows below).
+            lo, hi = 1, rounds
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if _onnx_parity_error(truncate_tree_ensemble(raw, mid).SerializeToString(), search_rows, search_reference) <= tolerance:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            kept_rounds = lo
+        if kept_rounds < rounds:
+            paths["pruned"] = variants_dir / f"{model_name}.pruned.onnx"
+            ort_optimize(truncate_tree_ensemble(raw, kept_rounds), paths["pruned"])
+
+        variants: Dict[str, Dict[str, Any]] = {}
+        for variant, path in paths.items():
+            error = _onnx_parity_error(path.read_bytes(), verify_rows, verify_reference)
+            latency = benchmark_onnx_model(str(path), X, f"{model_name}.{variant}", batch_sizes=(1, 64), runs=50)
+            variants[variant] = {
+                "sha256": _sha256_file(str(path)),
+                "size_bytes": path.stat().st_size,
+                "max_abs_error": error,
+                "passed": error <= tolerance,
+                "p50_ms": {b: v["p50_ms"] for b, v in latency["batches"].items()} if latency else None,
+            }
+        if "pruned" in variants:
+            variants["pruned"]["rounds"] = kept_rounds
+        passing = [v for v in variants if variants[v]["passed"]]
+        result: Dict[str, Any] = {
+            "tolerance": tolerance, "rounds": rounds, "search_rows": int(split), "verify_rows": int(len(rows) - split),
+            "variants": variants, "promoted": None,
+        }
+        if not passing:
+            logger.warning("ONNX optimization %s: no variant within %g of XGBoost; keeping the raw export", model_name, tolerance)
+            return result
+        best = min(passing, key=lambda v: (variants[v]["size_bytes"], (variants[v]["p50_ms"] or {}).get("1", 0.0)))
+        os.replace(paths[best], onnx_path)
+        result["promoted"] = best
+        logger.info("ONNX optimization %s: promoted %s (%d bytes, max error %.2g; raw %d bytes)", model_name, best,
+                    variants[best]["size_bytes"], variants[best]["max_abs_error"], variants["raw"]["size_bytes"])
+        return result
+    except Exception as e:
+        logger.warning("ONNX optimization failed for %s: %s", model_name, e)
+        return None
+    finally:
+        shutil.rmtree(variants_dir, ignore_errors=True)
 
 
 # ==========================================
-# ONNX Export
+# Native booster export (UBJSON + flat tree arrays)
 # ==========================================
 
-def _onnx_rename_io_for_runtime(onnx_model: "onnx.ModelProto", input_name: str = "input", output_name: str = "output") -> None:
-    """Rename graph input/output to 'input'/'output' for onnxruntime-node compatibility."""
-    g = onnx_model.graph
-    if g.input:
-        g.input[0].name = input_name
-    if g.output:
-        g.output[0].name = output_name
+NATIVE_MODEL_SUFFIX = ".ubj"
+TREE_ARRAYS_SUFFIX = ".trees.npz"
+
+# Objective -> transform from summed leaf margins to what predict / predict_proba return
+_TREE_TRANSFORMS = {
+    "binary:logistic": "logistic",
+    "reg:logistic": "logistic",
+    "multi:softprob": "softmax",
+    "multi:softmax": "softmax",
+    "reg:squarederror": "identity",
+    "reg:absoluteerror": "identity",
+    "reg:pseudohubererror": "identity",
+    "reg:quantileerror": "identity",
+}
+
+
+class TreeArrays:
+    """An XGBoost tree ensemble as flat NumPy arrays, with a pure-NumPy scorer.
+
+    The nodes of all trees are stored back to back. A split node i sends x to left[i] when
+    x[feature[i]] < threshold[i], to right[i] otherwise, and to left[i] for NaN when default_left[i].
+    Leaves have left == -1 and hold value[i]. roots[t] is the first node of tree t and tree_class[t] the
+    output column it adds to; base_margin is added per column before the objective's transform. Saved as an
+    uncompressed .npz, it loads in milliseconds without xgboost.
+    """
 
+    ARRAYS = ("feature", "threshold", "left", "right", "default_left", "value", "roots", "tree_class", "base_margin")
 
-def verify_onnx_inference(onnx_path: str, X_sample: pd.DataFrame, model_name: str, is_classifier: bool = True) -> bool:
-    """Run one inference with onnxruntime to verify shape and value range. Catches dimension/dtype issues before deploy."""
+    def __init__(self, arrays: Dict[str, np.ndarray], objective: str, feature_names: List[str]):
+        for key in self.ARRAYS:
+            setattr(self, key, arrays[key])
+        self.objective = objective
+        self.transform = _TREE_TRANSFORMS[objective]
+        self.feature_names = feature_names
+
+    @property
+    def n_outputs(self) -> int:
+        return len(self.base_margin)
+
+    @classmethod
+    def from_booster(cls, model: Any) -> "TreeArrays":
+        """Flatten a fitted XGBClassifier / XGBRegressor (numerical splits, gbtree, objectives in _TREE_TRANSFORMS).
+
+        Only the trees predict() uses are kept (up to best_iteration after early stopping). The base margin is
+        read back from the booster's own margin on one row, so it matches however the version stores base_score.
+        """
+        booster = model.get_booster()
+        learner = json.loads(booster.save_raw(raw_format="json"))["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in _TREE_TRANSFORMS:
+            raise ValueError(f"unsupported objective {objective}")
+        if learner["gradient_booster"]["name"] != "gbtree":
+            raise ValueError(f"unsupported booster {learner['gradient_booster']['name']}")
+        dump = learner["gradient_booster"]["model"]
+        rounds = len(dump["iteration_indptr"]) - 1
+        best = getattr(model, "best_iteration", None) if getattr(model, "early_stopping_rounds", None) else None
+        if best is not None:
+            rounds = min(rounds, int(best) + 1)
+        trees = dump["trees"][: dump["iteration_indptr"][rounds]]
+        if any(any(t["split_type"]) for t in trees):
+            raise ValueError("categorical splits are not supported")
+        sizes = np.array([len(t["left_children"]) for t in trees], dtype=np.int64)
+        roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+        offsets = np.repeat(roots, sizes)
+        cat = lambda key, dtype: np.concatenate([np.asarray(t[key], dtype=dtype) for t in trees])
+        left, right = cat("left_children", np.int64), cat("right_children", np.int64)
+        leaf = left < 0
+        split_conditions = cat("split_conditions", np.float32)
+        n_outputs = int(learner["learner_model_param"]["num_class"]) if _TREE_TRANSFORMS[objective] == "softmax" else 1
+        feature_names = list(booster.feature_names or [f"f{i}" for i in range(booster.num_features())])
+        arrays = {
+            "feature": np.where(leaf, 0, cat("split_indices", np.int64)).astype(np.int32),
+            "threshold": np.where(leaf, 0, split_conditions).astype(np.float32),
+            "left": np.where(leaf, -1, left + offsets),
+            "right": np.where(leaf, -1, right + offsets),
+            "default_left": cat("default_left", bool),
+            "value": np.where(leaf, split_conditions, 0).astype(np.float32),
+            "roots": roots,
+            "tree_class": np.asarray(dump["tree_info"][: len(trees)], dtype=np.int32) if n_outputs > 1 else np.zeros(len(trees), dtype=np.int32),
+            "base_margin": np.zeros(n_outputs, dtype=np.float64),
+        }
+        flat = cls(arrays, objective, feature_names)
+        probe = np.zeros((1, len(feature_names)), dtype=np.float32)
+        margin = booster.predict(xgb.DMatrix(probe, feature_names=booster.feature_names), output_margin=True, iteration_range=(0, rounds))
+        flat.base_margin = (np.asarray(margin, dtype=np.float64).reshape(1, -1) - flat.predict_margin(probe))[0]
+        return flat
+
+    def save(self, path: str) -> None:
+        meta = {"objective": self.objective, "feature_names": self.feature_names}
+        with open(path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **{key: getattr(self, key) for key in self.ARRAYS})
+
+    @classmethod
+    def load(cls, path: str) -> "TreeArrays":
+        with np.load(path) as f:
+            meta = json.loads(str(f["meta"]))
+            return cls({key: f[key] for key in cls.ARRAYS}, meta["objective"], meta["feature_names"])
+
+    def predict_margin(self, X: pd.DataFrame | np.ndarray) -> np.ndarray:
+        """Summed leaf values plus base margin, [rows, n_outputs]. All trees advance one level per step."""
+        X = np.asarray(X, dtype=np.float32)
+        out = np.tile(self.base_margin, (len(X), 1))
+        n_trees = len(self.roots)
+        chunk = max(1, (1 << 20) // max(n_trees, 1))
+        for start in range(0, len(X), chunk):
+            rows = X[start:start + chunk]
+            index = np.arange(len(rows))[:, None]
+            node = np.broadcast_to(self.roots, (len(rows), n_trees)).copy()
+            while True:
+                split = self.left[node] >= 0
+                if not split.any():
+                    break
+                x = rows[index, self.feature[node]]
+                go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+                node = np.where(split, np.where(go_left, self.left[node], self.right[node]), node)
+            leaves = self.value[node].astype(np.float64)
+            if self.n_outputs == 1:
+                out[start:start + chunk, 0] += leaves.sum(axis=1)
+            else:
+                for k in range(self.n_outputs):
+                    out[start:start + chunk, k] += leaves[:, self.tree_class == k].sum(axis=1)
+        return out
+
+    def predict(self, X: pd.DataFrame | np.ndarray) -> np.ndarray:
+        """predict_proba for classifiers ([rows, classes]), predict for regressors ([rows])."""
+        margin = self.predict_margin(X)
+        if self.transform == "logistic":
+            p = 1.0 / (1.0 + np.exp(-margin[:, 0]))
+            return np.column_stack([1.0 - p, p]) if self.objective == "binary:logistic" else p
+        if self.transform == "softmax":
+            e = np.exp(margin - margin.max(axis=1, keepdims=True))
+            return e / e.sum(axis=1, keepdims=True)
+        return margin[:, 0] if self.n_outputs == 1 else margin
+
+    def to_onnx(self) -> "onnx.ModelProto":
+        """The ensemble as one ai.onnx.ml TreeEnsembleClassifier / TreeEnsembleRegressor, laid out like the
+        onnxmltools conversion (input "input"; outputs "output" and, for classifiers, "probabilities")."""
+        if self.objective == "reg:logistic":
+            raise ValueError("reg:logistic has no TreeEnsembleRegressor post-transform")
+        n_nodes, n_trees = len(self.left), len(self.roots)
+        sizes = np.diff(np.append(self.roots, n_nodes))
+        tree = np.repeat(np.arange(n_trees), sizes)
+        local = np.arange(n_nodes) - self.roots[tree]
+        leaf = self.left < 0
+        branch_to = lambda child: np.where(leaf, 0, child - self.roots[tree])
+        classifier = self.transform != "identity"
+        attrs: Dict[str, Any] = {
+            "nodes_treeids": tree.tolist(),
+            "nodes_nodeids": local.tolist(),
+            "nodes_featureids": self.feature.tolist(),
+            "nodes_modes": np.where(leaf, "LEAF", "BRANCH_LT").tolist(),
+            "nodes_values": self.threshold.tolist(),
+            "nodes_truenodeids": branch_to(self.left).tolist(),
+            "nodes_falsenodeids": branch_to(self.right).tolist(),
+            "nodes_missing_value_tracks_true": (self.default_left & ~leaf).astype(np.int64).tolist(),
+            "base_values": self.base_margin.astype(np.float32).tolist(),
+        }
+        weights = "class_" if classifier else "target_"
+        attrs[weights + "treeids"] = tree[leaf].tolist()
+        attrs[weights + "nodeids"] = local[leaf].tolist()
+        attrs[weights + "ids"] = self.tree_class[tree[leaf]].tolist()
+        attrs[weights + "weights"] = self.value[leaf].tolist()
+        n_features = len(self.feature_names)
+        inputs = [onnx.helper.make_tensor_value_info("input", onnx.TensorProto.FLOAT, [None, n_features])]
+        if classifier:
+            n_classes = max(self.n_outputs, 2)
+            node = onnx.helper.make_node(
+                "TreeEnsembleClassifier", ["input"], ["output", "probabilities"], domain="ai.onnx.ml",
+                classlabels_int64s=list(range(n_classes)), post_transform="LOGISTIC" if self.transform == "logistic" else "SOFTMAX",
+                **attrs,
+            )
+            outputs = [
+                onnx.helper.make_tensor_value_info("output", onnx.TensorProto.INT64, [None]),
+                onnx.helper.make_tensor_value_info("probabilities", onnx.TensorProto.FLOAT, [None, n_classes]),
+            ]
+        else:
+            node = onnx.helper.make_node(
+                "TreeEnsembleRegressor", ["input"], ["output"], domain="ai.onnx.ml", n_targets=1, post_transform="NONE", **attrs,
+            )
+            outputs = [onnx.helper.make_tensor_value_info("output", onnx.TensorProto.FLOAT, [None, 1])]
+        model = onnx.helper.make_model(
+            onnx.helper.make_graph([node], "xgboost_tree_ensemble", inputs, outputs),
+            opset_imports=[onnx.helper.make_opsetid("ai.onnx.ml", 1)], producer_name="vince-train-models",
+        )
+        model.ir_version = 7
+        return model
+
+
+def save_native_model(
+    model: Any, output_dir: Path, model_name: str, holdout: pd.DataFrame | None = None,
+    tree_arrays: TreeArrays | None = None, tolerance: float = ONNX_PARITY_TOLERANCE,
+) -> Dict[str, Any]:
+    """Write {name}.ubj (XGBoost's native UBJSON) and {name}.trees.npz (TreeArrays) for non-ONNX consumers.
+
+    Load time and size of each format (and of the {name}.joblib backup, if present) are returned so the
+    inference side can pick the fastest. The tree arrays are checked against XGBoost on the holdout rows and
+    removed when they differ by more than tolerance.
+    """
+    result: Dict[str, Any] = {}
+
+    def timed_load(path: Path, load: Callable[[str], Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        load(str(path))
+        return {"file": path.name, "size_bytes": path.stat().st_size, "load_ms": round(1e3 * (time.perf_counter() - started), 3)}
+
+    ubj_path = output_dir / f"{model_name}{NATIVE_MODEL_SUFFIX}"
     try:
-        import onnxruntime as ort
-    except ImportError:
-        logger.debug("onnxruntime not installed; skipping ONNX smoke test for %s", model_name)
-        return True
+        model.save_model(str(ubj_path))
+        result["ubj"] = timed_load(ubj_path, lambda p: xgb.Booster(model_file=p))
+    except Exception as e:
+        logger.warning("Failed to save %s as UBJSON: %s", model_name, e)
+    trees_path = output_dir / f"{model_name}{TREE_ARRAYS_SUFFIX}"
     try:
-        session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
-        input_name = session.get_inputs()[0].name
-        output_name = session.get_outputs()[0].name
-        sample = X_sample.fillna(0).select_dtypes(include=[np.number]).astype(np.float32)
-        if sample.shape[0] == 0:
-            logger.warning("ONNX smoke test %s: no numeric sample row", model_name)
-            return False
-        row = np.ascontiguousarray(sample.iloc[:1].values, dtype=np.float32)
-        out = session.run({input_name: row}, None)
-        if not out or out[0] is None:
-            logger.warning("ONNX smoke test %s: no output", model_name)
-            return False
-        arr = out[0]
-        if arr.size == 0:
-            logger.warning("ONNX smoke test %s: empty output", model_name)
-            return False
-        if is_classifier:
-            flat = arr.flatten()
-            if not np.all(np.isfinite(flat)):
-                logger.warning("ONNX smoke test %s: non-finite output", model_name)
-                return False
-            if np.any(flat < -0.01) or np.any(flat > 1.01):
-                logger.debug("ONNX smoke test %s: output outside [0,1] (may be logits): %s", model_name, flat[: min(4, len(flat))].tolist())
-        logger.info("ONNX smoke test passed for %s (shape %s)", model_name, arr.shape)
-        return True
+        tree_arrays = tree_arrays or TreeArrays.from_booster(model)
+        tree_arrays.save(str(trees_path))
+        result["tree_arrays"] = timed_load(trees_path, TreeArrays.load)
+        if holdout is not None and len(holdout):
+            started = time.perf_counter()
+            predicted = TreeArrays.load(str(trees_path)).predict(holdout).reshape(len(holdout), -1)
+            error = float(np.max(np.abs(predicted - _xgboost_reference(model, holdout))))
+            result["tree_arrays"].update({
+                "rows": int(len(holdout)), "max_abs_error": error, "score_ms": round(1e3 * (time.perf_counter() - started), 3),
+            })
+            if not error <= tolerance:
+                logger.error("Tree arrays for %s differ from XGBoost by %.3g > %g; removing %s", model_name, error, tolerance, trees_path)
+                trees_path.unlink(missing_ok=True)
+                result["tree_arrays"]["written"] = False
     except Exception as e:
-        logger.warning("ONNX smoke test failed for %s: %s", model_name, e)
-        return False
+        trees_path.unlink(missing_ok=True)
+        logger.warning("Failed to save %s as tree arrays: %s", model_name, e)
+    joblib_path = output_dir / f"{model_name}.joblib"
+    if joblib_path.is_file():
+        result["joblib"] = timed_load(joblib_path, joblib.load)
+    if result:
+        logger.info("Native %s artifacts: %s", model_name, ", ".join(
+            f"{fmt} {info['size_bytes']} bytes / {info['load_ms']:.1f} ms load" for fmt, info in result.items()
+        ))
+    return result
 
 
-def export_to_onnx(model: Any, X_sample: pd.DataFrame, output_path: str, model_name: str) -> bool:
-    """Export XGBoost model to ONNX via onnxmltools. I/O named 'input'/'output' for onnxruntime-node."""
-    if not ONNX_AVAILABLE or convert_xgboost is None or FloatTensorType is None:
-        logger.warning("Skipping ONNX export for %s - install: pip3 install onnx onnxmltools", model_name)
+ONNX_CONVERTERS = ("native", "onnxmltools")
+
+
+def _convert_with_onnxmltools(model: Any, n_features: int) -> "onnx.ModelProto":
+    # onnxmltools expects feature names f0, f1, ...; XGBoost trained on DataFrame has column names.
+    booster = model.get_booster()
+    original_names = list(booster.feature_names) if booster.feature_names else []
+    try:
+        booster.feature_names = [f"f{i}" for i in range(n_features)]
+        initial_types = [("input", FloatTensorType([None, n_features]))]
+        onnx_model = convert_xgboost(model, initial_types=initial_types, target_opset=12)
+        _onnx_rename_io_for_runtime(onnx_model, input_name="input", output_name="output")
+        return onnx_model
+    finally:
+        if original_names:
+            booster.feature_names = original_names
+
+
+def onnx_export_available(converter: str = "native") -> bool:
+    """Whether export_to_onnx can run with this converter in this environment."""
+    return ONNX_AVAILABLE and (converter == "native" or ONNXMLTOOLS_AVAILABLE)
+
+
+def export_to_onnx(
+    model: Any, X_sample: pd.DataFrame, output_path: str, model_name: str,
+    converter: str = "native", tree_arrays: TreeArrays | None = None,
+) -> bool:
+    """Export XGBoost model to ONNX. I/O named 'input'/'output' for onnxruntime-node.
+
+    converter="native" builds the TreeEnsemble graph straight from the booster's flattened trees
+    (TreeArrays.to_onnx; no feature renaming, no onnxmltools round-trip) and falls back to onnxmltools
+    for boosters it does not cover; converter="onnxmltools" always uses onnxmltools.
+    """
+    if not onnx_export_available(converter):
+        logger.warning("Skipping ONNX export for %s - install: pip3 install %s", model_name,
+                       "onnx onnxmltools" if converter == "onnxmltools" else "onnx")
         return False
     try:
-        n_features = X_sample.shape[1]
-        # onnxmltools expects feature names f0, f1, ...; XGBoost trained on DataFrame has column names.
-        booster = model.get_booster()
-        original_names = list(booster.feature_names) if booster.feature_names else []
-        try:
-            booster.feature_names = [f"f{i}" for i in range(n_features)]
-            initial_types = [("input", FloatTensorType([None, n_features]))]
-            onnx_model = convert_xgboost(model, initial_types=initial_types, target_opset=12)
-            _onnx_rename_io_for_runtime(onnx_model, input_name="input", output_name="output")
-            onnx.save_model(onnx_model, output_path)
-            logger.info("Exported %s to %s", model_name, output_path)
-            is_classifier = "Classifier" in type(model).__name__ or "quality" in model_name.lower() or "optimizer" in model_name.lower()
-            if not verify_onnx_inference(output_path, X_sample, model_name, is_classifier=is_classifier):
-                logger.warning("ONNX export succeeded but smoke test failed for %s", model_name)
-            return True
-        finally:
-            if original_names:
-                booster.feature_names = original_names
+        onnx_model = None
+        if converter == "native":
+            try:
+                onnx_model = (tree_arrays or TreeArrays.from_booster(model)).to_onnx()
+            except Exception as e:
+                if not ONNXMLTOOLS_AVAILABLE:
+                    logger.warning("Failed to export %s: %s (install onnxmltools for the fallback converter)", model_name, e)
+                    return False
+                logger.info("Native ONNX conversion not available for %s (%s); using onnxmltools", model_name, e)
+        if onnx_model is None:
+            onnx_model = _convert_with_onnxmltools(model, X_sample.shape[1])
+        onnx.save_model(onnx_model, output_path)
+        logger.info("Exported %s to %s", model_name, output_path)
+        is_classifier = "Classifier" in type(model).__name__ or "quality" in model_name.lower() or "optimizer" in model_name.lower()
+        if not verify_onnx_inference(output_path, X_sample, model_name, is_classifier=is_classifier):
+            logger.warning("ONNX export succeeded but smoke test failed for %s", model_name)
+        return True
     except Exception as e:
         logger.warning("Failed to export %s: %s", model_name, e)
         return False
 
 
-def save_feature_manifest(feature_names: List[str], output_path: str, model_name: str) -> None:
+def save_feature_manifest(
+    feature_names: List[str], output_path: str, model_name: str,
+    clip_bounds: Dict[str, Dict[str, float]] | None = None,
+    lag_windows: List[int] | None = None, lag_time_windows: Dict[str, int] | None = None,
+) -> None:
     """Save ordered feature name manifest alongside the ONNX model.
 
     This ensures inference uses the exact same column order as training.
     The manifest maps index → feature name (f0 → market_priceChange24h, etc.).
+    With clip_bounds, "clip_bounds" holds the fitted {mean, std, cap, z} of each raw feature that was
+    clipped in training, so inference can apply the same rule: |x - mean| / std > z -> clip to [-cap, cap].
+    When the features include lag features, "lag_features" records the prior-trade lags, the suffix of
+    their mean and the time windows (ms) they were built with.
     """
     manifest = {"model": model_name, "features": feature_names, "n_features": len(feature_names)}
+    if clip_bounds:
+        manifest["clip_bounds"] = {f: clip_bounds[f] for f in feature_names if f in clip_bounds}
+    if any(_is_lag_feature(f) for f in feature_names):
+        windows = LAG_WINDOWS if lag_windows is None else sorted(set(lag_windows))
+        manifest["lag_features"] = {
+            "windows": windows,
+            "roll_suffix": _lag_roll_suffix(windows) if windows else None,
+            "time_windows": dict(LAG_TIME_WINDOWS if lag_time_windows is None else lag_time_windows),
+        }
     try:
         with open(output_path, "w") as f:
             json.dump(manifest, f, indent=2)
@@ -1245,11 +2931,7 @@ def save_feature_manifest(feature_names: List[str], output_path: str, model_name
 def compute_onnx_hash(onnx_path: str) -> str | None:
     """Compute SHA-256 hash of an ONNX file for versioning/integrity checks."""
     try:
-        h = hashlib.sha256()
-        with open(onnx_path, "rb") as f:
-            for chunk in iter(lambda: f.read(8192), b""):
-                h.update(chunk)
-        return h.hexdigest()
+        return _sha256_file(onnx_path, block_size=8192)
     except Exception:
         return None
 
@@ -1263,6 +2945,562 @@ def save_joblib_backup(model: Any, output_path: str, model_name: str) -> None:
         logger.warning("Failed to save joblib backup for %s: %s", model_name, e)
 
 
+# A model's artifacts are written to <output>/.staging/<name>/ and moved over the deployed files together once
+# its export has passed the checks, so a failed or rejected export leaves the previous model in place.
+STAGING_DIR = ".staging"
+
+
+def _staging_dir(output_dir: Path, model_name: str) -> Path:
+    """Empty staging directory for one model (leftovers of an interrupted run are removed)."""
+    path = output_dir / STAGING_DIR / model_name
+    shutil.rmtree(path, ignore_errors=True)
+    path.mkdir(parents=True)
+    return path
+
+
+def discard_staged_artifacts(staged: Path) -> None:
+    shutil.rmtree(staged, ignore_errors=True)
+    with contextlib.suppress(OSError):
+        staged.parent.rmdir()
+
+
+def promote_staged_artifacts(output_dir: Path, staged: Path) -> List[str]:
+    """Move a model's staged files over the deployed ones (os.replace per file, the .onnx last so its feature
+    manifest is already in place). Returns the promoted file names."""
+    files = sorted(staged.iterdir(), key=lambda p: (p.suffix == ".onnx", p.name))
+    for path in files:
+        os.replace(path, output_dir / path.name)
+    discard_staged_artifacts(staged)
+    return [p.name for p in files]
+
+
+# Fused export (--onnx-bundle): all exported models in one graph with one union-feature input.
+ONNX_BUNDLE_FILE = "models_bundle.onnx"
+ONNX_BUNDLE_MANIFEST = "models_bundle_features.json"
+
+
+def _bundle_clip_nodes(
+    name: str, source: str, target: str, features: List[str], bounds: Dict[str, Dict[str, float]],
+) -> Tuple[List[Any], List[Any]]:
+    """Nodes and initializers applying apply_clip_bounds in-graph: a value becomes min(max(x, -cap), cap)
+    when |x - mean| / std > z and std > 0 (NaN compares false and passes through)."""
+    params = {
+        key: np.array([bounds.get(f, {}).get(key, default) for f in features], dtype=np.float32)
+        for key, default in (("mean", 0.0), ("std", 0.0), ("cap", 0.0), ("z", 0.0))
+    }
+    clipped = params["std"] > 0
+    initializers = [
+        onnx.numpy_helper.from_array(params["mean"], f"{name}/clip_mean"),
+        onnx.numpy_helper.from_array(np.where(clipped, params["std"], 1.0).astype(np.float32), f"{name}/clip_std"),
+        onnx.numpy_helper.from_array(np.where(clipped, params["z"], np.inf).astype(np.float32), f"{name}/clip_z"),
+        onnx.numpy_helper.from_array(params["cap"], f"{name}/clip_cap"),
+        onnx.numpy_helper.from_array(-params["cap"], f"{name}/clip_neg_cap"),
+    ]
+    p = f"{name}/clip_"
+    make = onnx.helper.make_node
+    nodes = [
+        make("Sub", [source, p + "mean"], [p + "centered"]),
+        make("Abs", [p + "centered"], [p + "distance"]),
+        make("Div", [p + "distance", p + "std"], [p + "zscore"]),
+        make("Greater", [p + "zscore", p + "z"], [p + "outlier"]),
+        make("Max", [source, p + "neg_cap"], [p + "floored"]),
+        make("Min", [p + "floored", p + "cap"], [p + "capped"]),
+        make("Where", [p + "outlier", p + "capped", source], [target]),
+    ]
+    return nodes, initializers
+
+
+def build_onnx_bundle(
+    onnx_paths: Dict[str, str], feature_names: Dict[str, List[str]],
+    clip_bounds: Dict[str, Dict[str, Dict[str, float]]] | None = None,
+) -> Tuple["onnx.ModelProto", Dict[str, Any]]:
+    """Merge per-model ONNX graphs into one graph and its manifest.
+
+    The bundle has one float input "input" holding the union of the models' features (ordered by first
+    appearance across models). Each model's columns are gathered inside the graph and, where the model was
+    trained on clipped features, clipped with its own bounds, so the input takes raw feature values. Each
+    model contributes an output named after it (its "output" tensor) and, for classifiers,
+    "<name>_probabilities".
+    """
+    union = list(dict.fromkeys(f for name in onnx_paths for f in feature_names[name]))
+    position = {f: i for i, f in enumerate(union)}
+    nodes: List[Any] = []
+    initializers: List[Any] = []
+    outputs: List[Any] = []
+    opsets: Dict[str, int] = {}
+    manifest_models: Dict[str, Any] = {}
+    ir_version = onnx.IR_VERSION
+    for name, path in onnx_paths.items():
+        model = onnx.compose.add_prefix(onnx.load_model(path), f"{name}/")
+        ir_version = min(ir_version, model.ir_version)
+        for opset in model.opset_import:
+            opsets[opset.domain] = max(opsets.get(opset.domain, 0), opset.version)
+        graph = model.graph
+        features = feature_names[name]
+        indices = np.array([position[f] for f in features], dtype=np.int64)
+        initializers.append(onnx.numpy_helper.from_array(indices, f"{name}/columns"))
+        model_input = graph.input[0].name
+        bounds = {f: b for f, b in (clip_bounds or {}).get(name, {}).items() if f in position}
+        gathered = f"{name}/gathered" if bounds else model_input
+        nodes.append(onnx.helper.make_node("Gather", ["input", f"{name}/columns"], [gathered], axis=1))
+        if bounds:
+            clip_nodes, clip_inits = _bundle_clip_nodes(name, gathered, model_input, features, bounds)
+            nodes.extend(clip_nodes)
+            initializers.extend(clip_inits)
+        nodes.extend(graph.node)
+        initializers.extend(graph.initializer)
+        entry: Dict[str, Any] = {"features": features, "indices": indices.tolist(), "output": name}
+        for value, public in zip(graph.output, [name, f"{name}_probabilities"]):
+            nodes.append(onnx.helper.make_node("Identity", [value.name], [public]))
+            renamed = onnx.ValueInfoProto()
+            renamed.CopyFrom(value)
+            renamed.name = public
+            outputs.append(renamed)
+        if len(graph.output) > 1:
+            entry["probabilities"] = f"{name}_probabilities"
+        if bounds:
+            entry["clip_bounds"] = bounds
+        manifest_models[name] = entry
+    # Tree-only graphs import just ai.onnx.ml; the gather/clip nodes need the default domain (opset 12, as
+    # export_to_onnx targets)
+    opsets[""] = max(opsets.get("", 0), 12)
+    graph_input = onnx.helper.make_tensor_value_info("input", onnx.TensorProto.FLOAT, [None, len(union)])
+    bundle = onnx.helper.make_model(
+        onnx.helper.make_graph(nodes, "vince_models_bundle", [graph_input], outputs, initializers),
+        opset_imports=[onnx.helper.make_opsetid(domain, version) for domain, version in sorted(opsets.items())],
+        producer_name="vince-train-models",
+    )
+    bundle.ir_version = ir_version
+    onnx.checker.check_model(bundle)
+    manifest = {
+        "bundle": ONNX_BUNDLE_FILE,
+        "input": "input",
+        "features": union,
+        "n_features": len(union),
+        "models": manifest_models,
+    }
+    return bundle, manifest
+
+
+def export_onnx_bundle(
+    output_dir: Path, names: List[str], prepared: Dict[str, Tuple[pd.DataFrame, pd.Series, pd.DataFrame] | None],
+    clip_bounds: Dict[str, Dict[str, Dict[str, float]]] | None = None, tolerance: float = ONNX_PARITY_TOLERANCE,
+) -> Dict[str, Any] | None:
+    """Write ONNX_BUNDLE_FILE and ONNX_BUNDLE_MANIFEST for the exported models in output_dir.
+
+    Each model's bundle outputs are checked against its own {name}.onnx on its most recent prepared rows
+    (other union columns zero); the bundle is not written when any model differs by more than tolerance.
+    Any bundle left by an earlier run is removed first.
+    """
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        ort = None
+    # A bundle from an earlier run no longer matches the per-model exports
+    for stale in (ONNX_BUNDLE_FILE, ONNX_BUNDLE_MANIFEST):
+        (output_dir / stale).unlink(missing_ok=True)
+    names = [n for n in names if (output_dir / f"{n}.onnx").is_file() and prepared.get(n) is not None]
+    if not names:
+        return None
+    try:
+        bundle, manifest = build_onnx_bundle(
+            {n: str(output_dir / f"{n}.onnx") for n in names},
+            {n: prepared[n][0].columns.tolist() for n in names}, clip_bounds,
+        )
+        parity: Dict[str, float] = {}
+        if ort is not None:
+            session = ort.InferenceSession(bundle.SerializeToString(), providers=["CPUExecutionProvider"])
+            for name in names:
+                X = prepared[name][0].iloc[-ONNX_PARITY_ROWS:]
+                rows = np.zeros((len(X), manifest["n_features"]), dtype=np.float32)
+                rows[:, manifest["models"][name]["indices"]] = X.to_numpy(dtype=np.float32)
+                single = ort.InferenceSession(str(output_dir / f"{name}.onnx"), providers=["CPUExecutionProvider"])
+                expected = _onnx_outputs(single, np.ascontiguousarray(X.to_numpy(dtype=np.float32)))
+                public = manifest["models"][name].get("probabilities", name)
+                got = np.asarray(session.run([public], {"input": rows})[0], dtype=np.float64).reshape(len(X), -1)
+                parity[name] = float(np.max(np.abs(got - expected))) if got.size else 0.0
+            failed = {n: e for n, e in parity.items() if not e <= tolerance}
+            if failed:
+                logger.error("ONNX bundle differs from the per-model exports (%s); not writing %s",
+                             ", ".join(f"{n}: {e:.3g}" for n, e in failed.items()), ONNX_BUNDLE_FILE)
+                return {"written": False, "models": names, "parity_max_abs_error": parity}
+        bundle_path = output_dir / ONNX_BUNDLE_FILE
+        onnx.save_model(bundle, str(bundle_path))
+        manifest["onnx_sha256"] = compute_onnx_hash(str(bundle_path))
+        with open(output_dir / ONNX_BUNDLE_MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2)
+        logger.info("Exported ONNX bundle of %s to %s (%d union features)", ", ".join(names), bundle_path, manifest["n_features"])
+        return {
+            "written": True,
+            "path": str(bundle_path),
+            "manifest": str(output_dir / ONNX_BUNDLE_MANIFEST),
+            "models": names,
+            "n_features": manifest["n_features"],
+            "size_bytes": bundle_path.stat().st_size,
+            "onnx_sha256": manifest["onnx_sha256"],
+            "parity_max_abs_error": parity,
+        }
+    except Exception as e:
+        logger.warning("Failed to export ONNX bundle: %s", e)
+        return None
+
+
+def _bundle_sample_rows(
+    manifest_models: Dict[str, Any], prepared: Dict[str, Tuple[pd.DataFrame, pd.Series, pd.DataFrame] | None],
+    features: List[str], n: int = 1024,
+) -> pd.DataFrame:
+    """Union-feature rows for benchmarking the bundle: each model's columns come from its own latest rows."""
+    n = min([n] + [len(prepared[name][0]) for name in manifest_models])
+    rows = np.zeros((n, len(features)), dtype=np.float32)
+    for name, entry in manifest_models.items():
+        rows[:, entry["indices"]] = prepared[name][0].iloc[-n:].to_numpy(dtype=np.float32)
+    return pd.DataFrame(rows, columns=features)
+
+
+# ==========================================
+# Incremental Training
+# ==========================================
+
+# Bump when the saved state layout changes; older state then forces one full rebuild.
+INCREMENTAL_STATE_VERSION = 3
+# Index (marks, lag tails, clip bounds, model hashes) and the directory of appended row segments. Each run
+# writes one segment with only its new lag-featured rows and prepared rows; past INCREMENTAL_MAX_SEGMENTS
+# the segments are compacted into one.
+INCREMENTAL_STATE_FILE = "incremental_state.joblib"
+INCREMENTAL_SEGMENTS_DIR = "incremental_state"
+INCREMENTAL_MAX_SEGMENTS = 32
+# Trees added per warm-started model on each incremental run.
+INCREMENTAL_BOOST_ROUNDS = 50
+# A model is only warm-started with at least INCREMENTAL_MIN_NEW_ROWS new labeled rows and while its ensemble
+# stays within INCREMENTAL_MAX_ROUNDS boosting rounds; otherwise it is retrained from scratch on all rows.
+# The latest INCREMENTAL_CHECK_FRACTION of the new rows are left out of the warm start and score the
+# warm-started booster against the previous one; a warm start that scores worse is replaced by a full retrain.
+INCREMENTAL_MIN_NEW_ROWS = 100
+INCREMENTAL_MAX_ROUNDS = 400
+INCREMENTAL_CHECK_FRACTION = 0.2
+# _fold_metrics key the warm-start check compares, and its direction (1 = higher is better)
+_WARM_START_CHECK_METRIC = {
+    "signal_quality": ("auc", 1),
+    "position_sizing": ("mae", -1),
+    "tp_optimizer": ("log_loss", -1),
+    "sl_optimizer": ("quantile_loss", -1),
+}
+
+MODEL_LABEL_COLUMNS = {name: spec["label"] for name, spec in MODEL_FEATURE_SPECS.items()}
+# Per-row columns kept next to each prepared matrix (ordering, sample weights).
+_PREPARED_AUX_COLUMNS = ("id", "timestamp", "asset", "label_benchScore")
+
+
+def _jsonl_high_water_mark(path_str: str, end: int | None = None) -> Dict[str, Any]:
+    """Byte offset just past the last complete line of a JSONL file (or of its first `end` bytes),
+    with that line's record id and timestamp. Comparing a stored mark with the mark recomputed at the
+    same offset detects files rewritten rather than appended to.
+    """
+    size = os.path.getsize(path_str) if end is None else end
+    mark: Dict[str, Any] = {"offset": 0, "last_id": None, "last_timestamp": None}
+    block = 1 << 16
+    with open(path_str, "rb") as f:
+        while True:
+            start = max(0, size - block)
+            f.seek(start)
+            data = f.read(size - start)
+            cut = data.rfind(b"\n")
+            if start == 0 or (cut >= 0 and data.rfind(b"\n", 0, cut) >= 0):
+                break
+            block *= 4
+    if cut < 0:
+        return mark
+    mark["offset"] = start + cut + 1
+    lines = data[:cut].split(b"\n")
+    for line in reversed(lines[1:] if start > 0 else lines):
+        try:
+            r = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(r, dict) and r.get("id") is not None:
+            mark["last_id"], mark["last_timestamp"] = r["id"], r.get("timestamp")
+            break
+    return mark
+
+
+def _load_jsonl_since(
+    paths: List[str], marks: Dict[str, Dict[str, Any]], chunk_size: int = LOAD_CHUNK_SIZE,
+) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]] | None:
+    """Load only the lines appended after each file's high-water mark (new files are read whole).
+
+    Returns (new rows, updated marks), or None when a known file was removed, truncated or rewritten.
+    """
+    keys = [os.path.abspath(p) for p in paths]
+    if set(marks) - set(keys):
+        logger.info("Incremental: source file(s) removed since last run")
+        return None
+    frames: List[pd.DataFrame] = []
+    new_marks: Dict[str, Dict[str, Any]] = {}
+    n_records = 0
+    for path, key in zip(paths, keys):
+        mark = new_marks[key] = _jsonl_high_water_mark(path)
+        old = marks.get(key)
+        start = 0
+        if old is not None:
+            if mark["offset"] < old["offset"] or _jsonl_high_water_mark(path, end=old["offset"]) != old:
+                logger.info("Incremental: %s was rewritten since last run", path)
+                return None
+            start = old["offset"]
+        if mark["offset"] > start:
+            frame, n = _load_jsonl_file(path, chunk_size=chunk_size, start=start, end=mark["offset"])
+            n_records += n
+            if len(frame.columns):
+                frames.append(frame)
+    logger.info("Incremental: loaded %d new records from %d file(s)", n_records, len(paths))
+    df = _concat_chunks(frames)
+    return (_finalize_loaded_frame(df) if not df.empty else df), new_marks
+
+
+def _lag_context(
+    frame: pd.DataFrame, windows: List[int], time_windows: Dict[str, int], since: float | None = None,
+) -> pd.DataFrame:
+    """Rows of a lag-featured frame that lags of later rows can reach: the last max(windows) rows per asset,
+    plus the rows inside the longest time window before `since` (default: the frame's last timestamp)."""
+    n_context = max(windows, default=0)
+    context = frame.groupby("asset", sort=False).tail(n_context) if "asset" in frame.columns else frame.tail(n_context)
+    if time_windows and "timestamp" in frame.columns and len(frame):
+        since = (frame["timestamp"].max() if since is None else since) - max(time_windows.values())
+        context = frame.loc[context.index.union(frame.index[frame["timestamp"] >= since])]
+    return context
+
+
+def _extend_lagged_frame(
+    context: pd.DataFrame, new_rows: pd.DataFrame,
+    windows: List[int] | None = None, time_windows: Dict[str, int] | None = None,
+) -> pd.DataFrame:
+    """Lag features for new rows, computed against earlier lag-featured rows (the saved lag tail, or the
+    whole frame); earlier rows are never recomputed. Returns the new rows with lags.
+    """
+    windows = LAG_WINDOWS if windows is None else windows
+    time_windows = LAG_TIME_WINDOWS if time_windows is None else time_windows
+    since = new_rows["timestamp"].min() if "timestamp" in new_rows.columns else None
+    context = _lag_context(context, windows, time_windows, since=since)
+    marker = "_incremental_new"
+    combined = _concat_chunks([context.assign(**{marker: False}), new_rows.assign(**{marker: True})])
+    combined = add_lag_features(combined, windows, time_windows)
+    return combined[combined[marker]].drop(columns=marker).reset_index(drop=True)
+
+
+def _prepared_matches_manifest(name: str, X: pd.DataFrame, output_dir: Path) -> bool:
+    """True when the cached matrix columns still equal the feature manifest the last export wrote."""
+    manifest_path = output_dir / f"{name}_features.json"
+    if not manifest_path.is_file():
+        return True
+    try:
+        with open(manifest_path) as f:
+            return json.load(f).get("features") == X.columns.tolist()
+    except (OSError, ValueError):
+        return False
+
+
+def _sort_by_timestamp(X: pd.DataFrame, y: pd.Series, aux: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame]:
+    if "timestamp" not in aux.columns:
+        return X, y, aux
+    order = np.argsort(aux["timestamp"].to_numpy(), kind="stable")
+    return X.iloc[order].reset_index(drop=True), y.iloc[order].reset_index(drop=True), aux.iloc[order].reset_index(drop=True)
+
+
+def _merge_prepared(
+    cached: Tuple[pd.DataFrame, pd.Series, pd.DataFrame],
+    fresh: Tuple[pd.DataFrame, pd.Series, pd.DataFrame],
+) -> Tuple[Tuple[pd.DataFrame, pd.Series, pd.DataFrame], np.ndarray] | None:
+    """Append freshly prepared rows to a cached prepared matrix, aligned to its columns and re-sorted by time.
+
+    Returns ((X, y, aux), new_row_mask), or None when the new rows bring feature columns the cached matrix
+    (and so the exported manifest) does not have.
+    """
+    X_old, y_old, aux_old = cached
+    X_new, y_new, aux_new = fresh
+    if X_new.empty:
+        return cached, np.zeros(len(X_old), dtype=bool)
+    if X_old.empty or set(X_new.columns) - set(X_old.columns):
+        return None
+    # Asset dummies only appear when a frame has several assets; rebuild them against the cached set.
+    asset_cols = [c for c in X_old.columns if c.startswith("asset_")]
+    if "asset" in aux_new.columns:
+        known = {c[len("asset_"):] for c in asset_cols} | set(aux_old["asset"] if "asset" in aux_old.columns else ())
+        if set(aux_new["asset"]) - known:
+            return None
+    X_new = X_new.reindex(columns=X_old.columns, fill_value=0).astype(X_old.dtypes)
+    if asset_cols and "asset" in aux_new.columns:
+        assets = aux_new["asset"].to_numpy()
+        for c in asset_cols:
+            X_new[c] = (assets == c[len("asset_"):]).astype(X_old[c].dtype)
+    X = pd.concat([X_old, X_new], ignore_index=True)
+    y = pd.concat([y_old, y_new], ignore_index=True)
+    aux = pd.concat([aux_old, aux_new], ignore_index=True)
+    new_mask = np.r_[np.zeros(len(X_old), dtype=bool), np.ones(len(X_new), dtype=bool)]
+    if "timestamp" in aux.columns:
+        new_mask = new_mask[np.argsort(aux["timestamp"].to_numpy(), kind="stable")]
+    return _sort_by_timestamp(X, y, aux), new_mask
+
+
+def _warm_start_model(
+    model: Any, X_new: pd.DataFrame, y_new: pd.Series, sample_weight: np.ndarray | None = None,
+    n_rounds: int = INCREMENTAL_BOOST_ROUNDS,
+) -> Any:
+    """Continue boosting a fitted XGBoost model on new rows only; returns a new model.
+
+    Trees past an early-stopping best iteration are dropped first (inference never used them), then up
+    to n_rounds trees are added with the model's own booster params via xgb.train(xgb_model=...).
+    """
+    if len(X_new) == 0:
+        return model
+    booster = model.get_booster()
+    best = booster.attr("best_iteration")
+    if best is not None:
+        booster = booster[: int(best) + 1]
+    params = {k: v for k, v in model.get_xgb_params().items() if v is not None}
+    if _CORE_BUDGET is not None:
+        params["n_jobs"] = _CORE_BUDGET
+    dtrain = xgb.DMatrix(X_new, label=y_new, weight=sample_weight)
+    booster = xgb.train(params, dtrain, num_boost_round=n_rounds, xgb_model=booster)
+    warm = copy.deepcopy(model)
+    warm.load_model(bytearray(booster.save_raw("ubj")))
+    return warm
+
+
+def _boosted_rounds(model: Any) -> int:
+    """Boosting rounds inference uses (up to the early-stopping best iteration)."""
+    booster = model.get_booster()
+    best = booster.attr("best_iteration")
+    return int(best) + 1 if best is not None else booster.num_boosted_rounds()
+
+
+def warm_start_checked(
+    name: str, model: Any, X: pd.DataFrame, y: pd.Series, new_mask: np.ndarray,
+    sample_weight: np.ndarray | None = None, min_new_rows: int = INCREMENTAL_MIN_NEW_ROWS,
+    max_rounds: int = INCREMENTAL_MAX_ROUNDS, n_rounds: int = INCREMENTAL_BOOST_ROUNDS,
+) -> Tuple[Any | None, Dict[str, Any]]:
+    """(warm-started model, stats), or (None, stats) when the model should be retrained from scratch.
+
+    Falls back when there are fewer than min_new_rows new rows or the ensemble would exceed max_rounds.
+    Otherwise the previous model is warm-started on all but the latest INCREMENTAL_CHECK_FRACTION of the new
+    rows, and that booster (the one that ships) is scored against the previous model on the held-out rows
+    with _fold_metrics; it is kept only when it is not worse on the model's _WARM_START_CHECK_METRIC.
+    """
+    new_rows = np.flatnonzero(new_mask)
+    stats: Dict[str, Any] = {"new_rows": int(len(new_rows)), "previous_rounds": _boosted_rounds(model), "accepted": False}
+    if len(new_rows) < max(min_new_rows, 2):
+        stats["reason"] = f"{len(new_rows)} new rows < {min_new_rows}"
+        return None, stats
+    if stats["previous_rounds"] + n_rounds > max_rounds:
+        stats["reason"] = f"{stats['previous_rounds'] + n_rounds} rounds > {max_rounds}"
+        return None, stats
+    n_check = max(1, int(round(len(new_rows) * INCREMENTAL_CHECK_FRACTION)))
+    fit_rows, check_rows = new_rows[:-n_check], new_rows[-n_check:]
+    warm = _warm_start_model(
+        model, X.iloc[fit_rows], y.iloc[fit_rows], sample_weight=sample_weight[fit_rows] if sample_weight is not None else None,
+        n_rounds=n_rounds,
+    )
+    metric, direction = _WARM_START_CHECK_METRIC[name]
+    X_check, y_check = X.iloc[check_rows], y.iloc[check_rows]
+    stats.update({
+        "rounds": _boosted_rounds(warm),
+        "check_rows": int(n_check),
+        "metric": metric,
+        "previous": _fold_metrics(name, model, X_check, y_check),
+        "warm_started": _fold_metrics(name, warm, X_check, y_check),
+    })
+    stats["accepted"] = direction * (stats["warm_started"][metric] - stats["previous"][metric]) >= 0
+    if not stats["accepted"]:
+        stats["reason"] = f"{metric} on the {n_check} latest new rows worse than the previous model"
+        return None, stats
+    return warm, stats
+
+
+def _incremental_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Options that change which rows are prepared; any change forces a full rebuild."""
+    return {
+        "version": INCREMENTAL_STATE_VERSION,
+        "real_only": bool(getattr(args, "real_only", False)),
+        "min_bench_score": getattr(args, "min_bench_score", None),
+        "lag_windows": list(getattr(args, "lag_windows", LAG_WINDOWS)),
+        "lag_time_windows": dict(getattr(args, "lag_time_windows", LAG_TIME_WINDOWS)),
+    }
+
+
+def _model_digests(output_dir: Path, model_names: List[str]) -> Dict[str, str]:
+    """SHA-256 of each deployed <name>.joblib; any other writer (e.g. a full retrain) changes them."""
+    return {
+        name: _sha256_file(str(output_dir / f"{name}.joblib"))
+        for name in model_names if (output_dir / f"{name}.joblib").is_file()
+    }
+
+
+def _load_incremental_state(output_dir: Path, options: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Previous run's high-water marks, lag tail, lag-featured frame and prepared matrices, or None (full rebuild).
+
+    The frame and prepared matrices are the previous runs' segments appended in order and re-sorted by time.
+    """
+    path = output_dir / INCREMENTAL_STATE_FILE
+    if not path.is_file():
+        logger.info("Incremental: no previous state in %s; full rebuild", output_dir)
+        return None
+    try:
+        state = joblib.load(path)
+        if not isinstance(state, dict) or state.get("options") != options:
+            logger.info("Incremental: state version or data options changed; full rebuild")
+            return None
+        if state["models"] != _model_digests(output_dir, list(MODEL_FEATURE_SPECS)):
+            logger.info("Incremental: models were replaced since the last --incremental run; full rebuild")
+            return None
+        segments = [joblib.load(output_dir / INCREMENTAL_SEGMENTS_DIR / name) for name in state["segments"]]
+    except Exception as e:
+        logger.warning("Incremental: could not read %s (%s); full rebuild", path, e)
+        return None
+    frame = _concat_chunks([seg["frame"] for seg in segments])
+    state["frame"] = frame.sort_values("timestamp", kind="stable").reset_index(drop=True) if "timestamp" in frame.columns else frame
+    state["prepared"] = {}
+    for name in segments[0]["prepared"]:
+        parts = [seg["prepared"][name] for seg in segments if name in seg["prepared"]]
+        state["prepared"][name] = _sort_by_timestamp(*(pd.concat(p, ignore_index=True) for p in zip(*parts)))
+    for name, (X, _, _) in state["prepared"].items():
+        if not _prepared_matches_manifest(name, X, output_dir):
+            logger.info("Incremental: %s feature manifest changed; full rebuild", name)
+            return None
+    return state
+
+
+def _save_incremental_state(
+    output_dir: Path, state: Dict[str, Any], rows: Dict[str, Any], segments: List[str] | None = None,
+) -> None:
+    """Write a segment with this run's rows, then the index listing it after `segments` (None = a full build).
+
+    The index is replaced atomically after the segment is written; segment files it does not list are removed.
+    """
+    path = output_dir / INCREMENTAL_STATE_FILE
+    seg_dir = output_dir / INCREMENTAL_SEGMENTS_DIR
+    name = f"{datetime.now():%Y%m%dT%H%M%S%f}.joblib"
+    state = {**state, "segments": list(segments or []) + [name]}
+    tmp = path.with_suffix(".tmp")
+    try:
+        seg_dir.mkdir(exist_ok=True)
+        joblib.dump(rows, seg_dir / name)
+        joblib.dump(state, tmp)
+        os.replace(tmp, path)
+        for stale in seg_dir.iterdir():
+            if stale.name not in state["segments"]:
+                stale.unlink()
+        logger.info("Saved incremental state (%d new rows, %d segment(s)): %s", len(rows["frame"]), len(state["segments"]), path)
+    except Exception as e:
+        logger.warning("Failed to save incremental state: %s", e)
+
+
+def _clear_incremental_state(output_dir: Path) -> None:
+    """Drop incremental state; a full (non-incremental) retrain replaces the models it describes."""
+    path = output_dir / INCREMENTAL_STATE_FILE
+    if path.is_file() or (output_dir / INCREMENTAL_SEGMENTS_DIR).exists():
+        logger.info("Removing incremental state (full retrain): %s", path)
+    path.unlink(missing_ok=True)
+    shutil.rmtree(output_dir / INCREMENTAL_SEGMENTS_DIR, ignore_errors=True)
+
+
 # ==========================================
 # Improvement Report (identify which parameters/weights to improve)
 # ==========================================
@@ -1568,38 +3806,156 @@ def write_improvement_report_md(report: Dict[str, Any], output_path: Path) -> No
 # Main Training Pipeline
 # ==========================================
 
+def _model_clip_bounds(name: str, df: pd.DataFrame, cache: Dict[str, Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Clip bounds fitted on one model's labeled rows, memoized per run by the row set (models with the
+    same labeled rows share one fit)."""
+    label_col = MODEL_LABEL_COLUMNS[name]
+    if label_col not in df.columns:
+        return {}
+    rows = df.index[df[label_col].notna()]
+    key = hashlib.sha1(np.asarray(rows, dtype=np.int64).tobytes()).hexdigest()
+    if key not in cache:
+        cache[key] = fit_clip_bounds(df.loc[rows, _feature_source_columns(df, list(MODEL_FEATURE_SPECS))])
+    return cache[key]
+
+
+def _prepare_models_data(
+    names: List[str], df: pd.DataFrame, clip_outliers: bool = True,
+    clip_bounds: Dict[str, Dict[str, Dict[str, float]]] | None = None,
+) -> Dict[str, Tuple[pd.DataFrame, pd.Series, pd.DataFrame]]:
+    """Prepared (X, y, aux) per model from one shared feature materialization (build_feature_matrices);
+    aux holds the id/timestamp/asset/bench score of each X row. clip_bounds maps model name to previously
+    fitted clip bounds instead of fitting them on df."""
+    matrices = build_feature_matrices(df, names, clip_outliers=clip_outliers, clip_bounds=clip_bounds)
+    aux_cols = [c for c in _PREPARED_AUX_COLUMNS if c in df.columns]
+    prepared = {}
+    for name, (X, y) in matrices.items():
+        aux = df.loc[X.index, aux_cols] if not X.empty else df.iloc[:0][aux_cols]
+        prepared[name] = (X, y, aux)
+    return prepared
+
+
+def _prepare_model_data(
+    name: str, df: pd.DataFrame, clip_outliers: bool = True, clip_bounds: Dict[str, Dict[str, float]] | None = None,
+) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame] | None:
+    """Prepared (X, y, aux) for one model (see _prepare_models_data); None for an unknown model name."""
+    if name not in MODEL_FEATURE_SPECS:
+        return None
+    bounds = {name: clip_bounds} if clip_bounds is not None else None
+    return _prepare_models_data([name], df, clip_outliers=clip_outliers, clip_bounds=bounds)[name]
+
+
+class SharedPrepared:
+    """A model's prepared (X, y, aux) handed to a --parallel worker without pickling the matrices.
+
+    X (as one float32 matrix) and y are written once to .npy files in `directory`; workers memory-map
+    them read-only, so every process reads the same page-cache pages instead of holding its own copy of
+    the features. Only the file paths, column names and the small aux frame (id/timestamp/asset/bench
+    score, whose index is also X's) are pickled.
+    """
+
+    def __init__(self, directory: Path, name: str, prepared: Tuple[pd.DataFrame, pd.Series, pd.DataFrame]):
+        X, y, aux = prepared
+        self.x_path = str(directory / f"{name}_X.npy")
+        self.y_path = str(directory / f"{name}_y.npy")
+        np.save(self.x_path, _contiguous_float32(X).to_numpy())
+        np.save(self.y_path, y.to_numpy())
+        self.columns = X.columns.tolist()
+        self.y_name = y.name
+        self.aux = aux
+
+    def load(self) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame]:
+        """Zero-copy (X, y, aux) over the memory-mapped files."""
+        index = self.aux.index
+        # np.asarray: plain ndarray views over the maps (no np.memmap subclass leaking into pandas)
+        X = pd.DataFrame(np.asarray(np.load(self.x_path, mmap_mode="r")), index=index, columns=self.columns, copy=False)
+        y = pd.Series(np.asarray(np.load(self.y_path, mmap_mode="r")), index=index, name=self.y_name, copy=False)
+        return X, y, self.aux
+
+
+def _model_cost(name: str, prepared: Tuple[pd.DataFrame, pd.Series, pd.DataFrame] | None, args: argparse.Namespace) -> float:
+    """Expected training cost: rows x features x model fits (tuning trials x 3 CV folds, walk-forward folds, final fit)."""
+    if prepared is None or len(prepared[0]) < args.min_samples:
+        return 0.0
+    X = prepared[0]
+    fits = getattr(args, "wf_splits", 5) + 1
+    if getattr(args, "tune_hyperparams", False):
+        fits += 3 * (getattr(args, "optuna_trials", None) or TUNER_SPECS[name]["n_trials"])
+    return float(len(X) * X.shape[1] * fits)
+
+
+def _schedule_model_threads(costs: Dict[str, float], cores: int) -> Dict[str, int]:
+    """Split cores between concurrently trained models in proportion to their expected cost (at least 1 each).
+
+    The shares sum to the core count, or to the number of models when there are more models than cores.
+    """
+    total = sum(costs.values())
+    if total <= 0:
+        return {name: max(1, cores // max(len(costs), 1)) for name in costs}
+    threads = {name: max(1, int(cores * cost / total)) for name, cost in costs.items()}
+    by_cost = sorted(costs, key=costs.get, reverse=True)
+    spare = cores - sum(threads.values())
+    for i in range(max(spare, 0)):
+        # Cores lost to rounding go to the most expensive models
+        threads[by_cost[i % len(by_cost)]] += 1
+    for _ in range(max(-spare, 0)):
+        # Cores handed out by the 1-thread floor are taken back from the largest shares
+        largest = max(by_cost, key=threads.get)
+        if threads[largest] <= 1:
+            break
+        threads[largest] -= 1
+    return threads
+
+
+def _model_profiler(name: str, args: argparse.Namespace, output_dir: Path) -> StageProfiler | None:
+    """Per-model StageProfiler under --profile (pstats files <output>/profile/<model>.<stage>.pstats)."""
+    if not getattr(args, "profile", False):
+        return None
+    return StageProfiler(output_dir / PROFILE_DIR if getattr(args, "profile_pstats", False) else None, prefix=f"{name}.")
+
+
 def _train_single_model(
     name: str, df: pd.DataFrame, args: argparse.Namespace,
     output_dir: Path,
+    prepared: Tuple[pd.DataFrame, pd.Series, pd.DataFrame] | None = None,
+    warm_start: Tuple[Any, np.ndarray] | None = None,
+    clip_bounds: Dict[str, Dict[str, float]] | None = None,
+    threads: int | None = None,
 ) -> Tuple[str, Dict[str, Any] | None]:
-    """Train a single model (designed to run in parallel). Returns (name, improvement_entry) or (name, None) on skip/error."""
+    """Train a single model (designed to run in parallel). Returns (name, improvement_entry) or (name, None) on skip/error.
+
+    `prepared` passes an already prepared (X, y, aux); `warm_start` = (previous model, new-row mask)
+    continues boosting the previous model on the new rows instead of training from scratch.
+    `clip_bounds` (the bounds `prepared` was clipped with) are saved in the feature manifest.
+    `threads` caps the cores this model's XGBoost fits, tuning trials and walk-forward folds share.
+    `prepared` may be a SharedPrepared (--parallel workers), in which case `df` is not needed.
+    With --profile the entry gets per-stage `timings` (see StageProfiler).
+    """
+    started = time.perf_counter()
+    profiler = _model_profiler(name, args, output_dir)
+    if threads is not None:
+        _set_core_budget(threads)
     try:
         # Prepare features
-        if name == "signal_quality":
-            X, y = prepare_signal_quality_features(df)
-            label_filter = "label_profitable"
-        elif name == "position_sizing":
-            X, y = prepare_position_sizing_features(df)
-            label_filter = "label_rMultiple"
-        elif name == "tp_optimizer":
-            X, y = prepare_tp_features(df)
-            label_filter = "label_optimalTpLevel"
-        elif name == "sl_optimizer":
-            X, y = prepare_sl_features(df)
-            label_filter = "label_maxAdverseExcursion"
-        else:
-            return name, None
+        if isinstance(prepared, SharedPrepared):
+            prepared = prepared.load()
+        if prepared is None:
+            prepared = _prepare_model_data(name, df)
+            if prepared is None:
+                return name, None
+        X, y, df_sub = prepared
 
         if X.empty or len(X) < args.min_samples:
             logger.info("Skipping %s - insufficient samples (%d)", name, len(X))
             return name, None
+        # One float32 training matrix per model, reused by every fit/predict below
+        X = _contiguous_float32(X)
 
         logger.info("=" * 40)
         logger.info("Training %s (%d samples, %d features)", name, len(X), X.shape[1])
         logger.info("=" * 40)
 
         # Sample weights
-        df_sub = df[df[label_filter].notna()].copy()
         w = _compute_sample_weights(
             len(X),
             df_sub["asset"] if "asset" in df_sub.columns else None,
@@ -1617,71 +3973,162 @@ def _train_single_model(
             w = w / w.max()
 
         # Train or tune
-        tune = getattr(args, "tune_hyperparams", False)
-        if name == "signal_quality":
-            model = _tune_signal_quality(X, y, w) if tune else train_signal_quality_model(X, y, sample_weight=w)
-        elif name == "position_sizing":
-            model = _tune_position_sizing(X, y, w) if tune else train_position_sizing_model(X, y, sample_weight=w)
-        elif name == "tp_optimizer":
-            model = _tune_tp_optimizer(X, y, w) if tune else train_tp_optimizer_model(X, y, sample_weight=w)
-        elif name == "sl_optimizer":
-            model = _tune_sl_optimizer(X, y, w) if tune else train_sl_optimizer_model(X, y, sample_weight=w)
+        with _profiled(profiler, "train"):
+            tune = getattr(args, "tune_hyperparams", False)
+            tuning = _tuning_options(args, output_dir) if tune else None
+            tuning_stats = None
+            model = None
+            warm_start_stats = None
+            if warm_start is not None:
+                prev_model, new_mask = warm_start
+                model, warm_start_stats = warm_start_checked(
+                    name, prev_model, X, y, new_mask, sample_weight=w,
+                    min_new_rows=getattr(args, "warm_start_min_rows", INCREMENTAL_MIN_NEW_ROWS),
+                    max_rounds=getattr(args, "warm_start_max_rounds", INCREMENTAL_MAX_ROUNDS),
+                )
+                if model is not None:
+                    metric = warm_start_stats["metric"]
+                    logger.info("Warm-started %s to %d rounds: %s %.4f vs previous %.4f on %d held-out new rows", name,
+                                warm_start_stats["rounds"], metric, warm_start_stats["warm_started"][metric],
+                                warm_start_stats["previous"][metric], warm_start_stats["check_rows"])
+                else:
+                    logger.info("Not warm-starting %s (%s); full retrain", name, warm_start_stats["reason"])
+            if model is None:
+                model, tuning_stats = tune_model(name, X, y, w, tuning=tuning) if tune else (None, None)
+                if model is None:
+                    model = MODEL_TRAINERS[name](X, y, sample_weight=w)
 
         entry: Dict[str, Any] = {
             "feature_importances": dict(zip(X.columns.tolist(), [float(x) for x in model.feature_importances_])),
             "feature_names": X.columns.tolist(),
         }
-
-        # Export ONNX + feature manifest + hash
-        onnx_path = str(output_dir / f"{name}.onnx")
-        onnx_ok = export_to_onnx(model, X.iloc[:1], onnx_path, name)
-        entry["onnx_exported"] = onnx_ok
-        if onnx_ok:
-            save_feature_manifest(X.columns.tolist(), str(output_dir / f"{name}_features.json"), name)
-            onnx_hash = compute_onnx_hash(onnx_path)
-            if onnx_hash:
-                entry["onnx_sha256"] = onnx_hash
-        save_joblib_backup(model, str(output_dir / f"{name}.joblib"), name)
-
-        # Model factory for holdout (trains fresh model on train split — no leakage)
-        def _make_model_factory():
-            """Create a factory that produces an untrained model with same hyperparams."""
-            params = model.get_params()
-            cls = type(model)
-            def factory():
-                return cls(**params)
-            return factory
-
-        factory = _make_model_factory()
-
-        # Holdout metrics (fresh model on train split only — no leakage)
-        entry["holdout_metrics"] = _holdout_metrics(factory, X, y, name, sample_weight=w)
+        if tuning_stats is not None:
+            entry["tuning"] = tuning_stats
+        if warm_start_stats is not None:
+            entry["warm_start"] = warm_start_stats
+
+        # Export ONNX + feature manifest + hash into the staging directory; main() promotes them
+        with _profiled(profiler, "export"):
+            staged = _staging_dir(output_dir, name)
+            onnx_path = str(staged / f"{name}.onnx")
+            converter = getattr(args, "onnx_converter", "native")
+            native_export = getattr(args, "native_export", True)
+            tree_arrays = None
+            if converter == "native" or native_export:
+                try:
+                    tree_arrays = TreeArrays.from_booster(model)
+                except Exception as e:
+                    logger.info("Cannot flatten %s trees (%s)", name, e)
+            onnx_ok = export_to_onnx(model, X.iloc[:1], onnx_path, name, converter=converter, tree_arrays=tree_arrays)
+            # Parity on the time-split holdout rows (the last walk-forward fold; all rows when there are too few)
+            plan = FoldEvaluator.fold_plan(len(X), getattr(args, "wf_splits", 5), purge_gap=getattr(args, "wf_purge_gap", 2))
+            holdout = X.iloc[plan[-1][2]:] if plan else X
+            max_rows = getattr(args, "onnx_parity_rows", ONNX_PARITY_ROWS)
+            holdout = holdout.iloc[-max_rows:] if max_rows > 0 else holdout
+            if onnx_ok:
+                parity = check_onnx_parity(
+                    onnx_path, model, holdout, name, tolerance=getattr(args, "onnx_parity_tolerance", ONNX_PARITY_TOLERANCE),
+                )
+                if parity is not None:
+                    entry["onnx_parity"] = parity
+                    # Never ship a graph that disagrees with the booster
+                    onnx_ok = parity["passed"]
+            entry["onnx_exported"] = onnx_ok
+            if onnx_export_available(converter) and not onnx_ok:
+                logger.warning("%s: ONNX export failed or was rejected; keeping the previously deployed %s files", name, name)
+                discard_staged_artifacts(staged)
+            else:
+                if onnx_ok and getattr(args, "onnx_optimize", False):
+                    optimization = optimize_onnx_model(
+                        model, onnx_path, X, name, staged / ONNX_VARIANTS_DIR,
+                        tolerance=getattr(args, "onnx_variant_tolerance", ONNX_VARIANT_TOLERANCE), holdout=holdout,
+                    )
+                    if optimization:
+                        entry["onnx_optimization"] = optimization
+                if onnx_ok:
+                    save_feature_manifest(
+                        X.columns.tolist(), str(staged / f"{name}_features.json"), name, clip_bounds=clip_bounds,
+                        lag_windows=getattr(args, "lag_windows", LAG_WINDOWS), lag_time_windows=getattr(args, "lag_time_windows", LAG_TIME_WINDOWS),
+                    )
+                    onnx_hash = compute_onnx_hash(onnx_path)
+                    if onnx_hash:
+                        entry["onnx_sha256"] = onnx_hash
+                save_joblib_backup(model, str(staged / f"{name}.joblib"), name)
+                if native_export:
+                    native = save_native_model(
+                        model, staged, name, holdout=holdout, tree_arrays=tree_arrays,
+                        tolerance=getattr(args, "onnx_parity_tolerance", ONNX_PARITY_TOLERANCE),
+                    )
+                    if native:
+                        entry["native_export"] = native
+                entry["staged_dir"] = str(staged)
+
+        # Holdout + walk-forward (CV) metrics from one shared set of time-ordered fits (each fit sees only
+        # rows before its test window; the deployed model is never scored on its own training rows)
+        with _profiled(profiler, "evaluation"):
+            holdout, wf = FoldEvaluator(
+                name, X, y, sample_weight=w, n_splits=getattr(args, "wf_splits", 5),
+                purge_gap=getattr(args, "wf_purge_gap", 2), jobs=_resolve_jobs(getattr(args, "wf_jobs", 0)),
+            ).evaluate(model)
+            entry["holdout_metrics"] = holdout
+            if wf:
+                entry["walk_forward"] = wf
 
         # SHAP analysis
-        shap_result = _shap_analysis(model, X, name)
-        if shap_result:
-            entry["shap"] = shap_result
-
-        # Walk-forward validation
-        wf = _walk_forward_validation(X, y, factory)
-        if wf:
-            entry["walk_forward"] = wf
+        with _profiled(profiler, "shap"):
+            shap_result = _shap_analysis(model, X, name)
+            if shap_result:
+                entry["shap"] = shap_result
 
         # Signal quality extras
         if name == "signal_quality":
-            entry["suggested_threshold"] = _suggest_signal_quality_threshold(model, X, y)
-            calibration = _platt_calibration(model, X, y)
+            with _profiled(profiler, "calibration"):
+                entry["suggested_threshold"] = _suggest_signal_quality_threshold(model, X, y)
+                calibration = _platt_calibration(model, X, y)
             if calibration:
                 entry["signal_quality_calibration"] = calibration
                 logger.info("Platt calibration: scale=%.4f, intercept=%.4f", calibration["scale"], calibration["intercept"])
 
+        entry["wall_clock_sec"] = round(time.perf_counter() - started, 3)
+        if threads is not None:
+            entry["threads"] = threads
+        if profiler is not None:
+            entry["timings"] = profiler.stages
+        logger.info("%s trained in %.1fs", name, entry["wall_clock_sec"])
         return name, entry
 
     except Exception as e:
         logger.error("Error training %s: %s", name, e, exc_info=True)
+        discard_staged_artifacts(output_dir / STAGING_DIR / name)
         return name, None
 
 
+def _apply_bench_filter(df: pd.DataFrame, args: argparse.Namespace, log: bool = True) -> Tuple[pd.DataFrame, bool]:
+    """Optional VinceBench filter (--min-bench-score / --bench-score-quantile). Returns (df, filter_used)."""
+    bench_filter_used = False
+    if "label_benchScore" in df.columns:
+        min_bench = getattr(args, "min_bench_score", None)
+        quantile = getattr(args, "bench_score_quantile", None)
+        if min_bench is not None:
+            before = len(df)
+            df = df[df["label_benchScore"].fillna(-np.inf) >= min_bench].copy()
+            dropped = before - len(df)
+            if log:
+                logger.info("VinceBench filter (--min-bench-score=%.2f): dropped %d rows, %d remaining", min_bench, dropped, len(df))
+            bench_filter_used = True
+        elif quantile is not None and 0 < quantile < 1:
+            threshold = float(df["label_benchScore"].quantile(quantile))
+            before = len(df)
+            df = df[df["label_benchScore"].fillna(-np.inf) >= threshold].copy()
+            dropped = before - len(df)
+            if log:
+                logger.info("VinceBench filter (--bench-score-quantile=%.2f, threshold=%.2f): dropped %d rows, %d remaining", quantile, threshold, dropped, len(df))
+            bench_filter_used = True
+    elif log and (getattr(args, "min_bench_score", None) is not None or getattr(args, "bench_score_quantile", None) is not None):
+        logger.warning("--min-bench-score/--bench-score-quantile set but label_benchScore not in data; skipping filter")
+    return df, bench_filter_used
+
+
 def main():
     parser = argparse.ArgumentParser(description="Train VINCE ML models")
     parser.add_argument("--data", type=str, required=True, help="Path to features.jsonl or directory of features_*.jsonl (e.g. .elizadb/vince-paper-bot/features)")
@@ -1691,17 +4138,65 @@ def main():
     parser.add_argument("--recency-decay", type=float, default=0.0, help="Recency sample weight decay (e.g. 0.01 upweights recent rows); 0 = off")
     parser.add_argument("--balance-assets", action="store_true", help="Balance sample weights by asset so one symbol does not dominate")
     parser.add_argument("--tune-hyperparams", action="store_true", help="Run hyperparameter tuning: Optuna (if installed) or GridSearchCV fallback with TimeSeriesSplit (slower)")
-    parser.add_argument("--optuna-trials", type=int, default=50, help="Number of Optuna trials when --tune-hyperparams is used (default 50)")
+    parser.add_argument("--optuna-trials", type=int, default=None, help="Optuna trials per model when --tune-hyperparams is used (default 50, from TUNER_SPECS)")
+    parser.add_argument("--tune-timeout", type=float, default=None, help="Wall-clock budget in seconds per model for Optuna tuning; no new trials start after it (default unbounded)")
+    parser.add_argument("--tune-jobs", type=int, default=0, help="Optuna trials run in parallel threads (0 = all cores; forced to 1 when CI=true or VINCE_TRAIN_NJOBS=1)")
+    parser.add_argument("--tune-pruner", choices=OPTUNA_PRUNERS, default=None, help="Prune Optuna trials after each CV fold (or fidelity rung): median of earlier trials, successive halving (ASHA), hyperband, or none (default median; halving with --tune-fidelity multi)")
+    parser.add_argument("--tune-fidelity", choices=["full", "multi"], default="full", help="multi: score Optuna candidates on 1/9 then 1/3 of the most recent rows and trees before promoting survivors to the full budget (default full)")
+    parser.add_argument("--tune-storage", type=str, default=None, help=f"SQLite file persisting Optuna studies so tuning resumes and warm-starts across retrains (default <output>/{OPTUNA_STORAGE_FILE}; 'none' = in-memory)")
+    parser.add_argument("--wf-splits", type=int, default=5, help="Walk-forward folds per model; the last one is the holdout (default 5)")
+    parser.add_argument("--wf-purge-gap", type=int, default=2, help="Rows skipped between each walk-forward fold's training rows and its test rows (default 2)")
+    parser.add_argument("--wf-jobs", type=int, default=0, help="Walk-forward folds fitted in parallel threads, cores split between them (0 = all cores; forced to 1 when CI=true or VINCE_TRAIN_NJOBS=1)")
     parser.add_argument("--real-only", dest="real_only", action="store_true", help="Load only features_*.jsonl and combined.jsonl; exclude synthetic_*.jsonl (use for production when you have enough real trades)")
     parser.add_argument("--parallel", action="store_true", help="Train models in parallel using concurrent.futures (faster on multi-core)")
+    parser.add_argument("--no-feature-cache", dest="feature_cache", action="store_false", help="Re-parse all JSONL instead of reusing the columnar cache (<data dir>/.feature_cache, needs pyarrow)")
+    parser.add_argument("--feature-cache-dir", type=str, default=None, help="Override the feature cache directory (default <data dir>/.feature_cache)")
+    parser.add_argument("--load-workers", type=int, default=0, help="Processes for parallel JSONL parsing (0 = all cores; forced to 1 when CI=true or VINCE_TRAIN_NJOBS=1)")
+    parser.add_argument("--load-chunk-size", type=int, default=LOAD_CHUNK_SIZE, help=f"Records flattened per chunk while loading JSONL; bounds loader peak memory (default {LOAD_CHUNK_SIZE})")
+    parser.add_argument("--json-backend", choices=["auto", "orjson", "msgspec", "json"], default=None, help="JSON decoder for loading (default $VINCE_JSON_BACKEND or auto = fastest installed)")
+    parser.add_argument("--lag-windows", type=str, default=",".join(map(str, LAG_WINDOWS)), help="Comma-separated prior-trade lags per asset (default 1,2,3); their mean is added as _roll{k} for lags 1..k, else _roll_lags{a}_{b}... (recorded under lag_features in each feature manifest)")
+    parser.add_argument("--lag-time-windows", type=str, default=",".join(LAG_TIME_WINDOWS), help="Comma-separated time windows for per-asset rolling means over prior trades, e.g. 6h,1d (default none)")
+    parser.add_argument("--incremental", action="store_true", help=f"Only load rows appended since the last --incremental run (high-water mark in {INCREMENTAL_STATE_FILE}), append them to the cached prepared features and warm-start the previous *.joblib models; full rebuild when the feature manifest changes")
+    parser.add_argument("--warm-start-min-rows", type=int, default=INCREMENTAL_MIN_NEW_ROWS, help=f"--incremental: retrain a model from scratch instead of warm-starting it when it has fewer new labeled rows than this (default {INCREMENTAL_MIN_NEW_ROWS})")
+    parser.add_argument("--warm-start-max-rounds", type=int, default=INCREMENTAL_MAX_ROUNDS, help=f"--incremental: retrain a model from scratch once warm starts would grow it past this many boosting rounds (default {INCREMENTAL_MAX_ROUNDS}; each warm start adds {INCREMENTAL_BOOST_ROUNDS})")
+    parser.add_argument("--profile", action="store_true", help="Record wall time, CPU time and peak RSS per pipeline stage and per model under timings in training_metadata.json")
+    parser.add_argument("--profile-pstats", action="store_true", help=f"With --profile (implied), also dump a cProfile .pstats file per stage to <output>/{PROFILE_DIR}/")
+    parser.add_argument("--no-onnx-bench", dest="onnx_bench", action="store_false", help="Skip the post-export ONNX latency benchmark (p50/p95/p99 at batch sizes 1, 8, 64, 1024 and load time in training_metadata.json)")
+    parser.add_argument("--onnx-bench-runs", type=int, default=ONNX_BENCH_RUNS, help=f"Timed session.run calls per batch size in the ONNX latency benchmark (default {ONNX_BENCH_RUNS}; fewer for slow batches)")
+    parser.add_argument("--onnx-latency-tolerance", type=float, default=ONNX_LATENCY_TOLERANCE, help=f"Flag a latency regression when a new model's p50 at any batch size exceeds the previous {{name}}.onnx by this factor (default {ONNX_LATENCY_TOLERANCE})")
+    parser.add_argument("--reject-latency-regressions", action="store_true", help="Keep the previously deployed files of a model whose new export is a latency regression (it is left out of models_trained and listed in onnx_latency_rejected); by default regressions are only reported")
+    parser.add_argument("--onnx-converter", choices=ONNX_CONVERTERS, default="native", help="How models become ONNX: native builds the TreeEnsemble graph directly from the booster's trees (falls back to onnxmltools when it cannot), onnxmltools always converts with onnxmltools (default native)")
+    parser.add_argument("--no-native-export", dest="native_export", action="store_false", help=f"Skip the native artifacts for non-ONNX consumers: <model>{NATIVE_MODEL_SUFFIX} (XGBoost UBJSON) and <model>{TREE_ARRAYS_SUFFIX} (flat tree arrays for TreeArrays.load)")
+    parser.add_argument("--onnx-parity-tolerance", type=float, default=ONNX_PARITY_TOLERANCE, help=f"Fail a model's ONNX export when its outputs differ from the XGBoost probabilities/predictions on the holdout rows by more than this (default {ONNX_PARITY_TOLERANCE})")
+    parser.add_argument("--onnx-parity-rows", type=int, default=ONNX_PARITY_ROWS, help=f"Most recent holdout rows scored by the ONNX parity check (default {ONNX_PARITY_ROWS}; 0 = whole holdout)")
+    parser.add_argument("--onnx-bundle", action="store_true", help=f"Also write {ONNX_BUNDLE_FILE}: all exported models in one graph with one union-feature input (raw values; per-model column gathers and clipping in-graph) and one output per model, described by {ONNX_BUNDLE_MANIFEST}")
+    parser.add_argument("--onnx-optimize", action="store_true", help=f"After export, write onnxruntime-optimized and pruned (fewer boosting rounds) variants to the model's staging directory, check each against the XGBoost predictions and promote the smallest, fastest passing one to {{name}}.onnx")
+    parser.add_argument("--onnx-variant-tolerance", type=float, default=ONNX_VARIANT_TOLERANCE, help=f"Max absolute difference from the XGBoost probabilities/predictions for an --onnx-optimize variant to pass (default {ONNX_VARIANT_TOLERANCE})")
     parser.add_argument("--bench-score-weight", action="store_true", help="Upweight samples by VinceBench per-decision score (label_benchScore); use with signal_quality")
     parser.add_argument("--min-bench-score", type=float, default=None, help="Train only on rows with label_benchScore >= this value (optional filter)")
     parser.add_argument("--bench-score-quantile", type=float, default=None, help="Train only on rows with label_benchScore >= this quantile (e.g. 0.5 for median); 0-1")
     args = parser.parse_args()
+    try:
+        args.lag_windows = sorted({int(w) for w in args.lag_windows.split(",") if w.strip()})
+        args.lag_time_windows = {w.strip().lower(): parse_time_window(w) for w in args.lag_time_windows.split(",") if w.strip()}
+    except ValueError as e:
+        parser.error(f"--lag-windows/--lag-time-windows: {e}")
+    if any(w <= 0 for w in args.lag_windows):
+        parser.error("--lag-windows must be positive integers")
+    if args.wf_splits < 2 or args.wf_purge_gap < 0:
+        parser.error("--wf-splits must be >= 2 and --wf-purge-gap >= 0")
+    if args.onnx_bench_runs < 1 or args.onnx_latency_tolerance <= 0:
+        parser.error("--onnx-bench-runs must be >= 1 and --onnx-latency-tolerance > 0")
+    if args.reject_latency_regressions and not args.onnx_bench:
+        parser.error("--reject-latency-regressions needs the latency benchmark (drop --no-onnx-bench)")
+    if args.onnx_variant_tolerance < 0 or args.onnx_parity_tolerance < 0 or args.onnx_parity_rows < 0:
+        parser.error("--onnx-variant-tolerance, --onnx-parity-tolerance and --onnx-parity-rows must be >= 0")
 
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
     setup_logging_to_file(output_dir, verbose=args.verbose)
+    args.profile = args.profile or args.profile_pstats
+    profiler = StageProfiler(output_dir / PROFILE_DIR if args.profile_pstats else None) if args.profile else None
 
     logger.info("=" * 60)
     logger.info("VINCE ML Model Training")
@@ -1711,7 +4206,48 @@ def main():
         logger.info("Real-only: excluding synthetic_*.jsonl (production mode)")
     logger.info("=" * 60)
 
-    df = load_features(args.data, real_only=getattr(args, "real_only", False))
+    logger.info("JSON backend: %s", set_json_backend(getattr(args, "json_backend", None)))
+    chunk_size = getattr(args, "load_chunk_size", LOAD_CHUNK_SIZE)
+    incremental = getattr(args, "incremental", False)
+    paths = _jsonl_paths(args.data, real_only=getattr(args, "real_only", False))
+    state = marks = delta = None
+    if incremental:
+        if getattr(args, "bench_score_quantile", None) is not None:
+            logger.info("Incremental: --bench-score-quantile depends on all rows; full rebuild")
+        else:
+            state = _load_incremental_state(output_dir, _incremental_options(args))
+    if state is not None:
+        with _profiled(profiler, "load"):
+            loaded = _load_jsonl_since(paths, state["marks"], chunk_size=chunk_size)
+        if loaded is None:
+            state = None
+        else:
+            new_rows, marks = loaded
+            if new_rows.empty:
+                logger.info("Incremental: no new feature rows since %s; models unchanged", state["trained_at"])
+                return
+            # Rows appended after the saved tail only reach back into it; backfilled rows lag against all rows
+            context = state["tail"]
+            if "timestamp" in new_rows.columns and new_rows["timestamp"].min() < context["timestamp"].max():
+                context = state["frame"]
+            with _profiled(profiler, "lag_features"):
+                delta = _extend_lagged_frame(context, new_rows, args.lag_windows, args.lag_time_windows)
+                df = _concat_chunks([state["frame"], delta])
+                df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+    if state is None:
+        if incremental:
+            marks = {os.path.abspath(p): _jsonl_high_water_mark(p) for p in paths}
+        with _profiled(profiler, "load"):
+            df = load_features(
+                args.data, real_only=getattr(args, "real_only", False),
+                chunk_size=chunk_size,
+                use_cache=getattr(args, "feature_cache", True),
+                cache_dir=getattr(args, "feature_cache_dir", None),
+                workers=_resolve_jobs(getattr(args, "load_workers", 0)),
+            )
+        if incremental and marks != {os.path.abspath(p): _jsonl_high_water_mark(p) for p in paths}:
+            logger.warning("Incremental: source files changed while loading; state not saved, next run rebuilds")
+            marks = None
     if df.empty:
         logger.warning("No data loaded. Exiting.")
         return
@@ -1750,30 +4286,20 @@ def main():
         return
 
     logger.info("Training on %d completed trades", trades_with_outcome)
+    if not incremental:
+        # This run replaces the models; later --incremental runs must not warm-start them from stale marks
+        _clear_incremental_state(output_dir)
 
-    # Add lag features (temporal context from prior trades)
-    df = add_lag_features(df)
+    # Add lag features (temporal context from prior trades); incremental runs only lagged the new rows
+    if delta is None:
+        with _profiled(profiler, "lag_features"):
+            df = add_lag_features(df, args.lag_windows, args.lag_time_windows)
+    lagged_frame, lagged_delta = df, delta
 
     # Optional VinceBench filter: train only on high-quality decisions
-    bench_filter_used = False
-    if "label_benchScore" in df.columns:
-        min_bench = getattr(args, "min_bench_score", None)
-        quantile = getattr(args, "bench_score_quantile", None)
-        if min_bench is not None:
-            before = len(df)
-            df = df[df["label_benchScore"].fillna(-np.inf) >= min_bench].copy()
-            dropped = before - len(df)
-            logger.info("VinceBench filter (--min-bench-score=%.2f): dropped %d rows, %d remaining", min_bench, dropped, len(df))
-            bench_filter_used = True
-        elif quantile is not None and 0 < quantile < 1:
-            threshold = float(df["label_benchScore"].quantile(quantile))
-            before = len(df)
-            df = df[df["label_benchScore"].fillna(-np.inf) >= threshold].copy()
-            dropped = before - len(df)
-            logger.info("VinceBench filter (--bench-score-quantile=%.2f, threshold=%.2f): dropped %d rows, %d remaining", quantile, threshold, dropped, len(df))
-            bench_filter_used = True
-    elif getattr(args, "min_bench_score", None) is not None or getattr(args, "bench_score_quantile", None) is not None:
-        logger.warning("--min-bench-score/--bench-score-quantile set but label_benchScore not in data; skipping filter")
+    df, bench_filter_used = _apply_bench_filter(df, args)
+    if delta is not None:
+        delta, _ = _apply_bench_filter(delta, args, log=False)
 
     bench_weight_enabled = getattr(args, "bench_score_weight", False)
     bench_score_used = bench_filter_used or bench_weight_enabled
@@ -1781,29 +4307,155 @@ def main():
     model_names = ["signal_quality", "position_sizing", "tp_optimizer", "sl_optimizer"]
     improvement_entries: Dict[str, Dict[str, Any]] = {}
 
+    # Incremental: prepare only the new rows and append them to the cached matrices
+    prepared: Dict[str, Tuple[pd.DataFrame, pd.Series, pd.DataFrame]] = {}
+    new_masks: Dict[str, np.ndarray] = {}
+    warm_starts: Dict[str, Tuple[Any, np.ndarray]] = {}
+    clip_bounds: Dict[str, Dict[str, Dict[str, float]]] = {}
+    if state is not None:
+        with _profiled(profiler, "prepare_features"):
+            fresh_by_model = _prepare_models_data(
+                model_names, delta, clip_bounds={name: state["clip_bounds"].get(name, {}) for name in model_names},
+            )
+        for name in model_names:
+            cached = state["prepared"].get(name)
+            fresh = fresh_by_model[name]
+            merged = _merge_prepared(cached, fresh) if cached is not None and fresh is not None else None
+            if merged is None:
+                logger.info("Incremental: %s feature manifest changed; full rebuild of prepared features", name)
+                prepared, new_masks, warm_starts, clip_bounds = {}, {}, {}, {}
+                state = None
+                break
+            prepared[name], new_mask = merged
+            new_masks[name] = new_mask
+            clip_bounds[name] = state["clip_bounds"].get(name, {})
+            joblib_path = output_dir / f"{name}.joblib"
+            if joblib_path.is_file():
+                warm_starts[name] = (joblib.load(joblib_path), new_mask)
+    if not prepared:
+        # Clip bounds are fitted once per distinct labeled-row set and shared by the models using it.
+        clip_cache: Dict[str, Dict[str, Dict[str, float]]] = {}
+        with _profiled(profiler, "clip_bounds"):
+            clip_bounds = {name: _model_clip_bounds(name, df, clip_cache) for name in model_names}
+        with _profiled(profiler, "prepare_features"):
+            prepared = _prepare_models_data(model_names, df, clip_bounds=clip_bounds)
+        logger.info("Clip bounds fitted %d time(s) for %d models", len(clip_cache), len(model_names))
+
+    # Latency of the currently deployed models, measured before training; the staged exports are benchmarked
+    # against these after training, before promotion (both in this process, with no training running alongside).
+    onnx_bench = ONNX_AVAILABLE and getattr(args, "onnx_bench", True)
+    onnx_bench_runs = getattr(args, "onnx_bench_runs", ONNX_BENCH_RUNS)
+    onnx_baselines: Dict[str, Dict[str, Any]] = {}
+    if onnx_bench:
+        with _profiled(profiler, "onnx_baseline"):
+            for name in model_names:
+                onnx_path = output_dir / f"{name}.onnx"
+                if onnx_path.is_file() and prepared.get(name) is not None:
+                    baseline = benchmark_onnx_model(str(onnx_path), prepared[name][0], name, runs=onnx_bench_runs)
+                    if baseline is not None:
+                        onnx_baselines[name] = baseline
+
     # Train all 4 models (optionally in parallel)
-    if getattr(args, "parallel", False):
-        logger.info("Training models in parallel...")
-        with concurrent.futures.ProcessPoolExecutor(max_workers=4) as pool:
-            futures = {
-                pool.submit(_train_single_model, name, df, args, output_dir): name
-                for name in model_names
-            }
-            for future in concurrent.futures.as_completed(futures):
-                name, entry = future.result()
+    with _profiled(profiler, "train_models", pstats=False):
+        if getattr(args, "parallel", False):
+            # Cores are split between the model processes by expected cost; each process caps its XGBoost
+            # threads, tuning trials, walk-forward folds and GridSearchCV jobs to its share.
+            cores = _resolve_jobs(0)
+            costs = {name: _model_cost(name, prepared.get(name), args) for name in model_names}
+            schedule = _schedule_model_threads(costs, cores)
+            logger.info("Training models in parallel on %d cores: %s", cores,
+                        ", ".join(f"{name}={schedule[name]}" for name in model_names))
+            # Prepared matrices go to the workers as memory-mapped files; df itself is only sent when a model
+            # still has to prepare its own features.
+            with tempfile.TemporaryDirectory(prefix="vince-train-") as shared_dir, \
+                    concurrent.futures.ProcessPoolExecutor(max_workers=min(len(model_names), cores)) as pool:
+                shared = {
+                    name: SharedPrepared(Path(shared_dir), name, prepared[name])
+                    for name in model_names if prepared.get(name) is not None
+                }
+                futures = {
+                    pool.submit(
+                        _train_single_model, name, df if name not in shared else None, args, output_dir,
+                        shared.get(name), warm_starts.get(name), clip_bounds.get(name), schedule[name],
+                    ): name
+                    for name in sorted(model_names, key=costs.get, reverse=True)
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    name, entry = future.result()
+                    if entry is not None:
+                        improvement_entries[name] = entry
+        else:
+            for name in model_names:
+                _, entry = _train_single_model(name, df, args, output_dir, prepared.get(name), warm_starts.get(name), clip_bounds.get(name))
                 if entry is not None:
                     improvement_entries[name] = entry
-    else:
-        for name in model_names:
-            _, entry = _train_single_model(name, df, args, output_dir)
-            if entry is not None:
-                improvement_entries[name] = entry
+
+    # Latency of each staged export vs the deployed model, measured before promotion so a slower model can be
+    # held back (--reject-latency-regressions) instead of only being reported.
+    onnx_latency: Dict[str, Dict[str, Any]] = {}
+    latency_rejected: List[str] = []
+    if onnx_bench:
+        with _profiled(profiler, "onnx_benchmark"):
+            for name in model_names:
+                entry = improvement_entries.get(name, {})
+                if not entry.get("onnx_exported") or entry.get("staged_dir") is None or prepared.get(name) is None:
+                    continue
+                candidate = Path(entry["staged_dir"]) / f"{name}.onnx"
+                latency = benchmark_onnx_model(str(candidate), prepared[name][0], name, runs=onnx_bench_runs)
+                if latency is None:
+                    continue
+                if name in onnx_baselines:
+                    latency.update(compare_onnx_latency(latency, onnx_baselines[name], getattr(args, "onnx_latency_tolerance", ONNX_LATENCY_TOLERANCE)))
+                    if latency["regression"]:
+                        logger.warning("ONNX latency regression for %s: p50 vs previous model %s", name,
+                                       ", ".join(f"batch {b}: {latency['p50_ratio'][b]:.2f}x" for b in latency["slower_batches"]))
+                        if getattr(args, "reject_latency_regressions", False):
+                            logger.warning("Keeping the previously deployed %s files (--reject-latency-regressions)", name)
+                            discard_staged_artifacts(Path(entry.pop("staged_dir")))
+                            entry["onnx_exported"] = False
+                            entry.pop("onnx_sha256", None)
+                            latency_rejected.append(name)
+                onnx_latency[name] = latency
+                logger.info("ONNX latency %s: load %.1f ms, p50 %s", name, latency["load_ms"],
+                            ", ".join(f"{b}={v['p50_ms']:.3f}ms" for b, v in latency["batches"].items()))
+
+    # Move each model's staged artifacts over the deployed ones
+    for name in model_names:
+        staged = improvement_entries.get(name, {}).pop("staged_dir", None)
+        if staged is not None:
+            logger.info("Promoted %s: %s", name, ", ".join(promote_staged_artifacts(output_dir, Path(staged))))
 
     # Collect results
     models_fit = [n for n in model_names if n in improvement_entries]
     models_trained = [n for n in models_fit if improvement_entries[n].get("onnx_exported")]
 
-    improvement_report = build_improvement_report(df, improvement_entries) if improvement_entries else {}
+    onnx_bundle = None
+    if getattr(args, "onnx_bundle", False) and ONNX_AVAILABLE:
+        with _profiled(profiler, "onnx_bundle"):
+            onnx_bundle = export_onnx_bundle(
+                output_dir, models_trained, prepared, clip_bounds,
+                tolerance=getattr(args, "onnx_parity_tolerance", ONNX_PARITY_TOLERANCE),
+            )
+            if onnx_bench and onnx_bundle and onnx_bundle["written"]:
+                with open(onnx_bundle["manifest"]) as f:
+                    bundle_manifest = json.load(f)
+                latency = benchmark_onnx_model(
+                    onnx_bundle["path"], _bundle_sample_rows(bundle_manifest["models"], prepared, bundle_manifest["features"]),
+                    "bundle", runs=onnx_bench_runs,
+                )
+                if latency is not None and all(n in onnx_latency for n in onnx_bundle["models"]):
+                    # What the four separate session runs cost per batch, for comparison
+                    latency["separate_p50_sum_ms"] = {
+                        b: round(sum(onnx_latency[n]["batches"][b]["p50_ms"] for n in onnx_bundle["models"]), 4)
+                        for b in latency["batches"]
+                    }
+                if latency is not None:
+                    onnx_bundle["latency"] = latency
+                    logger.info("ONNX latency bundle: load %.1f ms, p50 %s", latency["load_ms"],
+                                ", ".join(f"{b}={v['p50_ms']:.3f}ms" for b, v in latency["batches"].items()))
+
+    with _profiled(profiler, "report"):
+        improvement_report = build_improvement_report(df, improvement_entries) if improvement_entries else {}
     if improvement_entries.get("signal_quality", {}).get("signal_quality_calibration"):
         improvement_report["signal_quality_calibration"] = improvement_entries["signal_quality"]["signal_quality_calibration"]
     if bench_score_used:
@@ -1824,8 +4476,18 @@ def main():
         "models_trained": models_trained,
         "models_fit": models_fit,
         "onnx_hashes": onnx_hashes,
+        "model_wall_clock_sec": {n: e["wall_clock_sec"] for n, e in improvement_entries.items() if "wall_clock_sec" in e},
         "improvement_report": improvement_report,
     }
+    if onnx_latency:
+        metadata["onnx_latency"] = onnx_latency
+        regressions = sorted(n for n, v in onnx_latency.items() if v.get("regression"))
+        if onnx_baselines:
+            metadata["onnx_latency_regressions"] = regressions
+        if getattr(args, "reject_latency_regressions", False):
+            metadata["onnx_latency_rejected"] = latency_rejected
+    if getattr(args, "parallel", False):
+        metadata["parallel_threads"] = {n: e["threads"] for n, e in improvement_entries.items() if "threads" in e}
     if bench_score_used:
         metadata["bench_score_used"] = True
         metadata["bench_score_weight_enabled"] = bench_weight_enabled
@@ -1833,15 +4495,68 @@ def main():
             metadata["min_bench_score"] = args.min_bench_score
         if getattr(args, "bench_score_quantile", None) is not None:
             metadata["bench_score_quantile"] = args.bench_score_quantile
+    if incremental:
+        metadata["incremental"] = {
+            "mode": "delta" if state is not None else "full",
+            "new_records": int(len(delta)) if state is not None else int(len(lagged_frame)),
+            "warm_started": sorted(n for n, e in improvement_entries.items() if e.get("warm_start", {}).get("accepted")),
+            "warm_start_checks": {n: e["warm_start"] for n, e in improvement_entries.items() if e.get("warm_start")},
+            "high_water_mark": marks,
+        }
+    if onnx_bundle:
+        metadata["onnx_bundle"] = onnx_bundle
+    onnx_parity = {n: e["onnx_parity"] for n, e in improvement_entries.items() if e.get("onnx_parity")}
+    if onnx_parity:
+        metadata["onnx_parity"] = onnx_parity
+        failed = sorted(n for n, p in onnx_parity.items() if not p["passed"])
+        if failed:
+            metadata["onnx_parity_failed"] = failed
+    onnx_optimization = {n: e["onnx_optimization"] for n, e in improvement_entries.items() if e.get("onnx_optimization")}
+    if onnx_optimization:
+        metadata["onnx_optimization"] = onnx_optimization
+    native_models = {n: e["native_export"] for n, e in improvement_entries.items() if e.get("native_export")}
+    if native_models:
+        metadata["native_models"] = native_models
+    tuning_stats = {n: e["tuning"] for n, e in improvement_entries.items() if e.get("tuning")}
+    if tuning_stats:
+        metadata["tuning"] = tuning_stats
     if improvement_entries.get("signal_quality", {}).get("feature_importances"):
         metadata["signal_quality_input_dim"] = len(improvement_entries["signal_quality"]["feature_importances"])
     if improvement_entries.get("signal_quality", {}).get("feature_names"):
         metadata["signal_quality_feature_names"] = improvement_entries["signal_quality"]["feature_names"]
     with open(output_dir / "training_metadata.json", "w") as f:
         json.dump(metadata, f, indent=2)
-
     if improvement_report:
-        write_improvement_report_md(improvement_report, output_dir / "improvement_report.md")
+        with _profiled(profiler, "report"):
+            write_improvement_report_md(improvement_report, output_dir / "improvement_report.md")
+    if incremental and marks is not None:
+        with _profiled(profiler, "save_state"):
+            kept = {n: p for n, p in prepared.items() if p is not None}
+            # A delta run appends its own rows as one segment; a full build (or too many segments) writes all rows
+            append = state is not None and len(state["segments"]) < INCREMENTAL_MAX_SEGMENTS
+            rows = {
+                "frame": lagged_delta if append else lagged_frame,
+                "prepared": {n: tuple(part[new_masks[n]] for part in p) for n, p in kept.items()} if append else kept,
+            }
+            _save_incremental_state(output_dir, {
+                "options": _incremental_options(args),
+                "trained_at": metadata["trained_at"],
+                "marks": marks,
+                "tail": _lag_context(lagged_frame, args.lag_windows, args.lag_time_windows),
+                "clip_bounds": clip_bounds,
+                "models": _model_digests(output_dir, model_names),
+            }, rows, segments=state["segments"] if append else None)
+    if profiler is not None:
+        metadata["timings"] = {
+            "stages": profiler.stages,
+            "models": {n: e["timings"] for n, e in improvement_entries.items() if e.get("timings")},
+        }
+        if args.profile_pstats:
+            metadata["timings"]["pstats_dir"] = str(output_dir / PROFILE_DIR)
+        logger.info("Stage timings (wall s): %s", ", ".join(f"{k}={v['wall_sec']:.2f}" for k, v in profiler.stages.items()))
+        # Rewritten so the timings cover the report and state writes above
+        with open(output_dir / "training_metadata.json", "w") as f:
+            json.dump(metadata, f, indent=2)
 
     logger.info("=" * 60)
     logger.info("Training complete. Output: %s", output_dir)
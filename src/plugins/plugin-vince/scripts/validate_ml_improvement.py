@@ -32,7 +32,7 @@ except ImportError:
 
 # Reuse train_models loader
 try:
-    from train_models import load_features
+    from train_models import LOAD_CHUNK_SIZE, load_features
 except ImportError:
     print("Could not import train_models.load_features. Run from repo root or ensure train_models.py is on path.", file=sys.stderr)
     sys.exit(1)
@@ -46,9 +46,17 @@ def main() -> None:
                         help="Quantile of profitable trades for suggested thresholds (default 0.25)")
     parser.add_argument("--min-profitable", type=int, default=20,
                         help="Minimum profitable trades to compute suggested_tuning (default 20)")
+    parser.add_argument("--chunk-size", type=int, default=LOAD_CHUNK_SIZE,
+                        help=f"Records flattened per chunk while loading (default {LOAD_CHUNK_SIZE})")
+    parser.add_argument("--no-feature-cache", dest="feature_cache", action="store_false",
+                        help="Re-parse all JSONL instead of reusing train_models' columnar feature cache")
     args = parser.parse_args()
 
-    df = load_features(args.data)
+    # Same streaming loader as train_models.py; only the columns this check reads are kept per chunk
+    df = load_features(
+        args.data, chunk_size=args.chunk_size, use_cache=args.feature_cache,
+        columns=["label_profitable", "signal_strength", "signal_confidence"],
+    )
     if df.empty:
         print("No data loaded. Exiting.")
         return